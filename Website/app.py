@@ -10,30 +10,98 @@ Features:
 - Personalized recommendations based on user profiles
 - Ontology exploration for scientific concepts
 - Real-time article details and metadata
+- Streaming (NDJSON) results for /search and /recommend
+- Batch recommendations for many users in one request (/recommend/batch)
 
 Author: Scientific Article Recommender Team
 Dependencies: Flask, Neo4j, recommendation engine
 """
 
-from flask import Flask, render_template, request, jsonify
-from neo4j import GraphDatabase
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 import sys
 import os
 script_dir = os.path.dirname(os.path.abspath(__file__))
 if script_dir not in sys.path:
     sys.path.insert(0, script_dir)
-from backend.reco import RecommendationEngine
+from backend.reco import RecommendationEngine, DEFAULT_STRATEGY_TIMEOUTS
+from backend.graph import GraphPool
+from backend.embedding_store import EmbeddingStore
+from backend.ann_index import IVFIndex
+from backend.bm25 import BM25Index
+from backend.profile_store import UserProfileStore
+from backend.ontology_closure import OntologyClosure
+from backend.materialized import MaterializedRecommendations
+from backend.pagination import parse_page_args, page_response, results_needed, stream_pages
+from backend.cache import create_cache
 
 # Configuration
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "your_password_here")
+NEO4J_DATABASE = os.getenv("NEO4J_DATABASE") or None
+NEO4J_POOL_SIZE = int(os.getenv("NEO4J_POOL_SIZE", 50))
+NEO4J_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", 30))
 FLASK_PORT = int(os.getenv("FLASK_PORT", 5050))
 FLASK_DEBUG = os.getenv("FLASK_DEBUG", "True").lower() == "true"
+EMBEDDINGS_FILE = os.getenv("EMBEDDINGS_FILE", "data/embeddings/embeddings_articles.csv")
+CONCEPTS_EMBEDDINGS_FILE = os.getenv("CONCEPTS_EMBEDDINGS_FILE", "data/embeddings/embeddings_concepts.csv")
+ARTICLES_FILE = os.getenv("ARTICLES_FILE", "data/cleaned data/processed_articles.json")
+EMBEDDING_QUANTIZATION = os.getenv("EMBEDDING_QUANTIZATION", "float32")  # float32, float16 or int8
+EMBEDDING_RERANK_FACTOR = int(os.getenv("EMBEDDING_RERANK_FACTOR", 4))
+ANN_INDEX_FILE = os.getenv("ANN_INDEX_FILE", "data/embeddings/ann_index.npz")
+KEYWORD_INDEX_FILE = os.getenv("KEYWORD_INDEX_FILE", "data/keyword_index.npz")
+USER_PROFILES_FILE = os.getenv("USER_PROFILES_FILE", "data/embeddings/user_profiles.npz")
+USER_LOGS_FILE = os.getenv("USER_LOGS_FILE", "data/fake_user_logs.csv")
+ONTOLOGY_CLOSURE_FILE = os.getenv("ONTOLOGY_CLOSURE_FILE", "data/ontology_closure.npz")
+ONTOLOGY_OWL_FILE = os.getenv("ONTOLOGY_OWL_FILE", "../scientific_recommender.owl")
+MATERIALIZED_FILE = os.getenv("MATERIALIZED_FILE", "data/materialized_recommendations.npz")
+MATERIALIZED_MAX_AGE = float(os.getenv("MATERIALIZED_MAX_AGE", 86400))  # seconds
+FUSION_METHOD = os.getenv("FUSION_METHOD", "weighted")  # weighted or rrf
+CONTENT_WEIGHT = float(os.getenv("CONTENT_WEIGHT", 0.6))
+ONTOLOGY_WEIGHT = float(os.getenv("ONTOLOGY_WEIGHT", 0.4))
+STRATEGY_WORKERS = int(os.getenv("STRATEGY_WORKERS", 8))
+STRATEGY_TIMEOUT = os.getenv("STRATEGY_TIMEOUT")  # seconds, applies to every strategy when set
+RECOMMEND_BATCH_MAX_USERS = int(os.getenv("RECOMMEND_BATCH_MAX_USERS", 1000))
+RESULT_CACHE = os.getenv("RESULT_CACHE", "memory")  # memory, sqlite or none
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "data/result_cache.sqlite")
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", 1024))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", 300))
 
 app = Flask(__name__)
-engine = RecommendationEngine(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
-neo4j_driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+# One connection pool for the engine and the routes below
+graph = GraphPool(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, database=NEO4J_DATABASE,
+                  pool_size=NEO4J_POOL_SIZE, acquisition_timeout=NEO4J_ACQUISITION_TIMEOUT)
+# Article embeddings (and titles/domains, when available) are parsed once here and shared by every request
+article_store = EmbeddingStore(EMBEDDINGS_FILE, metadata_file=ARTICLES_FILE if os.path.exists(ARTICLES_FILE) else None,
+                               quantization=EMBEDDING_QUANTIZATION, rerank_factor=EMBEDDING_RERANK_FACTOR)
+if os.path.exists(EMBEDDINGS_FILE):
+    article_store.load()
+# Optional approximate index built by existing_scripts/build_ann_index.py
+ann_index = IVFIndex.load(ANN_INDEX_FILE) if os.path.exists(ANN_INDEX_FILE) else None
+# Optional BM25 index built by existing_scripts/build_keyword_index.py
+keyword_index = BM25Index.load(KEYWORD_INDEX_FILE) if os.path.exists(KEYWORD_INDEX_FILE) else None
+# User profile vectors (existing_scripts/build_user_profiles.py); missing users are computed on first request
+profile_store = UserProfileStore(USER_PROFILES_FILE)
+if os.path.exists(USER_PROFILES_FILE):
+    profile_store.load()
+# isSubclassOf closure saved by import_data_to_neo4j.py; otherwise loaded (or built from the graph and
+# the OWL file, like the import does) on first use
+ontology_closure = OntologyClosure.load(ONTOLOGY_CLOSURE_FILE) if os.path.exists(ONTOLOGY_CLOSURE_FILE) else None
+# Per-user rankings from existing_scripts/materialize_recommendations.py; picked up when the job rewrites the file
+materialized = MaterializedRecommendations(MATERIALIZED_FILE)
+if os.path.exists(MATERIALIZED_FILE):
+    materialized.load()
+engine = RecommendationEngine(
+    graph=graph, embedding_store=article_store, ann_index=ann_index,
+    keyword_index=keyword_index, profile_store=profile_store,
+    interaction_logs_file=USER_LOGS_FILE if os.path.exists(USER_LOGS_FILE) else None,
+    ontology_closure=ontology_closure, fusion_method=FUSION_METHOD,
+    fusion_weights={'Content': CONTENT_WEIGHT, 'Ontology': ONTOLOGY_WEIGHT}, max_workers=STRATEGY_WORKERS,
+    cache=create_cache(RESULT_CACHE, RESULT_CACHE_PATH, RESULT_CACHE_SIZE, RESULT_CACHE_TTL) or False,
+    strategy_timeouts={name: float(STRATEGY_TIMEOUT) for name in DEFAULT_STRATEGY_TIMEOUTS} if STRATEGY_TIMEOUT else None,
+    materialized=materialized, materialized_max_age=MATERIALIZED_MAX_AGE,
+    ontology_closure_file=ONTOLOGY_CLOSURE_FILE, owl_file=ONTOLOGY_OWL_FILE
+)
 
 @app.route('/')
 def index():
@@ -49,28 +117,39 @@ def ontology():
 def get_users():
     """Retrieve the list of users from the database."""
     try:
-        with neo4j_driver.session() as session:
-            result = session.run("MATCH (u:User) RETURN u.has_id AS user_id")
-            users = [record["user_id"] for record in result]
+        users = [record["user_id"] for record in graph.read("MATCH (u:User) RETURN u.has_id AS user_id")]
         return jsonify(users)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def wants_stream(data):
+    """True if the client asked for newline-delimited JSON (`"stream": true` or an NDJSON Accept header)."""
+    return bool(data.get('stream')) or 'application/x-ndjson' in request.headers.get('Accept', '')
+
+def ndjson_response(rankings, offset, limit):
+    """Stream one page per refined ranking as application/x-ndjson."""
+    return Response(stream_with_context(stream_pages(rankings, offset, limit)), mimetype='application/x-ndjson')
+
 @app.route('/search', methods=['POST'])
 def search():
     """Handle the search request for topic-based article search."""
     try:
         data = request.get_json()
         topic = data.get('topic', 'Neural Networks')
-        embeddings_file = "data/embeddings/embeddings_articles.csv"
-        concepts_embeddings_file = "data/embeddings/embeddings_concepts.csv"
+        limit, offset = parse_page_args(data)
         
         # ADD DEBUG LOGGING:
         print(f"Search request for topic: {topic}")
-        recommendations = engine.get_search_recommendations(topic, embeddings_file, concepts_embeddings_file)
+        # One extra result tells whether another page exists
+        if wants_stream(data):
+            return ndjson_response(engine.stream_search_recommendations(
+                topic, EMBEDDINGS_FILE, CONCEPTS_EMBEDDINGS_FILE, top_n=results_needed(offset, limit)), offset, limit)
+        recommendations = engine.get_search_recommendations(topic, EMBEDDINGS_FILE, CONCEPTS_EMBEDDINGS_FILE, top_n=results_needed(offset, limit))
         print(f"Found {len(recommendations)} recommendations")
         
-        return jsonify(recommendations)
+        return jsonify(page_response(recommendations, offset, limit))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         print(f"Search error: {str(e)}")  # ADD THIS
         return jsonify({"error": str(e)}), 500
@@ -83,18 +162,98 @@ def recommend():
         user_id = data.get('user_id', 'User_0')
         topic = data.get('topic', 'Neural Networks')
         search_query = data.get('search_query', '')
-        recommendations = engine.get_recommendations(user_id, topic, search_query)
-        return jsonify(recommendations)
+        limit, offset = parse_page_args(data)
+        if wants_stream(data):
+            return ndjson_response(engine.stream_recommendations(
+                user_id, topic, search_query, top_n=results_needed(offset, limit)), offset, limit)
+        recommendations = engine.get_recommendations(user_id, topic, search_query, top_n=results_needed(offset, limit))
+        return jsonify(page_response(recommendations, offset, limit))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def parse_batch_users(data):
+    """
+    Read the `user_ids` list of a batch request.
+
+    Raises:
+        ValueError: If it is missing, not a list of strings or longer than RECOMMEND_BATCH_MAX_USERS
+    """
+    user_ids = data.get('user_ids')
+    if not isinstance(user_ids, list) or not user_ids or not all(isinstance(user_id, str) for user_id in user_ids):
+        raise ValueError("user_ids must be a non-empty list of user ids")
+    if len(user_ids) > RECOMMEND_BATCH_MAX_USERS:
+        raise ValueError(f"At most {RECOMMEND_BATCH_MAX_USERS} user_ids per request")
+    return user_ids
+
+@app.route('/recommend/batch', methods=['POST'])
+def recommend_batch():
+    """Return the first page of personalized recommendations for each of many users."""
+    try:
+        data = request.get_json()
+        user_ids = parse_batch_users(data)
+        topic = data.get('topic', 'Neural Networks')
+        search_query = data.get('search_query', '')
+        limit, offset = parse_page_args(data)
+        recommendations = engine.get_recommendations_batch(user_ids, topic, search_query, top_n=results_needed(offset, limit))
+        return jsonify({"results": {user_id: page_response(recs, offset, limit) for user_id, recs in recommendations.items()}})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Return result cache size and hit/miss counters."""
+    if engine.cache is None:
+        return jsonify({"backend": "none"})
+    return jsonify(engine.cache.stats())
+
+def parse_invalidate_users(data):
+    """
+    Users named by a `/cache/invalidate` request: `user_id`, or a `user_ids` list; empty means everything.
+
+    Raises:
+        ValueError: If `user_ids` is not a list of strings
+    """
+    if data.get('user_id'):
+        return [str(data['user_id'])]
+    user_ids = data.get('user_ids')
+    if user_ids is None:
+        return []
+    if not isinstance(user_ids, list) or not all(isinstance(user_id, str) for user_id in user_ids):
+        raise ValueError("user_ids must be a list of user ids")
+    return user_ids
+
+@app.route('/cache/invalidate', methods=['POST'])
+def cache_invalidate():
+    """Invalidate cached results for one user or a list of users (after hasInterest changes), or everything."""
+    try:
+        data = request.get_json(silent=True) or {}
+        user_ids = parse_invalidate_users(data)
+        if user_ids:
+            engine.invalidate_users(user_ids)
+        elif engine.cache is not None:
+            engine.cache.clear()
+        return jsonify({"invalidated": user_ids or "all"})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/graph/stats', methods=['GET'])
+def graph_stats():
+    """Return Neo4j pool settings and query/row/pool-wait counters."""
+    return jsonify({"pool_size": graph.pool_size, **graph.stats.snapshot()})
+
 @app.route('/article/<path:uri>', methods=['GET'])
 def get_article(uri):
     """Retrieve the detailed information of a specific article."""
     try:
         # Decode the URI to handle any encoding
         decoded_uri = uri.replace('%2F', '/').replace('%23', '#')
-        with neo4j_driver.session() as session:
+        with graph.session("read") as session:
             result = session.run(
                 """
                 MATCH (w:Work {uri: $uri})
@@ -129,29 +288,29 @@ def concept_search():
         concept = data.get('concept', '')
         if not concept:
             return jsonify({"error": "No concept provided"}), 400
-        with neo4j_driver.session() as session:
+        concept_uri = engine.get_label_index().best_match(concept)
+        if concept_uri is None:
+            return jsonify({"error": "Concept not found"}), 404
+        # Direct super/subclasses come from the precomputed closure, only the works need the graph
+        label_index = engine.get_label_index()
+        closure = engine.get_ontology_closure()
+        with graph.session("read") as session:
             result = session.run(
                 """
-                MATCH (c:Concept)
-                WHERE toLower(c.skos__prefLabel) CONTAINS toLower($concept)
-                OPTIONAL MATCH (c)-[:isSubclassOf]->(super:Concept)
-                OPTIONAL MATCH (sub:Concept)-[:isSubclassOf]->(c)
+                MATCH (c:Concept {uri: $uri})
                 OPTIONAL MATCH (w:Work)-[:hasTopic|hasConcept]->(c)
                 RETURN c.skos__prefLabel AS label, c.uri AS uri,
-                       collect(DISTINCT super.skos__prefLabel) AS superclasses,
-                       collect(DISTINCT sub.skos__prefLabel) AS subclasses,
                        collect(DISTINCT w.hasTitle) AS related_works
-                LIMIT 1
                 """,
-                concept=concept
+                uri=concept_uri
             )
             record = result.single()
             if record:
                 return jsonify({
                     "label": record["label"],
                     "uri": record["uri"],
-                    "superclasses": record["superclasses"],
-                    "subclasses": record["subclasses"],
+                    "superclasses": [label for label in (label_index.label(uri) for uri, _ in closure.ancestors_of(concept_uri, max_depth=1)) if label],
+                    "subclasses": [label for label in (label_index.label(uri) for uri, _ in closure.descendants_of(concept_uri, max_depth=1)) if label],
                     "related_works": record["related_works"]
                 })
             return jsonify({"error": "Concept not found"}), 404
@@ -163,4 +322,4 @@ if __name__ == '__main__':
         app.run(debug=FLASK_DEBUG, port=FLASK_PORT)
     finally:
         engine.close()
-        neo4j_driver.close()
\ No newline at end of file
+        graph.close()
\ No newline at end of file
@@ -0,0 +1,250 @@
+"""
+Scientific Article Recommender - ASGI Application
+
+Async serving mode exposing the same routes as the Flask app (`app.py`),
+built on Starlette and the async Neo4j driver (AsyncGraphPool). Requests
+are coroutines on one event loop per worker, so concurrent requests do not
+each hold a thread while waiting on the graph.
+
+The configuration, article store, indexes and result cache are the ones
+`app.py` sets up; `AsyncRecommendationEngine` wraps that engine and only
+replaces its Neo4j round-trips with async ones. The sync pool of `app.py`
+stays open for one-off index builds.
+
+Run from the Website/ directory:
+    uvicorn asgi_app:app --port 5051 --workers 4
+    python asgi_app.py
+
+Author: Scientific Article Recommender Team
+Dependencies: Starlette, uvicorn, Neo4j (async driver), recommendation engine
+"""
+
+import contextlib
+import os
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import FileResponse, JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from app import (
+    engine, graph, NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE, NEO4J_POOL_SIZE, NEO4J_ACQUISITION_TIMEOUT,
+    EMBEDDINGS_FILE, CONCEPTS_EMBEDDINGS_FILE, parse_batch_users, parse_invalidate_users,
+)
+from backend.async_reco import AsyncRecommendationEngine
+from backend.graph import AsyncGraphPool
+from backend.pagination import parse_page_args, page_response, results_needed, stream_pages_async
+
+ASGI_PORT = int(os.getenv("ASGI_PORT", 5051))
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    """Open the async pool on the worker's event loop; close everything on shutdown."""
+    app.state.graph = AsyncGraphPool(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, database=NEO4J_DATABASE,
+                                     pool_size=NEO4J_POOL_SIZE, acquisition_timeout=NEO4J_ACQUISITION_TIMEOUT)
+    app.state.engine = AsyncRecommendationEngine(engine, app.state.graph)
+    try:
+        yield
+    finally:
+        await app.state.graph.close()
+        engine.close()
+        graph.close()
+
+
+async def index(request):
+    """Render the index page."""
+    return FileResponse(os.path.join(TEMPLATES_DIR, 'index.html'))
+
+async def ontology(request):
+    """Render the ontology exploration page."""
+    return FileResponse(os.path.join(TEMPLATES_DIR, 'ontology.html'))
+
+async def get_users(request):
+    """Retrieve the list of users from the database."""
+    try:
+        records = await request.app.state.graph.read("MATCH (u:User) RETURN u.has_id AS user_id")
+        return JSONResponse([record["user_id"] for record in records])
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+def wants_stream(request, data):
+    """True if the client asked for newline-delimited JSON (`"stream": true` or an NDJSON Accept header)."""
+    return bool(data.get('stream')) or 'application/x-ndjson' in request.headers.get('accept', '')
+
+def ndjson_response(rankings, offset, limit):
+    """Stream one page per refined ranking as application/x-ndjson."""
+    return StreamingResponse(stream_pages_async(rankings, offset, limit), media_type='application/x-ndjson')
+
+async def search(request):
+    """Handle the search request for topic-based article search."""
+    try:
+        data = await request.json()
+        topic = data.get('topic', 'Neural Networks')
+        limit, offset = parse_page_args(data)
+        print(f"Search request for topic: {topic}")
+        # One extra result tells whether another page exists
+        if wants_stream(request, data):
+            return ndjson_response(request.app.state.engine.stream_search_recommendations(
+                topic, EMBEDDINGS_FILE, CONCEPTS_EMBEDDINGS_FILE, top_n=results_needed(offset, limit)), offset, limit)
+        recommendations = await request.app.state.engine.get_search_recommendations(
+            topic, EMBEDDINGS_FILE, CONCEPTS_EMBEDDINGS_FILE, top_n=results_needed(offset, limit))
+        print(f"Found {len(recommendations)} recommendations")
+        return JSONResponse(page_response(recommendations, offset, limit))
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    except Exception as e:
+        print(f"Search error: {str(e)}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+async def recommend(request):
+    """Handle the recommend request for personalized article recommendations."""
+    try:
+        data = await request.json()
+        user_id = data.get('user_id', 'User_0')
+        topic = data.get('topic', 'Neural Networks')
+        search_query = data.get('search_query', '')
+        limit, offset = parse_page_args(data)
+        if wants_stream(request, data):
+            return ndjson_response(request.app.state.engine.stream_recommendations(
+                user_id, topic, search_query, top_n=results_needed(offset, limit)), offset, limit)
+        recommendations = await request.app.state.engine.get_recommendations(
+            user_id, topic, search_query, top_n=results_needed(offset, limit))
+        return JSONResponse(page_response(recommendations, offset, limit))
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+async def recommend_batch(request):
+    """Return the first page of personalized recommendations for each of many users."""
+    try:
+        data = await request.json()
+        user_ids = parse_batch_users(data)
+        topic = data.get('topic', 'Neural Networks')
+        search_query = data.get('search_query', '')
+        limit, offset = parse_page_args(data)
+        # Batch scoring is CPU-bound and fans out to the engine's own pool, so it runs on a plain worker thread
+        recommendations = await run_in_threadpool(
+            engine.get_recommendations_batch, user_ids, topic, search_query, top_n=results_needed(offset, limit))
+        return JSONResponse({"results": {user_id: page_response(recs, offset, limit) for user_id, recs in recommendations.items()}})
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+async def cache_stats(request):
+    """Return result cache size and hit/miss counters."""
+    if engine.cache is None:
+        return JSONResponse({"backend": "none"})
+    return JSONResponse(await run_in_threadpool(engine.cache.stats))
+
+async def cache_invalidate(request):
+    """Invalidate cached results for one user or a list of users (after hasInterest changes), or everything."""
+    try:
+        data = await request.json() if await request.body() else {}
+        user_ids = parse_invalidate_users(data)
+        if user_ids:
+            await request.app.state.engine.invalidate_users(user_ids)
+        elif engine.cache is not None:
+            await run_in_threadpool(engine.cache.clear)
+        return JSONResponse({"invalidated": user_ids or "all"})
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+async def graph_stats(request):
+    """Return async Neo4j pool settings and query/row/pool-wait counters."""
+    pool = request.app.state.graph
+    return JSONResponse({"pool_size": pool.pool_size, **pool.stats.snapshot()})
+
+async def get_article(request):
+    """Retrieve the detailed information of a specific article."""
+    uri = request.path_params['uri']
+    try:
+        decoded_uri = uri.replace('%2F', '/').replace('%23', '#')
+        async with request.app.state.graph.session("read") as session:
+            result = await session.run(
+                """
+                MATCH (w:Work {uri: $uri})
+                OPTIONAL MATCH (w)-[:hasAuthor]->(a:Author)
+                OPTIONAL MATCH (w)-[:hasTopic|hasConcept]->(c:Concept)
+                RETURN w.hasTitle AS title, w.hasAbstract AS abstract, w.hasOpenAlexId AS openalex_id,
+                       w.domain AS domain, w.citedByCount AS cited_by_count,
+                       collect(a.foaf__name) AS authors, collect(c.skos__prefLabel) AS topics
+                """,
+                uri=decoded_uri
+            )
+            record = result.single()
+        if record:
+            return JSONResponse({
+                "title": record["title"] or "Untitled",
+                "abstract": record["abstract"] or "No abstract available",
+                "openalex_id": record["openalex_id"] or "N/A",
+                "domain": record["domain"] or "Unknown",
+                "cited_by_count": record["cited_by_count"] or 0,
+                "authors": record["authors"] or [],
+                "topics": record["topics"] or []
+            })
+        return JSONResponse({"error": "Article not found", "uri": decoded_uri}, status_code=404)
+    except Exception as e:
+        return JSONResponse({"error": str(e), "uri": uri}, status_code=500)
+
+async def concept_search(request):
+    """Search for concepts and related works based on a given concept label."""
+    try:
+        data = await request.json()
+        concept = data.get('concept', '')
+        if not concept:
+            return JSONResponse({"error": "No concept provided"}, status_code=400)
+        async_engine = request.app.state.engine
+        label_index = await async_engine.get_label_index()
+        concept_uri = label_index.best_match(concept)
+        if concept_uri is None:
+            return JSONResponse({"error": "Concept not found"}, status_code=404)
+        # Direct super/subclasses come from the precomputed closure, only the works need the graph
+        closure = await async_engine.get_ontology_closure()
+        async with request.app.state.graph.session("read") as session:
+            result = await session.run(
+                """
+                MATCH (c:Concept {uri: $uri})
+                OPTIONAL MATCH (w:Work)-[:hasTopic|hasConcept]->(c)
+                RETURN c.skos__prefLabel AS label, c.uri AS uri,
+                       collect(DISTINCT w.hasTitle) AS related_works
+                """,
+                uri=concept_uri
+            )
+            record = result.single()
+        if record:
+            return JSONResponse({
+                "label": record["label"],
+                "uri": record["uri"],
+                "superclasses": [label for label in (label_index.label(uri) for uri, _ in closure.ancestors_of(concept_uri, max_depth=1)) if label],
+                "subclasses": [label for label in (label_index.label(uri) for uri, _ in closure.descendants_of(concept_uri, max_depth=1)) if label],
+                "related_works": record["related_works"]
+            })
+        return JSONResponse({"error": "Concept not found"}, status_code=404)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+routes = [
+    Route('/', index),
+    Route('/ontology', ontology),
+    Route('/users', get_users, methods=['GET']),
+    Route('/search', search, methods=['POST']),
+    Route('/recommend', recommend, methods=['POST']),
+    Route('/recommend/batch', recommend_batch, methods=['POST']),
+    Route('/cache/stats', cache_stats, methods=['GET']),
+    Route('/cache/invalidate', cache_invalidate, methods=['POST']),
+    Route('/graph/stats', graph_stats, methods=['GET']),
+    Route('/article/{uri:path}', get_article, methods=['GET']),
+    Route('/concept_search', concept_search, methods=['POST']),
+]
+
+app = Starlette(routes=routes, lifespan=lifespan)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, port=ASGI_PORT)
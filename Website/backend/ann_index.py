@@ -0,0 +1,223 @@
+"""
+Approximate Nearest-Neighbour Index for the Scientific Article Recommender
+
+Implements an IVF-flat (inverted file) index over the pre-normalized SciBERT
+article embeddings, in plain NumPy:
+
+1. Build: spherical k-means partitions the embeddings into `nlist` cells.
+   Each article is stored in the inverted list of its closest centroid.
+2. Search: the query is compared with the centroids, the `nprobe` best cells
+   are opened and only their articles are scored exactly.
+
+`nprobe` is the recall/speed knob: probing every cell is exact search,
+probing a handful of cells touches only a small fraction of the corpus.
+
+The index stores row ids, not vectors; it scores against the matrix of the
+`EmbeddingStore` snapshot it was built from and refuses (so callers fall back
+to exact search) when the snapshot's URIs no longer match, or when its matrix
+has another shape or different vectors at a fixed sample of rows (embeddings
+regenerated for the same articles).
+
+Files are written by `existing_scripts/build_ann_index.py` as `.npz`.
+"""
+
+import numpy as np
+
+from .embedding_store import normalize_rows
+from .similarity import top_k
+
+# Rows compared with the snapshot to detect regenerated embeddings, and the tolerance
+# (re-normalizing a stored vector may change its last bits)
+FINGERPRINT_ROWS = 64
+FINGERPRINT_TOLERANCE = 1e-4
+
+
+def matrix_fingerprint(matrix, n_rows=FINGERPRINT_ROWS):
+    """
+    Sample of a matrix identifying its contents: evenly spaced row ids and their vectors.
+
+    Returns:
+        tuple: (row ids, (len(row ids), d) float32 vectors)
+    """
+    rows = np.unique(np.linspace(0, len(matrix) - 1, min(n_rows, len(matrix))).astype(np.int64))
+    return rows, np.asarray(matrix[rows], dtype=np.float32)
+
+
+def spherical_kmeans(matrix, n_clusters, n_iter=10, seed=0, chunk=65_536):
+    """
+    Cluster row-normalized vectors by cosine similarity.
+
+    Args:
+        matrix (numpy.ndarray): (n, d) row-normalized float32 matrix
+        n_clusters (int): Number of centroids
+        n_iter (int): Lloyd iterations
+        seed (int): Random seed for the initial centroids
+        chunk (int): Rows assigned per block, bounds the (chunk, n_clusters) score buffer
+
+    Returns:
+        numpy.ndarray: (min(n_clusters, n), d) normalized centroids
+    """
+    n_clusters = min(n_clusters, len(matrix))
+    rng = np.random.default_rng(seed)
+    centroids = matrix[rng.choice(len(matrix), n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        assignments = assign_clusters(matrix, centroids, chunk)
+        counts = np.bincount(assignments, minlength=n_clusters)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        filled = counts > 0
+        sums = np.zeros_like(centroids)
+        sums[filled] = np.add.reduceat(matrix[np.argsort(assignments, kind="stable")], starts[filled], axis=0)
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            sums[empty] = matrix[rng.choice(len(matrix), len(empty), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+def assign_clusters(matrix, centroids, chunk=65_536):
+    """Return the index of the most similar centroid for every row."""
+    assignments = np.empty(len(matrix), dtype=np.int32)
+    for start in range(0, len(matrix), chunk):
+        block = matrix[start:start + chunk]
+        assignments[start:start + chunk] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+class IVFIndex:
+    """
+    IVF-flat index over the rows of an embedding matrix.
+
+    Attributes:
+        centroids (numpy.ndarray): (nlist, d) normalized cell centroids
+        list_offsets (numpy.ndarray): (nlist + 1,) start of each cell in `list_rows`
+        list_rows (numpy.ndarray): Matrix row ids grouped by cell
+        uris (list): Article URI of every matrix row the index was built on
+        nprobe (int): Default number of cells opened per query
+        shape (tuple): Shape of the matrix the index was built on, None if unknown
+        fingerprint (tuple): `matrix_fingerprint` of that matrix, None if unknown
+    """
+
+    def __init__(self, centroids, list_offsets, list_rows, uris, nprobe=8, shape=None, fingerprint=None):
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_rows = list_rows
+        self.uris = list(uris)
+        self.nprobe = nprobe
+        self.shape = shape
+        self.fingerprint = fingerprint
+        self._matched_version = None
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, matrix, uris, nlist=None, nprobe=8, n_iter=10, train_size=None, seed=0):
+        """
+        Train the centroids and fill the inverted lists.
+
+        Args:
+            matrix (numpy.ndarray): (n, d) row-normalized float32 matrix
+            uris (list): URI of every row
+            nlist (int, optional): Number of cells, defaults to ~4 * sqrt(n); at most n
+            nprobe (int): Default cells probed per query
+            n_iter (int): k-means iterations
+            train_size (int, optional): Rows sampled for training, defaults to 64 * nlist
+            seed (int): Random seed
+
+        Returns:
+            IVFIndex: The built index
+        """
+        n = len(matrix)
+        nlist = min(nlist or max(1, int(4 * np.sqrt(n))), n)
+        train_size = min(n, max(train_size or 64 * nlist, nlist))
+        rng = np.random.default_rng(seed)
+        sample = matrix[np.sort(rng.choice(n, train_size, replace=False))]
+
+        centroids = spherical_kmeans(sample, nlist, n_iter=n_iter, seed=seed)
+        assignments = assign_clusters(matrix, centroids)
+        list_rows = np.argsort(assignments, kind="stable").astype(np.int64)
+        list_offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignments, minlength=nlist), out=list_offsets[1:])
+        return cls(centroids, list_offsets, list_rows, uris, nprobe=nprobe,
+                   shape=matrix.shape, fingerprint=matrix_fingerprint(matrix))
+
+    def save(self, path):
+        """Write the index to an `.npz` file."""
+        fingerprint_rows, fingerprint_vectors = self.fingerprint
+        np.savez(path, centroids=self.centroids, list_offsets=self.list_offsets, list_rows=self.list_rows,
+                 uris=np.array(self.uris, dtype=object), nprobe=self.nprobe, shape=np.array(self.shape),
+                 fingerprint_rows=fingerprint_rows, fingerprint_vectors=fingerprint_vectors)
+
+    @classmethod
+    def load(cls, path):
+        """Read an index written by `save()`; indexes saved without a fingerprint never match (rebuild them)."""
+        data = np.load(path, allow_pickle=True)
+        shape = fingerprint = None
+        if "fingerprint_rows" in data:
+            shape = tuple(int(size) for size in data["shape"])
+            fingerprint = (data["fingerprint_rows"], data["fingerprint_vectors"])
+        else:
+            print(f"ANN index {path} has no embedding fingerprint, using exact search; rebuild it with build_ann_index.py")
+        return cls(data["centroids"], data["list_offsets"], data["list_rows"], data["uris"].tolist(),
+                   nprobe=int(data["nprobe"]), shape=shape, fingerprint=fingerprint)
+
+    def matches(self, snapshot):
+        """
+        Check that the index was built on the rows of an EmbeddingStore snapshot.
+
+        Args:
+            snapshot (EmbeddingSnapshot): Current article embeddings
+
+        Returns:
+            bool: True if row ids in the index refer to the same articles with the same vectors
+        """
+        if self._matched_version == snapshot.version:
+            return True
+        if self.fingerprint is None or tuple(snapshot.matrix.shape) != tuple(self.shape) or self.uris != snapshot.uris:
+            return False
+        rows, vectors = self.fingerprint
+        if not np.allclose(snapshot.matrix[rows], vectors, atol=FINGERPRINT_TOLERANCE):
+            return False
+        self._matched_version = snapshot.version
+        return True
+
+    def search(self, matrix, query, k, nprobe=None, threshold=None, boost=None, exclude=None):
+        """
+        Approximate top-k search, same contract as `similarity.top_k_similar`.
+
+        Args:
+            matrix (numpy.ndarray): Row-normalized matrix the index was built on
+            query (array-like): Query vector
+            k (int): Number of results
+            nprobe (int, optional): Cells to open, defaults to `self.nprobe`
+            threshold (float, optional): Minimum (boosted) score, exclusive
+            boost (numpy.ndarray, optional): (n,) per-row score multipliers
+            exclude (array-like, optional): Boolean mask of length n or row indices to skip
+
+        Returns:
+            tuple: (indices, scores) sorted by descending score
+        """
+        query = np.asarray(query, dtype=matrix.dtype)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return top_k(np.zeros(0, dtype=np.float32), k, threshold)
+        query = query / norm
+
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        cells = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        rows = np.concatenate([self.list_rows[self.list_offsets[c]:self.list_offsets[c + 1]] for c in cells])
+
+        scores = matrix[rows] @ query
+        if boost is not None:
+            scores *= boost[rows]
+        if exclude is not None:
+            exclude = np.asarray(exclude)
+            if exclude.dtype == bool:
+                scores[exclude[rows]] = -np.inf
+            elif len(exclude):
+                scores[np.isin(rows, exclude)] = -np.inf
+            if threshold is None:
+                threshold = -np.inf
+        local, scores = top_k(scores, k, threshold)
+        return rows[local], scores
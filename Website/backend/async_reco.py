@@ -0,0 +1,295 @@
+"""
+Async Recommendation Engine for the ASGI Server
+
+`AsyncRecommendationEngine` mirrors the request-time methods of
+`RecommendationEngine` on top of an `AsyncGraphPool`, so a request
+never parks a worker thread on a graph round-trip: the strategies are
+coroutines running concurrently on the event loop, each under its own
+deadline, and a strategy that misses it is cancelled (its session is closed)
+instead of holding a thread until its query returns.
+
+The async engine wraps a synchronous one and shares its in-process state:
+embedding stores, label index, ontology closure, collaborative model,
+profile store, materialized rankings, result cache (same keys) and fusion
+settings. One-off work that still uses the sync GraphPool (building those
+indexes, the first profile of a user), numpy scoring and everything else that
+blocks (file reload checks and loads, index lookups, result cache reads and
+writes) run on the wrapped engine's thread pool; every per-request Neo4j
+query is async.
+"""
+
+import asyncio
+import functools
+
+from .embedding_store import normalize_vector
+from .metadata import fetch_work_metadata_async
+from .reco import (
+    CONCEPT_EMBEDDINGS_FILE, SEARCH_EXPANSION_DEPTH, SEARCH_EXPANSION_DECAY,
+    ONTOLOGY_KEYWORD_QUERY, ONTOLOGY_QUERY, USER_INTEREST_QUERY, SEARCH_ONTOLOGY_QUERY, CONCEPT_EMBEDDING_QUERY,
+)
+
+
+class AsyncRecommendationEngine:
+    """
+    Async counterpart of RecommendationEngine.
+
+    Attributes:
+        engine (RecommendationEngine): Wrapped engine holding the shared indexes and cache
+        graph (AsyncGraphPool): Async Neo4j access layer used for every request-time query
+    """
+
+    def __init__(self, engine, graph):
+        """
+        Args:
+            engine (RecommendationEngine): Engine whose indexes, cache and settings are shared
+            graph (AsyncGraphPool): Async pool, created inside the running event loop
+        """
+        self.engine = engine
+        self.graph = graph
+
+    async def _in_pool(self, fn, *args):
+        """Run blocking work on the wrapped engine's thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.engine.executor, functools.partial(fn, *args))
+
+    async def get_label_index(self):
+        """The wrapped engine's concept label index, built on the thread pool on first use."""
+        if self.engine.label_index is None:
+            await self._in_pool(self.engine.get_label_index)
+        return self.engine.label_index
+
+    async def get_ontology_closure(self):
+        """The wrapped engine's isSubclassOf closure, built on the thread pool on first use."""
+        if self.engine.ontology_closure is None:
+            await self._in_pool(self.engine.get_ontology_closure)
+        return self.engine.ontology_closure
+
+    async def _topic_concepts(self, topic):
+        await self.get_label_index()
+        return self.engine._topic_concepts(topic)
+
+    async def _resolve_uris(self, uris, scores, approach, articles=None):
+        """Async `RecommendationEngine._resolve_uris`: in-process metadata first, one UNWIND query for the rest."""
+        if articles is None:
+            articles = await self._snapshot(self.engine.embeddings_file)
+        metadata = self.engine._local_metadata(uris, articles)
+        missing = [uri for uri in uris if uri not in metadata]
+        if missing:
+            metadata.update(await fetch_work_metadata_async(self.graph, missing))
+        return [(uri, metadata[uri][0], metadata[uri][1], approach, float(score))
+                for uri, score in zip(uris, scores) if uri in metadata]
+
+    async def get_ontology_recommendations(self, topic, search_query, top_n=None):
+        concept_uris = await self._topic_concepts(topic)
+        if not concept_uris:
+            return []
+        limit = self.engine._limit(top_n)
+        work_uris = None
+        if search_query and self.engine.keyword_index is not None:
+            work_uris = await self._in_pool(self.engine.keyword_index.matches, search_query)
+        if work_uris is not None:
+            if not work_uris:
+                return []
+            records = await self.graph.read(ONTOLOGY_KEYWORD_QUERY + limit,
+                                            work_uris=work_uris, concept_uris=concept_uris, top_n=top_n)
+        else:
+            records = await self.graph.read(ONTOLOGY_QUERY + limit,
+                                            concept_uris=concept_uris, search_query=search_query, top_n=top_n)
+        return [(record["w.uri"], record["w.hasTitle"], record["w.domain"], 'Ontology', 1.0) for record in records]
+
+    async def get_keyword_recommendations(self, search_query, top_n=None):
+        if self.engine.keyword_index is None or not search_query:
+            return []
+        hits = await self._in_pool(self.engine.keyword_index.search, search_query, top_n or 100)
+        if not hits:
+            return []
+        best = hits[0][1]
+        return await self._resolve_uris([uri for uri, _ in hits], [score / best for _, score in hits], 'Keyword')
+
+    async def get_user_recommendations(self, user_id, top_n=None):
+        records = await self.graph.read(USER_INTEREST_QUERY + self.engine._limit(top_n), user_id=user_id, top_n=top_n)
+        return [(record["w.uri"], record["w.hasTitle"], record["w.domain"], 'User', 1.0) for record in records]
+
+    async def get_user_profile(self, user_id):
+        """Profile vector of a user, read (or computed once) on the thread pool."""
+        return await self._in_pool(self.engine.get_user_profile, user_id)
+
+    async def _snapshot(self, embeddings_file):
+        """Snapshot of an embedding store; the reload check (and reload) runs on the thread pool."""
+        return await self._in_pool(self.engine.get_embedding_store(embeddings_file).snapshot)
+
+    async def get_content_recommendations(self, user_id, embeddings_file, concepts_embeddings_file, top_n=None):
+        articles = await self._snapshot(embeddings_file)
+        if not articles.uris:
+            return []
+        user_embedding = await self.get_user_profile(user_id)
+        if not user_embedding.any():
+            return []
+        indices, similarities = await self._in_pool(self.engine._score_articles, articles, user_embedding, top_n)
+        return await self._resolve_uris([articles.uris[idx] for idx in indices], similarities, 'Content', articles)
+
+    async def get_collaborative_recommendations(self, user_id, top_n=None):
+        if self.engine.collaborative is None:
+            await self._in_pool(self.engine.get_collaborative_model)
+        scored = await self._in_pool(self.engine.collaborative.recommend, user_id, top_n)
+        return await self._resolve_uris([uri for uri, _ in scored], [score for _, score in scored], 'Collaborative')
+
+    async def _iter_strategies(self, strategies):
+        """
+        Run strategy coroutines concurrently and yield each one's results as it completes.
+
+        Each strategy is cancelled at its deadline; failed and timed-out
+        strategies are left out. Strategies still running when the consumer
+        stops iterating are cancelled.
+
+        Args:
+            strategies (dict): name -> (coroutine function, args)
+
+        Yields:
+            tuple: (name, list of results), in completion order
+        """
+        timeouts = self.engine.strategy_timeouts
+        tasks = {asyncio.ensure_future(asyncio.wait_for(fn(*args), timeouts.get(name, 5.0))): name
+                 for name, (fn, args) in strategies.items()}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks[task]
+                    try:
+                        results = task.result()
+                    except asyncio.TimeoutError:
+                        print(f"{name} strategy timed out, returning partial results")
+                        continue
+                    except Exception as e:
+                        print(f"{name} strategy failed: {e}")
+                        continue
+                    yield name, results
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _cached_recommendations(self, user_id, topic, search_query, top_n):
+        """
+        Materialized or cached ranking of a request, run on the thread pool.
+
+        Returns:
+            tuple: (materialized ranking or None, cache key, cached ranking or None)
+        """
+        engine = self.engine
+        materialized = engine.get_materialized(user_id, topic, search_query, top_n)
+        if materialized is not None:
+            return materialized, None, None
+        key = ('recommend', user_id, topic, search_query, top_n, engine._embeddings_signature(engine.embeddings_file))
+        return None, key, engine.cache.get(key) if engine.cache is not None else None
+
+    def _cached_search(self, search_topic, embeddings_file, top_n):
+        """Cache key and cached ranking of a search, run on the thread pool."""
+        engine = self.engine
+        key = ('search', search_topic, top_n, engine._embeddings_signature(embeddings_file))
+        return key, engine.cache.get(key) if engine.cache is not None else None
+
+    async def get_recommendations(self, user_id, topic="Neural Networks", search_query="", top_n=None):
+        recommendations = []
+        async for _, recommendations in self.stream_recommendations(user_id, topic, search_query, top_n):
+            pass
+        return recommendations
+
+    async def stream_recommendations(self, user_id, topic="Neural Networks", search_query="", top_n=None):
+        """
+        Async `RecommendationEngine.stream_recommendations`.
+
+        Yields:
+            tuple: (strategy, ranked (uri, title, domain, approaches, score) tuples)
+        """
+        engine = self.engine
+        materialized, key, cached = await self._in_pool(
+            self._cached_recommendations, user_id, topic, search_query, top_n)
+        if materialized is not None:
+            yield 'Materialized', materialized
+            return
+        if cached is not None:
+            yield 'Cache', cached
+            return
+
+        strategies = {
+            'Ontology': (self.get_ontology_recommendations, (topic, search_query, top_n)),
+            'Content': (self.get_content_recommendations, (user_id, engine.embeddings_file, CONCEPT_EMBEDDINGS_FILE, top_n)),
+            'Collaborative': (self.get_collaborative_recommendations, (user_id, top_n)),
+            'User': (self.get_user_recommendations, (user_id, top_n)),
+        }
+        if search_query and engine.keyword_index is not None:
+            strategies['Keyword'] = (self.get_keyword_recommendations, (search_query, top_n))
+        results = {}
+        recommendations = []
+        async for name, recs in self._iter_strategies(strategies):
+            results[name] = recs
+            recommendations = engine._fuse([results[n] for n in strategies if n in results], top_n)
+            yield name, recommendations
+
+        # Partial results (a strategy timed out or failed) are not cached
+        if engine.cache is not None and len(results) == len(strategies):
+            await self._in_pool(functools.partial(engine.cache.set, key, recommendations, user_id=user_id))
+
+    async def get_search_recommendations(self, search_topic, embeddings_file, concepts_embeddings_file, top_n=None):
+        recommendations = []
+        async for _, recommendations in self.stream_search_recommendations(search_topic, embeddings_file, concepts_embeddings_file, top_n):
+            pass
+        return recommendations
+
+    async def stream_search_recommendations(self, search_topic, embeddings_file, concepts_embeddings_file, top_n=None):
+        """
+        Async `RecommendationEngine.stream_search_recommendations`.
+
+        Yields:
+            tuple: (stage, ranked (uri, title, domain, approaches, score) tuples)
+        """
+        engine = self.engine
+        key, cached = await self._in_pool(self._cached_search, search_topic, embeddings_file, top_n)
+        if cached is not None:
+            yield 'Cache', cached
+            return
+        recommendations = []
+        async for stage, recommendations in self._iter_search_recommendations(search_topic, embeddings_file, top_n):
+            yield stage, recommendations
+        if engine.cache is not None:
+            await self._in_pool(engine.cache.set, key, recommendations)
+
+    async def _iter_search_recommendations(self, search_topic, embeddings_file, top_n=None):
+        engine = self.engine
+        concept_uris = await self._topic_concepts(search_topic)
+        closure = await self.get_ontology_closure()
+        expanded = closure.expand(concept_uris, SEARCH_EXPANSION_DEPTH, SEARCH_EXPANSION_DECAY)
+
+        # The ontology query and the topic embedding lookup are independent: issue both at once
+        ontology_query = self.graph.read(SEARCH_ONTOLOGY_QUERY + engine._limit(top_n),
+                                         concepts=[{"uri": uri, "weight": weight} for uri, weight in expanded], top_n=top_n)
+        embedding_query = asyncio.ensure_future(self.graph.read(CONCEPT_EMBEDDING_QUERY, concept_uris=concept_uris))
+        try:
+            records = await ontology_query
+            ontology_recs = [(record["w.uri"], record["w.hasTitle"], record["w.domain"], 'Ontology', record["weight"]) for record in records]
+            yield 'Ontology', engine._fuse([ontology_recs], top_n)
+
+            articles = await self._snapshot(embeddings_file)
+            if not articles.uris:
+                return
+            records = await embedding_query
+        finally:
+            embedding_query.cancel()
+        if not records:
+            print(f"No concept embedding found for '{search_topic}' - returning only ontology results")
+            return
+        topic_embedding = normalize_vector(records[0]["c.hasNameEmbedding"])
+        indices, similarities = await self._in_pool(engine._score_articles, articles, topic_embedding, top_n)
+        content_recs = await self._resolve_uris([articles.uris[idx] for idx in indices], similarities, 'Content', articles)
+
+        print(f"Found {len(ontology_recs)} ontology + {len(content_recs)} content recommendations")
+        yield 'Content', engine._fuse([ontology_recs, content_recs], top_n)
+
+    async def invalidate_user(self, user_id):
+        """`RecommendationEngine.invalidate_user`, run on the thread pool (it refreshes the collaborative model)."""
+        await self._in_pool(self.engine.invalidate_user, user_id)
+
+    async def invalidate_users(self, user_ids):
+        """`RecommendationEngine.invalidate_users`, run on the thread pool."""
+        await self._in_pool(self.engine.invalidate_users, user_ids)
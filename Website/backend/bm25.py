@@ -0,0 +1,218 @@
+"""
+BM25 Keyword Index for the Scientific Article Recommender
+
+A compact inverted index over article titles and abstracts, built from
+`processed_articles.json`. It replaces the Cypher
+`toLower(w.hasAbstract) CONTAINS toLower($search_query)` filter (a lowercase
+scan of every abstract inside Neo4j) with BM25-ranked retrieval.
+
+Storage is array-backed (CSR): one offsets array indexed by term id, and two
+flat arrays with the document ids and the precomputed BM25 weight of every
+posting. Documents ids within a posting list are sorted.
+
+Top-k queries use MaxScore-style early termination: terms are processed in
+decreasing order of their best possible contribution, and once the remaining
+terms can no longer lift an unseen document into the top-k, they are only
+looked up for the documents already in contention (binary search in the
+posting list) instead of being scanned in full.
+
+Files are written by `existing_scripts/build_keyword_index.py` as `.npz`.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from .metadata import work_uri
+
+_TOKEN_RE = re.compile(r"\w+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were which with
+we our these those their not but can using based into than also such
+""".split())
+
+
+def tokenize(text):
+    """Lowercase word tokens of `text` without stopwords."""
+    return [token for token in _TOKEN_RE.findall(str(text).lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Inverted index with precomputed BM25 posting weights.
+
+    Attributes:
+        uris (list): Work URI of every document id
+        terms (dict): term -> term id
+        term_offsets (numpy.ndarray): (n_terms + 1,) start of each posting list
+        postings_docs (numpy.ndarray): int32 document ids, sorted within each list
+        postings_weights (numpy.ndarray): float32 BM25 weight of each posting
+        max_weights (numpy.ndarray): float32 best weight of each term (MaxScore upper bound)
+    """
+
+    def __init__(self, uris, terms, term_offsets, postings_docs, postings_weights):
+        self.uris = list(uris)
+        self.terms = {term: i for i, term in enumerate(terms)}
+        self.term_offsets = term_offsets
+        self.postings_docs = postings_docs
+        self.postings_weights = postings_weights
+        self.max_weights = np.zeros(len(terms), dtype=np.float32)
+        nonempty = np.flatnonzero(np.diff(term_offsets) > 0)
+        if len(nonempty):
+            self.max_weights[nonempty] = np.maximum.reduceat(postings_weights, term_offsets[nonempty])
+
+    def __len__(self):
+        return len(self.uris)
+
+    @classmethod
+    def build(cls, documents, k1=1.2, b=0.75):
+        """
+        Build the index.
+
+        Args:
+            documents (iterable): (uri, text) pairs
+            k1 (float): BM25 term frequency saturation
+            b (float): BM25 length normalization
+
+        Returns:
+            BM25Index: The built index
+        """
+        uris = []
+        term_ids = {}
+        doc_ids, tids, tfs, lengths = [], [], [], []
+        for uri, text in documents:
+            doc = len(uris)
+            uris.append(uri)
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                doc_ids.append(doc)
+                tids.append(term_ids.setdefault(token, len(term_ids)))
+                tfs.append(tf)
+
+        doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        tids = np.asarray(tids, dtype=np.int64)
+        tfs = np.asarray(tfs, dtype=np.float32)
+        lengths = np.asarray(lengths, dtype=np.float32)
+
+        # Group postings by term, keeping document ids sorted inside each list
+        order = np.lexsort((doc_ids, tids))
+        doc_ids, tids, tfs = doc_ids[order], tids[order], tfs[order]
+        df = np.bincount(tids, minlength=len(term_ids))
+        term_offsets = np.zeros(len(term_ids) + 1, dtype=np.int64)
+        np.cumsum(df, out=term_offsets[1:])
+
+        n_docs = max(len(uris), 1)
+        avgdl = max(float(lengths.mean()) if len(lengths) else 0.0, 1.0)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = k1 * (1 - b + b * lengths[doc_ids] / avgdl)
+        weights = (idf[tids] * tfs * (k1 + 1) / (tfs + norm)).astype(np.float32)
+
+        terms = sorted(term_ids, key=term_ids.get)
+        return cls(uris, terms, term_offsets, doc_ids, weights)
+
+    @classmethod
+    def from_articles_file(cls, articles_file, k1=1.2, b=0.75):
+        """Build the index over title + abstract of processed_articles.json."""
+        articles = pd.read_json(articles_file)
+        documents = (
+            (work_uri(article_id), f"{title or ''} {abstract or ''}")
+            for article_id, title, abstract in zip(articles["id"], articles["title"], articles["abstract"])
+        )
+        return cls.build(documents, k1=k1, b=b)
+
+    def save(self, path):
+        """Write the index to an `.npz` file."""
+        terms = sorted(self.terms, key=self.terms.get)
+        np.savez(path, uris=np.frombuffer("\n".join(self.uris).encode(), dtype=np.uint8),
+                 terms=np.frombuffer("\n".join(terms).encode(), dtype=np.uint8),
+                 term_offsets=self.term_offsets, postings_docs=self.postings_docs,
+                 postings_weights=self.postings_weights)
+
+    @classmethod
+    def load(cls, path):
+        """Read an index written by `save()`."""
+        data = np.load(path)
+        uris = data["uris"].tobytes().decode().split("\n") if data["uris"].size else []
+        terms = data["terms"].tobytes().decode().split("\n") if data["terms"].size else []
+        return cls(uris, terms, data["term_offsets"], data["postings_docs"], data["postings_weights"])
+
+    def _postings(self, term_id):
+        start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+        return self.postings_docs[start:end], self.postings_weights[start:end]
+
+    def _query_terms(self, query):
+        return sorted({self.terms[token] for token in tokenize(query) if token in self.terms},
+                      key=lambda t: -self.max_weights[t])
+
+    def search(self, query, k=10):
+        """
+        BM25 top-k retrieval.
+
+        Args:
+            query (str): Keyword query
+            k (int): Number of results
+
+        Returns:
+            list: (uri, score) pairs sorted by descending score
+        """
+        term_ids = self._query_terms(query)
+        if not term_ids or k <= 0:
+            return []
+
+        scores = np.zeros(len(self.uris), dtype=np.float32)
+        touched = np.zeros(len(self.uris), dtype=bool)
+        remaining = float(self.max_weights[term_ids].sum())
+        candidates = None
+        for term_id in term_ids:
+            docs, weights = self._postings(term_id)
+            remaining -= float(self.max_weights[term_id])
+            if candidates is None:
+                scores[docs] += weights
+                touched[docs] = True
+                seen = np.flatnonzero(touched)
+                if len(seen) >= k:
+                    threshold = np.partition(scores[seen], len(seen) - k)[len(seen) - k]
+                    if remaining < threshold:
+                        # Unseen documents can no longer reach the top-k: only rescore contenders
+                        candidates = seen[scores[seen] + remaining >= threshold]
+            else:
+                pos = np.searchsorted(docs, candidates)
+                pos[pos == len(docs)] = 0
+                hit = docs[pos] == candidates if len(docs) else np.zeros(len(candidates), dtype=bool)
+                scores[candidates[hit]] += weights[pos[hit]]
+
+        pool = candidates if candidates is not None else np.flatnonzero(touched)
+        if len(pool) > k:
+            pool = pool[np.argpartition(-scores[pool], k - 1)[:k]]
+        pool = pool[np.lexsort((pool, -scores[pool]))]
+        return [(self.uris[doc], float(scores[doc])) for doc in pool]
+
+    def matches(self, query):
+        """
+        URIs of documents containing every query term (boolean AND filter).
+
+        The index only knows whole, non-stopword tokens: a query of stopwords
+        only, or one with a term missing from the vocabulary (e.g. a partial
+        word), cannot be answered from it and gives None, so callers fall
+        back to substring matching.
+
+        Args:
+            query (str): Keyword query
+
+        Returns:
+            list: Matching Work URIs, in index order, or None if the index cannot answer the query
+        """
+        tokens = set(tokenize(query))
+        if not tokens or any(token not in self.terms for token in tokens):
+            return None
+        term_ids = sorted((self.terms[token] for token in tokens), key=lambda t: np.diff(self.term_offsets[t:t + 2])[0])
+        docs = self._postings(term_ids[0])[0]
+        for term_id in term_ids[1:]:
+            docs = np.intersect1d(docs, self._postings(term_id)[0], assume_unique=True)
+        return [self.uris[doc] for doc in docs]
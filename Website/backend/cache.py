@@ -0,0 +1,197 @@
+"""
+Recommendation Result Cache
+
+Caches fused recommendation lists so identical `/recommend` and `/search`
+calls are not recomputed. Two interchangeable backends share one interface
+(`get`, `set`, `invalidate_user`, `clear`, `stats`):
+
+- `ResultCache`: in-process LRU with TTL expiry (default).
+- `SQLiteResultCache`: file-backed, shared by every worker process on a host.
+
+Entries can be tagged with a user id so that a change to that user's
+`hasInterest` edges drops exactly their entries. Keys carry the embedding
+file signature, so entries computed on older embeddings never hit after a
+reload.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    In-process LRU cache with TTL eviction and hit/miss counters.
+
+    Attributes:
+        max_size (int): Maximum number of entries before LRU eviction
+        ttl (float): Entry lifetime in seconds
+        hits, misses, evictions (int): Counters since creation
+    """
+
+    def __init__(self, max_size=1024, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, user_id, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for `key`, or None if missing or expired."""
+        key = _key(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key, value, user_id=None):
+        """
+        Store a value, evicting the least recently used entries past `max_size`.
+
+        Args:
+            key (tuple): Cache key
+            value: Result to cache
+            user_id (str, optional): User whose profile the result depends on
+        """
+        key = _key(key)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, user_id, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id):
+        """Drop every entry tagged with `user_id`."""
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry[1] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return size and counters as a dict."""
+        with self._lock:
+            return {"backend": "memory", "size": len(self._entries), "max_size": self.max_size,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class SQLiteResultCache:
+    """
+    File-backed cache shared by several worker processes.
+
+    Values are stored as JSON, so tuples come back as lists. Counters are per
+    process. LRU order is tracked with an access timestamp.
+
+    Attributes:
+        path (str): SQLite database file
+        max_size (int): Maximum number of entries before LRU eviction
+        ttl (float): Entry lifetime in seconds
+    """
+
+    def __init__(self, path, max_size=10_000, ttl=300):
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, user_id TEXT, value TEXT, expires_at REAL, accessed_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_user ON results (user_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)")
+
+    def _connect(self):
+        # sqlite3 connections cannot be shared across threads, keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """Return the cached value for `key`, or None if missing or expired."""
+        key = _key(key)
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute("SELECT value, expires_at FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < now:
+            if row is not None:
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            self.misses += 1
+            return None
+        conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value, user_id=None):
+        """Store a JSON-serializable value, evicting the least recently used entries past `max_size`."""
+        key = _key(key)
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO results (key, user_id, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (key, user_id, json.dumps(value), now + self.ttl, now)
+        )
+        excess = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.max_size
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY accessed_at LIMIT ?)", (excess,)
+            )
+            self.evictions += excess
+
+    def invalidate_user(self, user_id):
+        """Drop every entry tagged with `user_id`, for all processes."""
+        self._connect().execute("DELETE FROM results WHERE user_id = ?", (user_id,))
+
+    def clear(self):
+        """Drop every entry, for all processes."""
+        self._connect().execute("DELETE FROM results")
+
+    def stats(self):
+        """Return size and counters as a dict."""
+        size = self._connect().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return {"backend": "sqlite", "path": self.path, "size": size, "max_size": self.max_size,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+def create_cache(backend="memory", path=None, max_size=1024, ttl=300):
+    """
+    Build a result cache from configuration values.
+
+    Args:
+        backend (str): "memory", "sqlite" or "none"
+        path (str, optional): SQLite file for the "sqlite" backend
+        max_size (int): Maximum number of entries
+        ttl (float): Entry lifetime in seconds
+
+    Returns:
+        ResultCache, SQLiteResultCache or None
+    """
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        return SQLiteResultCache(path or "data/result_cache.sqlite", max_size=max_size, ttl=ttl)
+    return ResultCache(max_size=max_size, ttl=ttl)
+
+
+def _key(key):
+    return json.dumps(key, default=str)
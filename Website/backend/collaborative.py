@@ -0,0 +1,383 @@
+"""
+Sparse Collaborative Filtering for the Scientific Article Recommender
+
+Replaces the Cypher expansion
+`(u)-[:hasInterest]->(c)<-[:hasInterest]-(other)-[:hasInterest]->(c2)<-[:hasTopic|hasConcept]-(w)`,
+whose intermediate rows grow quadratically with shared interests and which
+returns an unranked DISTINCT set, with user-user collaborative filtering on
+sparse matrices:
+
+- interests: user x concept (hasInterest edges, binary)
+- interactions: user x article (fake_user_logs.csv, weighted by interaction type)
+- article_concepts: article x concept (hasTopic / hasConcept edges)
+
+Users are compared by cosine similarity over their concatenated interest and
+(log-scaled) interaction rows; only the top `neighbours` similar users of each
+user are kept. A user's candidate articles are the ones their neighbours
+interacted with or that carry one of their neighbours' concepts, scored by
+neighbour similarity. Scoring one user is a sparse vector-matrix product, a
+batch of users one sparse matrix-matrix product.
+
+New interests or interactions update the affected rows in place instead of
+rebuilding the model: the changed users get fresh neighbour lists and the
+users that have them as neighbours get their similarity entries merged. A
+list that lost entries this way is only refilled by the next full `fit()`.
+The interaction log is treated as append-only: `refresh_interaction_logs`
+folds in the rows written since the last read.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .metadata import work_uri
+from .similarity import top_k
+
+# Interaction strength per type in fake_user_logs.csv
+INTERACTION_WEIGHTS = {"read": 1.0, "click": 0.5, "cite": 2.0}
+
+
+class CollaborativeModel:
+    """
+    User-user collaborative filtering over sparse interest/interaction matrices.
+
+    Attributes:
+        neighbours (int): Similar users kept per user
+        interaction_weight (float): Weight of interactions relative to interests
+        users, concepts, articles (list): Row/column labels
+        interests (scipy.sparse.csr_matrix): user x concept
+        interactions (scipy.sparse.csr_matrix): user x article, summed interaction weights
+        article_concepts (scipy.sparse.csr_matrix): article x concept
+        similarity (scipy.sparse.csr_matrix): user x user, top `neighbours` cosine similarities per row
+        candidates (scipy.sparse.csr_matrix): user x article, what each user contributes to their neighbours
+        logged_interactions (int): Rows of the interaction log folded into the model
+    """
+
+    def __init__(self, neighbours=50, interaction_weight=1.0):
+        self.neighbours = neighbours
+        self.interaction_weight = interaction_weight
+        self.users, self.concepts, self.articles = [], [], []
+        self._user_rows, self._concept_cols, self._article_cols = {}, {}, {}
+        self.interests = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.interactions = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.article_concepts = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.similarity = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.candidates = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._features = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.logged_interactions = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.users)
+
+    @classmethod
+    def from_neo4j(cls, graph, logs_file=None, neighbours=50, interaction_weight=1.0):
+        """
+        Build the model from the graph and, optionally, the interaction logs.
+
+        Args:
+            graph (GraphPool): Shared Neo4j access layer
+            logs_file (str, optional): fake_user_logs.csv (user_id, article_id, interaction_type)
+            neighbours (int): Similar users kept per user
+            interaction_weight (float): Weight of interactions relative to interests
+
+        Returns:
+            CollaborativeModel: The fitted model
+        """
+        with graph.session("read") as session:
+            interests = [(record["user_id"], record["concept_uri"]) for record in session.run(
+                "MATCH (u:User)-[:hasInterest]->(c:Concept) RETURN u.has_id AS user_id, c.uri AS concept_uri"
+            )]
+            article_concepts = [(record["work_uri"], record["concept_uri"]) for record in session.run(
+                "MATCH (w:Work)-[:hasTopic|hasConcept]->(c:Concept) RETURN w.uri AS work_uri, c.uri AS concept_uri"
+            )]
+        interactions = read_interaction_logs(logs_file) if logs_file else []
+        model = cls(neighbours=neighbours, interaction_weight=interaction_weight)
+        model.fit(interests, interactions, article_concepts)
+        model.logged_interactions = len(interactions)
+        return model
+
+    def fit(self, interests, interactions, article_concepts):
+        """
+        Build every matrix from scratch.
+
+        Args:
+            interests (iterable): (user_id, concept_uri) pairs
+            interactions (iterable): (user_id, article_uri, weight) triples
+            article_concepts (iterable): (article_uri, concept_uri) pairs
+        """
+        interests, interactions, article_concepts = list(interests), list(interactions), list(article_concepts)
+        self.users, self.concepts, self.articles = [], [], []
+        self._user_rows, self._concept_cols, self._article_cols = {}, {}, {}
+
+        rows = _ids(self._user_rows, self.users, [u for u, _ in interests])
+        cols = _ids(self._concept_cols, self.concepts, [c for _, c in interests])
+        irows = _ids(self._user_rows, self.users, [u for u, _, _ in interactions])
+        icols = _ids(self._article_cols, self.articles, [a for _, a, _ in interactions])
+        arows = _ids(self._article_cols, self.articles, [a for a, _ in article_concepts])
+        acols = _ids(self._concept_cols, self.concepts, [c for _, c in article_concepts])
+
+        n_users, n_concepts, n_articles = len(self.users), len(self.concepts), len(self.articles)
+        self.interests = _csr(rows, cols, np.ones(len(rows)), (n_users, n_concepts))
+        self.interests.data[:] = 1  # duplicate edges stay binary
+        self.interactions = _csr(irows, icols, [w for _, _, w in interactions], (n_users, n_articles))
+        self.article_concepts = _csr(arows, acols, np.ones(len(arows)), (n_articles, n_concepts))
+        self.article_concepts.data[:] = 1
+
+        self._features = self._feature_rows(self.interests, self.interactions)
+        self.candidates = self._candidate_rows(self.interests, self.interactions)
+        self.similarity = self._neighbour_rows(np.arange(n_users))
+
+    def recommend(self, user_id, top_n=None):
+        """
+        Score candidate articles for a user.
+
+        Articles the user already interacted with are excluded. Scores are
+        divided by the best one, so they lie in (0, 1].
+
+        Args:
+            user_id (str): User identifier
+            top_n (int, optional): Number of results, all positive scores if None
+
+        Returns:
+            list: (article_uri, score) pairs sorted by descending score
+        """
+        return self.recommend_many([user_id], top_n)[user_id]
+
+    def recommend_many(self, user_ids, top_n=None):
+        """
+        `recommend` for several users with one sparse matrix-matrix product.
+
+        Args:
+            user_ids (list): User identifiers
+            top_n (int, optional): Number of results per user, all positive scores if None
+
+        Returns:
+            dict: user_id -> (article_uri, score) pairs sorted by descending score
+                (empty for users unknown to the model)
+        """
+        recommendations = {user_id: [] for user_id in user_ids}
+        with self._lock:
+            known = [user_id for user_id in recommendations if user_id in self._user_rows]
+            rows = [self._user_rows[user_id] for user_id in known]
+            if not rows:
+                return recommendations
+            scores = (self.similarity[rows] @ self.candidates).toarray()
+            for i, row in enumerate(rows):
+                scores[i, self.interactions[row].indices] = 0
+            articles = self.articles
+        for user_id, user_scores in zip(known, scores):
+            indices, values = top_k(user_scores, k=top_n, threshold=0.0)
+            if len(indices):
+                best = float(values[0])
+                recommendations[user_id] = [(articles[idx], float(value) / best) for idx, value in zip(indices, values)]
+        return recommendations
+
+    def set_interests(self, interests):
+        """
+        Replace the interests of some users and update the model incrementally.
+
+        Args:
+            interests (dict): user_id -> iterable of concept URIs (empty clears them)
+        """
+        with self._lock:
+            users = list(interests)
+            rows = _ids(self._user_rows, self.users, users)
+            pairs = [(i, c) for i, user in enumerate(users) for c in interests[user]]
+            cols = _ids(self._concept_cols, self.concepts, [c for _, c in pairs])
+            self._grow()
+            new_rows = _csr([i for i, _ in pairs], cols, np.ones(len(pairs)), (len(users), len(self.concepts)))
+            new_rows.data[:] = 1
+            self.interests = _replace_rows(self.interests, rows, new_rows)
+            self._update(np.asarray(rows))
+
+    def refresh_interests(self, graph, user_ids):
+        """Re-read the hasInterest edges of some users from Neo4j (one UNWIND query) and update."""
+        user_ids = [str(user_id) for user_id in user_ids]
+        interests = {user_id: [] for user_id in user_ids}
+        with graph.session("read") as session:
+            result = session.run(
+                """
+                UNWIND $user_ids AS user_id
+                MATCH (u:User {has_id: user_id})-[:hasInterest]->(c:Concept)
+                RETURN user_id, c.uri AS concept_uri
+                """,
+                user_ids=user_ids
+            )
+            for record in result:
+                interests[record["user_id"]].append(record["concept_uri"])
+        self.set_interests(interests)
+
+    def add_interactions(self, interactions):
+        """
+        Add new interactions and update the model incrementally.
+
+        Args:
+            interactions (iterable): (user_id, article_uri, weight) triples
+        """
+        interactions = list(interactions)
+        if not interactions:
+            return
+        with self._lock:
+            users = sorted({u for u, _, _ in interactions})
+            rows = _ids(self._user_rows, self.users, users)
+            local = {user: i for i, user in enumerate(users)}
+            cols = _ids(self._article_cols, self.articles, [a for _, a, _ in interactions])
+            self._grow()
+            delta = _csr([local[u] for u, _, _ in interactions], cols, [w for _, _, w in interactions],
+                         (len(users), len(self.articles)))
+            self.interactions = _replace_rows(self.interactions, rows, self.interactions[rows] + delta)
+            self._update(np.asarray(rows))
+
+    def refresh_interaction_logs(self, logs_file):
+        """
+        Add the interaction log rows appended since the model last read the log.
+
+        Args:
+            logs_file (str): fake_user_logs.csv the model was built from
+
+        Returns:
+            int: Number of interactions added
+        """
+        with self._lock:
+            interactions = read_interaction_logs(logs_file, start=self.logged_interactions)
+            self.add_interactions(interactions)
+            self.logged_interactions += len(interactions)
+        return len(interactions)
+
+    def _grow(self):
+        """Resize every matrix to the current user/concept/article counts."""
+        n_users, n_concepts, n_articles = len(self.users), len(self.concepts), len(self.articles)
+        self.interests = _resized(self.interests, (n_users, n_concepts))
+        self.interactions = _resized(self.interactions, (n_users, n_articles))
+        self.article_concepts = _resized(self.article_concepts, (n_articles, n_concepts))
+        self.candidates = _resized(self.candidates, (n_users, n_articles))
+        self.similarity = _resized(self.similarity, (n_users, n_users))
+
+    def _update(self, rows):
+        """Recompute derived rows after the interests/interactions of `rows` changed."""
+        old_reverse = np.unique(self.similarity[:, rows].tocoo().row)
+        self._features = self._feature_rows(self.interests, self.interactions)
+        self.candidates = _replace_rows(self.candidates, rows,
+                                        self._candidate_rows(self.interests[rows], self.interactions[rows]))
+        changed = self._neighbour_rows(rows)
+        self.similarity = _replace_rows(self.similarity, rows, changed)
+
+        # Users that had, or now have, a changed user as neighbour: merge the new similarities into their lists
+        sims = (self._features @ self._features[rows].T).tocsr()
+        affected = np.setdiff1d(np.union1d(old_reverse, np.unique(sims.tocoo().row)), rows)
+        if not len(affected):
+            return
+        is_changed = np.zeros(len(self.users), dtype=bool)
+        is_changed[rows] = True
+        merged_rows, merged_cols, merged_vals = [], [], []
+        for i, row in enumerate(affected):
+            current = self.similarity[row]
+            keep = ~is_changed[current.indices]
+            fresh = sims[row]
+            cols = np.concatenate((current.indices[keep], rows[fresh.indices]))
+            vals = np.concatenate((current.data[keep], fresh.data))
+            mask = vals > 0
+            cols, vals = cols[mask], vals[mask]
+            if len(vals) > self.neighbours:
+                best = np.argpartition(-vals, self.neighbours - 1)[:self.neighbours]
+                cols, vals = cols[best], vals[best]
+            merged_rows.append(np.full(len(cols), i))
+            merged_cols.append(cols)
+            merged_vals.append(vals)
+        merged = _csr(np.concatenate(merged_rows), np.concatenate(merged_cols), np.concatenate(merged_vals),
+                      (len(affected), len(self.users)))
+        self.similarity = _replace_rows(self.similarity, affected, merged)
+
+    def _feature_rows(self, interests, interactions):
+        """Row-normalized [interests | weighted log interactions] matrix used for cosine similarity."""
+        features = sparse.hstack([interests, interactions.log1p() * self.interaction_weight], format="csr")
+        norms = np.sqrt(np.asarray(features.multiply(features).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return (sparse.diags(1 / norms) @ features).astype(np.float32).tocsr()
+
+    def _candidate_rows(self, interests, interactions):
+        """Articles a user lends to their neighbours: interacted-with articles plus articles on their concepts."""
+        on_concepts = (interests @ self.article_concepts.T).tocsr()
+        on_concepts.data[:] = 1
+        return (on_concepts + interactions.log1p() * self.interaction_weight).astype(np.float32).tocsr()
+
+    def _neighbour_rows(self, rows, chunk_size=1024):
+        """Top `neighbours` most similar other users of each row, as a len(rows) x n_users matrix."""
+        out_rows, out_cols, out_vals = [], [], []
+        features_t = self._features.T.tocsr()
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            sims = (self._features[chunk] @ features_t).tocsr()
+            for i, row in enumerate(chunk):
+                cols, vals = sims.indices[sims.indptr[i]:sims.indptr[i + 1]], sims.data[sims.indptr[i]:sims.indptr[i + 1]]
+                mask = (cols != row) & (vals > 0)
+                cols, vals = cols[mask], vals[mask]
+                if len(vals) > self.neighbours:
+                    best = np.argpartition(-vals, self.neighbours - 1)[:self.neighbours]
+                    cols, vals = cols[best], vals[best]
+                out_rows.append(np.full(len(cols), start + i))
+                out_cols.append(cols)
+                out_vals.append(vals)
+        if not out_rows:
+            return sparse.csr_matrix((len(rows), len(self.users)), dtype=np.float32)
+        return _csr(np.concatenate(out_rows), np.concatenate(out_cols), np.concatenate(out_vals),
+                    (len(rows), len(self.users)))
+
+
+def read_interaction_logs(logs_file, start=0):
+    """
+    Read fake_user_logs.csv as (user_id, article_uri, weight) triples.
+
+    Interaction types missing from INTERACTION_WEIGHTS count as 1.0.
+
+    Args:
+        logs_file (str): Interaction log CSV
+        start (int): Data rows to skip (already read)
+    """
+    logs = pd.read_csv(logs_file, usecols=["user_id", "article_id", "interaction_type"],
+                       skiprows=range(1, start + 1))
+    weights = logs["interaction_type"].map(INTERACTION_WEIGHTS).fillna(1.0)
+    return [(str(user_id), work_uri(article_id), float(weight))
+            for user_id, article_id, weight in zip(logs["user_id"], logs["article_id"], weights)]
+
+
+def _ids(positions, labels, keys):
+    """Map keys to integer ids, appending unseen keys to `labels`."""
+    ids = np.empty(len(keys), dtype=np.int64)
+    for i, key in enumerate(keys):
+        idx = positions.get(key)
+        if idx is None:
+            idx = positions[key] = len(labels)
+            labels.append(key)
+        ids[i] = idx
+    return ids
+
+
+def _csr(rows, cols, values, shape):
+    """COO triples -> CSR with duplicates summed."""
+    matrix = sparse.csr_matrix((np.asarray(values, dtype=np.float32), (np.asarray(rows, dtype=np.int64),
+                                np.asarray(cols, dtype=np.int64))), shape=shape)
+    matrix.sum_duplicates()
+    return matrix
+
+
+def _resized(matrix, shape):
+    if matrix.shape == shape:
+        return matrix
+    matrix = matrix.copy()
+    matrix.resize(shape)
+    return matrix
+
+
+def _replace_rows(matrix, rows, new_rows):
+    """Copy of `matrix` with `rows` replaced by the rows of `new_rows`."""
+    keep = np.ones(matrix.shape[0], dtype=np.float32)
+    keep[rows] = 0
+    placement = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, np.arange(len(rows)))),
+                                  shape=(matrix.shape[0], len(rows)))
+    result = (sparse.diags(keep) @ matrix + placement @ sparse.csr_matrix(new_rows)).tocsr()
+    result.eliminate_zeros()
+    return result
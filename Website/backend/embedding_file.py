@@ -0,0 +1,204 @@
+"""
+Binary Embedding Files for the Scientific Article Recommender
+
+`generate_embeddings.py` writes each vector as a JSON list inside a CSV cell,
+which is about three times the size of the raw floats and has to be
+`json.loads`-ed row by row on every load. The binary format stores the same
+data as three files sharing one stem:
+
+- `<stem>.npy`: (n, dim) float32 matrix, memory-mappable
+- `<stem>.uris.txt`: one URI per line, line i = matrix row i
+- `<stem>.json`: header with the model name, dimension, row count and
+  whether the rows are already L2-normalized
+- `<stem>.labels.txt` (optional): one label per line, line i = label of row i,
+  for concept CSVs that carry a `skos__prefLabel` column
+
+`existing_scripts/convert_embeddings.py` converts the CSVs. Every reader goes
+through `read_embeddings` (and `read_labels` for the labels), which accept
+either format: a path ending in `.npy` is read as binary, anything else as
+the CSV export.
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+BINARY_FORMAT_VERSION = 1
+
+# Embedding column of each CSV export
+EMBEDDING_COLUMNS = ("hasAbstractEmbedding", "hasNameEmbedding")
+# Concept label column of CSV exports that carry one
+LABEL_COLUMN = "skos__prefLabel"
+
+
+def is_binary(path):
+    """True if `path` names a binary (`.npy`) embedding file."""
+    return path.endswith(".npy")
+
+
+def csv_column(path):
+    """The embedding column (one of `EMBEDDING_COLUMNS`) of an embeddings CSV."""
+    columns = pd.read_csv(path, nrows=0).columns
+    return next(column for column in EMBEDDING_COLUMNS if column in columns)
+
+
+def sidecar_paths(path):
+    """(uris, header) sidecar paths of a binary embedding file."""
+    stem = os.path.splitext(path)[0]
+    return stem + ".uris.txt", stem + ".json"
+
+
+def labels_path(path):
+    """Optional labels sidecar path of a binary embedding file."""
+    return os.path.splitext(path)[0] + ".labels.txt"
+
+
+def save_binary(path, uris, matrix, model_name=None, normalized=False, column=None, labels=None):
+    """
+    Write an embedding matrix in the binary format.
+
+    The sidecars are replaced first and the `.npy` last, so readers that watch
+    the `.npy` modification time see the new sidecars when they reload.
+
+    Args:
+        path (str): `.npy` path
+        uris (list): URI of each row
+        matrix (numpy.ndarray): (n, dim) embeddings
+        model_name (str, optional): Model the embeddings were generated with
+        normalized (bool): Whether the rows are L2-normalized
+        column (str, optional): CSV column the embeddings came from
+        labels (list, optional): Label of each row, written to the labels sidecar
+
+    Returns:
+        dict: The header written
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    if matrix.ndim != 2 or len(matrix) != len(uris):
+        raise ValueError(f"Expected one row per URI, got {matrix.shape} for {len(uris)} URIs")
+    if labels is not None and len(labels) != len(uris):
+        raise ValueError(f"Expected one label per URI, got {len(labels)} for {len(uris)} URIs")
+    uris_path, header_path = sidecar_paths(path)
+    header = {
+        "version": BINARY_FORMAT_VERSION,
+        "model": model_name,
+        "dim": int(matrix.shape[1]),
+        "count": len(uris),
+        "normalized": bool(normalized),
+        "column": column,
+        "labels": labels is not None,
+        "created_at": time.time(),
+    }
+    tmp_path = f"{path}.tmp.npy"
+    np.save(tmp_path, matrix)
+    with open(uris_path + ".tmp", "w", encoding="utf-8") as f:
+        f.writelines(f"{uri}\n" for uri in uris)
+    with open(header_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(header, f, indent=2)
+    if labels is not None:
+        with open(labels_path(path) + ".tmp", "w", encoding="utf-8") as f:
+            f.writelines(f"{' '.join(str(label or '').splitlines())}\n" for label in labels)
+        os.replace(labels_path(path) + ".tmp", labels_path(path))
+    os.replace(uris_path + ".tmp", uris_path)
+    os.replace(header_path + ".tmp", header_path)
+    os.replace(tmp_path, path)
+    return header
+
+
+def load_binary(path, mmap=True):
+    """
+    Read a binary embedding file.
+
+    Args:
+        path (str): `.npy` path
+        mmap (bool): Memory-map the matrix read-only instead of reading it into memory
+
+    Returns:
+        tuple: (uris, matrix, header)
+
+    Raises:
+        ValueError: If the sidecars do not match the matrix (e.g. a conversion is in progress)
+    """
+    uris_path, header_path = sidecar_paths(path)
+    with open(header_path, encoding="utf-8") as f:
+        header = json.load(f)
+    if header.get("version") != BINARY_FORMAT_VERSION:
+        raise ValueError(f"Unsupported embedding file version {header.get('version')} in {header_path}")
+    with open(uris_path, encoding="utf-8") as f:
+        uris = f.read().splitlines()
+    matrix = np.load(path, mmap_mode="r" if mmap else None)
+    if matrix.shape != (header["count"], header["dim"]) or len(uris) != header["count"]:
+        raise ValueError(f"{path} does not match its sidecars ({matrix.shape}, {len(uris)} URIs, header {header})")
+    return uris, matrix, header
+
+
+def read_embeddings(path, column=None, dim=None, mmap=False):
+    """
+    Read embeddings from either a binary file or a JSON-in-CSV export.
+
+    CSV rows with a missing or malformed embedding (or another dimension than
+    `dim`) are skipped.
+
+    Args:
+        path (str): `.npy` file or embeddings CSV
+        column (str, optional): CSV embedding column, defaults to whichever of
+            `EMBEDDING_COLUMNS` the file has
+        dim (int, optional): Expected dimension
+        mmap (bool): Memory-map a binary matrix instead of reading it into memory
+
+    Returns:
+        tuple: (uris, (n, dim) float32 matrix, header); header is None for CSV files
+
+    Raises:
+        ValueError: If a binary file has another dimension than `dim`
+    """
+    if is_binary(path):
+        uris, matrix, header = load_binary(path, mmap=mmap)
+        if dim is not None and header["dim"] != dim:
+            raise ValueError(f"{path} holds {header['dim']}-dimensional embeddings, expected {dim}")
+        return uris, matrix, header
+
+    column = column or csv_column(path)
+    df = pd.read_csv(path, usecols=["uri", column]).dropna(subset=[column])
+    uris, matrix = [], None
+    for uri, raw in zip(df["uri"], df[column]):
+        vector = json.loads(raw) if isinstance(raw, str) else raw
+        if not isinstance(vector, list) or not vector or (dim is not None and len(vector) != dim):
+            continue
+        if matrix is None:
+            dim = len(vector)
+            matrix = np.empty((len(df), dim), dtype=np.float32)
+        matrix[len(uris)] = vector
+        uris.append(uri)
+    if matrix is None:
+        return [], np.empty((0, dim or 0), dtype=np.float32), None
+    return uris, np.ascontiguousarray(matrix[:len(uris)]), None
+
+
+def read_labels(path, label_column=LABEL_COLUMN):
+    """
+    Read the labels stored with an embedding file.
+
+    Args:
+        path (str): `.npy` file or embeddings CSV
+        label_column (str): CSV label column
+
+    Returns:
+        dict: uri -> label; empty if the file carries no labels
+    """
+    if is_binary(path):
+        uris_path, header_path = sidecar_paths(path)
+        with open(header_path, encoding="utf-8") as f:
+            if not json.load(f).get("labels"):
+                return {}
+        with open(uris_path, encoding="utf-8") as f:
+            uris = f.read().splitlines()
+        with open(labels_path(path), encoding="utf-8") as f:
+            return dict(zip(uris, f.read().splitlines()))
+
+    if label_column not in pd.read_csv(path, nrows=0).columns:
+        return {}
+    df = pd.read_csv(path, usecols=["uri", label_column]).dropna(subset=[label_column])
+    return dict(zip(df["uri"], df[label_column].astype(str)))
@@ -0,0 +1,202 @@
+"""
+Embedding Store for the Scientific Article Recommender
+
+This module keeps the SciBERT embeddings produced by
+`existing_scripts/generate_embeddings.py` resident in memory so that the
+recommendation engine does not have to re-read and re-parse the CSV export on
+every request.
+
+The CSV (or binary `.npy` file, see `embedding_file.py`) is read once into a
+contiguous, L2-normalized float32 matrix together with a URI -> row index. The store watches the file modification time and
+transparently reloads when the embeddings are regenerated. Optionally, article
+titles and domains from `processed_articles.json` are loaded alongside, so
+scored rows can be returned without any per-row database call.
+
+Key Features:
+- One-time parsing of the JSON-in-CSV embedding columns, or a plain read of
+  the binary format
+- Pre-normalized float32 matrix (cosine similarity == dot product)
+- URI -> row lookup
+- Optional in-process title/domain table aligned with the matrix rows
+- Optional float16 / int8 quantized copy for first-pass scoring, with the
+  full-precision matrix memory-mapped from disk for exact re-ranking
+- Reload on file change, safe to share between Flask worker threads
+"""
+
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from .embedding_file import read_embeddings
+from .metadata import load_article_metadata
+from .quantization import QuantizedMatrix, QUANTIZATION_MODES, DEFAULT_RERANK_FACTOR
+
+# `quantized` is None in float32 mode; otherwise `matrix` is memory-mapped from disk
+EmbeddingSnapshot = namedtuple("EmbeddingSnapshot", ["matrix", "uris", "uri_index", "version", "titles", "domains",
+                                                     "quantized"], defaults=(None,))
+
+
+def normalize_rows(matrix):
+    """
+    L2-normalize the rows of a matrix in place, leaving all-zero rows untouched.
+
+    Args:
+        matrix (numpy.ndarray): 2-D float array
+
+    Returns:
+        numpy.ndarray: The same array, normalized
+    """
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+def normalize_vector(vector):
+    """Return a float32 L2-normalized copy of a 1-D vector (zeros stay zeros)."""
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+class EmbeddingStore:
+    """
+    In-memory, pre-normalized embedding matrix loaded from an embeddings CSV or binary file.
+
+    Readers should call `snapshot()` once per request and use the returned
+    tuple, so that a concurrent reload never mixes rows from two versions.
+
+    Attributes:
+        embeddings_file (str): Path to the embeddings CSV or binary `.npy` file
+        column (str): Name of the JSON-encoded embedding column (CSV only)
+        dim (int): Expected embedding dimension (768 for SciBERT)
+        metadata_file (str): Optional processed_articles.json providing titles and domains
+        quantization (str): "float32" (matrix in memory), "float16" or "int8" (quantized copy in
+            memory, full-precision matrix memory-mapped from `rerank_file`)
+        rerank_file (str): `.npy` the full-precision matrix is written to in quantized modes
+        version (int): Incremented every time the file is (re)loaded
+    """
+
+    def __init__(self, embeddings_file, column="hasAbstractEmbedding", dim=768, metadata_file=None,
+                 quantization="float32", rerank_factor=DEFAULT_RERANK_FACTOR, rerank_file=None):
+        """
+        Create the store. Nothing is read until `load()` or `refresh()` is called.
+
+        Args:
+            embeddings_file (str): Path to the embeddings CSV or binary `.npy` file
+            column (str): Embedding column ("hasAbstractEmbedding" or "hasNameEmbedding")
+            dim (int): Expected embedding dimension
+            metadata_file (str, optional): processed_articles.json to load titles/domains from
+            quantization (str): "float32", "float16" or "int8"
+            rerank_factor (int): Candidates re-ranked exactly per requested result in quantized modes
+            rerank_file (str, optional): Full-precision matrix path, defaults to
+                `<embeddings file without extension>.f32.npy`; unused for binary files
+                that are already normalized, which are memory-mapped directly
+        """
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {quantization}")
+        self.embeddings_file = embeddings_file
+        self.column = column
+        self.dim = dim
+        self.metadata_file = metadata_file
+        self.quantization = quantization
+        self.rerank_factor = rerank_factor
+        self.rerank_file = rerank_file or os.path.splitext(embeddings_file)[0] + ".f32.npy"
+        self.version = 0
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._snapshot = EmbeddingSnapshot(np.empty((0, dim), dtype=np.float32), [], {}, 0, None, None)
+
+    def __len__(self):
+        return len(self._snapshot.uris)
+
+    def load(self):
+        """
+        Read the embeddings file into a normalized float32 matrix.
+
+        CSV rows with a missing or malformed embedding are skipped.
+        """
+        with self._lock:
+            self._load_locked(self._file_mtimes())
+
+    def refresh(self):
+        """
+        Reload the store if the embeddings (or metadata) file changed since the last load.
+
+        Returns:
+            bool: True if the store was (re)loaded
+        """
+        try:
+            mtime = self._file_mtimes()
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        with self._lock:
+            if mtime == self._mtime:
+                return False
+            self._load_locked(mtime)
+            return True
+
+    def snapshot(self):
+        """
+        Return a consistent view of the store, loading it on first use.
+
+        Returns:
+            EmbeddingSnapshot: (matrix, uris, uri_index, version, titles, domains);
+            titles and domains are None when no metadata file is configured
+        """
+        self.refresh()
+        return self._snapshot
+
+    @property
+    def signature(self):
+        """Modification time(s) of the loaded files; changes whenever the store reloads."""
+        return self._mtime
+
+    def get_vector(self, uri):
+        """Return the normalized embedding for `uri`, or None if unknown."""
+        snapshot = self.snapshot()
+        row = snapshot.uri_index.get(uri)
+        return None if row is None else snapshot.matrix[row]
+
+    def _file_mtimes(self):
+        if self.metadata_file is None:
+            return os.path.getmtime(self.embeddings_file), None
+        return os.path.getmtime(self.embeddings_file), os.path.getmtime(self.metadata_file)
+
+    def _load_locked(self, mtime):
+        uris, matrix, header = read_embeddings(self.embeddings_file, self.column, self.dim, mmap=True)
+        quantized = None
+        if header is not None and header["normalized"] and self.quantization != "float32":
+            # A normalized binary file already is the memory-mapped full-precision matrix to re-rank against
+            quantized = QuantizedMatrix.from_matrix(matrix, self.quantization, self.rerank_factor)
+        else:
+            # Binary files are memory-mapped read-only; copy them into memory before normalizing
+            matrix = normalize_rows(np.array(matrix, dtype=np.float32, copy=header is not None))
+            if self.quantization != "float32":
+                quantized = QuantizedMatrix.from_matrix(matrix, self.quantization, self.rerank_factor)
+                matrix = self._map_full_precision(matrix)
+
+        titles = domains = None
+        if self.metadata_file is not None:
+            metadata = load_article_metadata(self.metadata_file)
+            titles = [metadata.get(uri, (None, None))[0] for uri in uris]
+            domains = [metadata.get(uri, (None, None))[1] for uri in uris]
+
+        self.version += 1
+        self._mtime = mtime
+        self._snapshot = EmbeddingSnapshot(matrix, uris, {uri: i for i, uri in enumerate(uris)}, self.version,
+                                           titles, domains, quantized)
+        resident = matrix.nbytes if quantized is None else quantized.nbytes
+        print(f"Loaded {len(uris)} embeddings from {self.embeddings_file} (version {self.version}, "
+              f"{self.quantization}, {resident / 2**20:.1f} MiB resident)")
+
+    def _map_full_precision(self, matrix):
+        """Write the normalized matrix to `rerank_file` and return it memory-mapped read-only."""
+        tmp_path = f"{self.rerank_file}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, matrix)
+        os.replace(tmp_path, self.rerank_file)
+        return np.load(self.rerank_file, mmap_mode="r")
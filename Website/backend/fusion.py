@@ -0,0 +1,99 @@
+"""
+Score Fusion for the Recommendation Strategies
+
+Merges the ranked (uri, title, domain, approach, score) lists produced by
+each strategy into one ranking. Candidates are accumulated in a dict keyed
+by URI as each strategy's list arrives, and the final top-k is taken with a
+heap, so no DataFrame is built and no per-group Python callbacks run.
+
+Two fusion methods:
+- "weighted": sum of score x strategy weight (CONTENT_WEIGHT/ONTOLOGY_WEIGHT
+  in the configuration; strategies without a weight count 1.0)
+- "rrf": reciprocal rank fusion, sum of weight / (k + rank) over strategies,
+  which ignores score scales and only uses each strategy's order
+
+Ties are broken by URI so the order is stable between calls (cursor
+pagination relies on this).
+"""
+
+import heapq
+
+FUSION_METHODS = ("weighted", "rrf")
+
+# Standard RRF damping constant
+RRF_K = 60
+
+
+class ScoreFusion:
+    """
+    Incremental fusion of per-strategy ranked lists.
+
+    Attributes:
+        method (str): "weighted" or "rrf"
+        weights (dict): approach label -> weight
+        rrf_k (int): RRF damping constant
+    """
+
+    def __init__(self, method="weighted", weights=None, rrf_k=RRF_K):
+        if method not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method: {method}")
+        self.method = method
+        self.weights = weights or {}
+        self.rrf_k = rrf_k
+        self._candidates = {}  # uri -> [title, domain, approaches, score]
+
+    def __len__(self):
+        return len(self._candidates)
+
+    def add(self, recommendations):
+        """
+        Fold in one strategy's results.
+
+        Args:
+            recommendations (iterable): (uri, title, domain, approach, score) tuples in rank order
+        """
+        for rank, (uri, title, domain, approach, score) in enumerate(recommendations, start=1):
+            weight = self.weights.get(approach, 1.0)
+            contribution = weight * score if self.method == "weighted" else weight / (self.rrf_k + rank)
+            candidate = self._candidates.get(uri)
+            if candidate is None:
+                self._candidates[uri] = [title, domain, {approach}, contribution]
+            else:
+                candidate[2].add(approach)
+                candidate[3] += contribution
+
+    def top(self, top_n=None):
+        """
+        Current fused ranking.
+
+        Args:
+            top_n (int, optional): Keep only the best `top_n` articles
+
+        Returns:
+            list: (uri, title, domain, approaches, score) tuples
+        """
+        items = self._candidates.items()
+        key = lambda item: (-item[1][3], item[0])
+        ranked = sorted(items, key=key) if top_n is None else heapq.nsmallest(top_n, items, key=key)
+        return [(uri, title, domain, ', '.join(sorted(approaches)), float(score))
+                for uri, (title, domain, approaches, score) in ranked]
+
+
+def fuse(strategy_results, top_n=None, method="weighted", weights=None, rrf_k=RRF_K):
+    """
+    Fuse several strategies' ranked lists in one call.
+
+    Args:
+        strategy_results (iterable): One ranked list of (uri, title, domain, approach, score) per strategy
+        top_n (int, optional): Keep only the best `top_n` articles
+        method (str): "weighted" or "rrf"
+        weights (dict, optional): approach label -> weight
+        rrf_k (int): RRF damping constant
+
+    Returns:
+        list: (uri, title, domain, approaches, score) tuples
+    """
+    fusion = ScoreFusion(method, weights, rrf_k)
+    for recommendations in strategy_results:
+        fusion.add(recommendations)
+    return fusion.top(top_n)
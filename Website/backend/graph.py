@@ -0,0 +1,326 @@
+"""
+Shared Neo4j Access Layer for the Scientific Article Recommender
+
+One pooled driver per process, used by the web apps, the recommendation
+engine and the scripts in existing_scripts/, instead of each building its own
+`GraphDatabase.driver` (and connection pool) with its own credentials.
+
+- Pool sizing: `pool_size` and `acquisition_timeout` configure the driver's
+  connection pool. A gate of the same size in front of it hands out
+  sessions, so the time spent waiting for a connection is measured and
+  bounded by the same timeout.
+- Read/write routing: `read()` and READ sessions are routed to followers on
+  a cluster (neo4j:// URI); `write()` and WRITE sessions go to the leader.
+- Session reuse: one `session()` runs any number of queries on one
+  connection, and `write_batches()` sends parameter rows in UNWIND batches
+  over a single session.
+- Metrics: `stats()` reports queries, rows, sessions, time running queries
+  and time waiting for a pooled connection; `write_batches()` batches count
+  as queries, and their parameter rows as `rows_written`.
+
+Results are fetched eagerly: `run` returns the records as a list (with
+`single()`), so row counts and query time cover the whole result.
+
+`GraphPool` and `AsyncGraphPool` take their settings from NEO4J_URI,
+NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE, NEO4J_POOL_SIZE and
+NEO4J_ACQUISITION_TIMEOUT when built with `from_env()`.
+"""
+
+import asyncio
+import contextlib
+import itertools
+import os
+import threading
+import time
+
+from neo4j import GraphDatabase, AsyncGraphDatabase, READ_ACCESS, WRITE_ACCESS
+
+DEFAULT_POOL_SIZE = 50
+# Seconds a session may wait for a free connection
+DEFAULT_ACQUISITION_TIMEOUT = 30.0
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Records(list):
+    """Fetched records of one query."""
+
+    def single(self):
+        """First record, or None if the query returned nothing."""
+        return self[0] if self else None
+
+
+class GraphStats:
+    """Thread-safe counters of one pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.queries = 0
+            self.rows = 0
+            self.rows_written = 0
+            self.sessions = 0
+            self.acquisition_timeouts = 0
+            self.query_seconds = 0.0
+            self.pool_wait_seconds = 0.0
+            self.in_use = 0
+            self.max_in_use = 0
+
+    def record_query(self, rows, seconds):
+        with self._lock:
+            self.queries += 1
+            self.rows += rows
+            self.query_seconds += seconds
+
+    def record_rows_written(self, rows):
+        with self._lock:
+            self.rows_written += rows
+
+    def record_acquire(self, seconds, acquired):
+        with self._lock:
+            self.pool_wait_seconds += seconds
+            if not acquired:
+                self.acquisition_timeouts += 1
+                return
+            self.sessions += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def record_release(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def snapshot(self):
+        """Counters as a dict."""
+        with self._lock:
+            return {
+                "queries": self.queries,
+                "rows": self.rows,
+                "rows_written": self.rows_written,
+                "sessions": self.sessions,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "acquisition_timeouts": self.acquisition_timeouts,
+                "query_seconds": round(self.query_seconds, 6),
+                "pool_wait_seconds": round(self.pool_wait_seconds, 6),
+                "mean_query_ms": round(self.query_seconds / self.queries * 1000, 3) if self.queries else 0.0,
+                "mean_pool_wait_ms": round(self.pool_wait_seconds / self.sessions * 1000, 3) if self.sessions else 0.0,
+            }
+
+
+def _settings_from_env():
+    return dict(
+        uri=os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+        user=os.getenv("NEO4J_USER", "neo4j"),
+        password=os.getenv("NEO4J_PASSWORD", "your_password_here"),
+        database=os.getenv("NEO4J_DATABASE") or None,
+        pool_size=int(os.getenv("NEO4J_POOL_SIZE", DEFAULT_POOL_SIZE)),
+        acquisition_timeout=float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", DEFAULT_ACQUISITION_TIMEOUT)),
+    )
+
+
+def _access_mode(mode):
+    return {"read": READ_ACCESS, "write": WRITE_ACCESS}.get(mode, mode)
+
+
+class GraphSession:
+    """A pooled session whose queries are counted; `run` returns `Records`."""
+
+    def __init__(self, session, stats):
+        self._session = session
+        self._stats = stats
+
+    def run(self, query, parameters=None, **params):
+        start = time.perf_counter()
+        records = Records(self._session.run(query, parameters, **params))
+        self._stats.record_query(len(records), time.perf_counter() - start)
+        return records
+
+    def execute_read(self, fn, *args, **kwargs):
+        """Run `fn(tx, ...)` in a retried read transaction."""
+        return self._session.execute_read(lambda tx: fn(GraphSession(tx, self._stats), *args, **kwargs))
+
+    def execute_write(self, fn, *args, **kwargs):
+        """Run `fn(tx, ...)` in a retried write transaction."""
+        return self._session.execute_write(lambda tx: fn(GraphSession(tx, self._stats), *args, **kwargs))
+
+
+def _run_batch(tx, query, rows):
+    return tx.run(query, rows=rows)
+
+
+class GraphPool:
+    """
+    Pooled, instrumented access to one Neo4j database.
+
+    Attributes:
+        driver: Underlying neo4j.Driver
+        pool_size (int): Maximum connections (and concurrent sessions)
+        acquisition_timeout (float): Seconds a session waits for a connection
+        database (str): Database name, or None for the server default
+        stats (GraphStats): Counters
+    """
+
+    def __init__(self, uri, user, password, database=None, pool_size=DEFAULT_POOL_SIZE,
+                 acquisition_timeout=DEFAULT_ACQUISITION_TIMEOUT):
+        """
+        Args:
+            uri (str): Neo4j URI (bolt:// for one server, neo4j:// for routing)
+            user (str): Neo4j username
+            password (str): Neo4j password
+            database (str, optional): Database name
+            pool_size (int): Maximum connections
+            acquisition_timeout (float): Seconds to wait for a free connection
+        """
+        self.driver = GraphDatabase.driver(
+            uri, auth=(user, password), max_connection_pool_size=pool_size,
+            connection_acquisition_timeout=acquisition_timeout
+        )
+        self.pool_size = pool_size
+        self.acquisition_timeout = acquisition_timeout
+        self.database = database
+        self.stats = GraphStats()
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    @classmethod
+    def from_env(cls):
+        """Build from the NEO4J_* environment variables."""
+        return cls(**_settings_from_env())
+
+    @contextlib.contextmanager
+    def session(self, access_mode="write", **config):
+        """
+        Open a pooled session; run as many queries on it as needed.
+
+        Args:
+            access_mode (str): "read" or "write" (routing on a cluster)
+            **config: Extra neo4j session configuration (e.g. default_access_mode)
+
+        Raises:
+            TimeoutError: If no connection frees up within `acquisition_timeout`
+        """
+        start = time.perf_counter()
+        acquired = self._slots.acquire(timeout=self.acquisition_timeout)
+        self.stats.record_acquire(time.perf_counter() - start, acquired)
+        if not acquired:
+            raise TimeoutError(f"No Neo4j connection available after {self.acquisition_timeout}s")
+        try:
+            config.setdefault("default_access_mode", _access_mode(access_mode))
+            with self.driver.session(database=self.database, **config) as session:
+                yield GraphSession(session, self.stats)
+        finally:
+            self.stats.record_release()
+            self._slots.release()
+
+    def read(self, query, **params):
+        """Run one read query and return its records."""
+        with self.session("read") as session:
+            return session.run(query, **params)
+
+    def write(self, query, **params):
+        """Run one write query and return its records."""
+        with self.session("write") as session:
+            return session.run(query, **params)
+
+    def write_batches(self, query, rows, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Run a write query over many parameter rows in UNWIND batches on one session.
+
+        Args:
+            query (str): Cypher using `$rows` (e.g. "UNWIND $rows AS row MATCH ... SET ...")
+            rows (iterable): Parameter dicts, consumed one batch at a time (a generator is never materialized)
+            batch_size (int): Rows per transaction
+
+        Returns:
+            int: Number of rows sent
+        """
+        rows = iter(rows)
+        sent = 0
+        with self.session("write") as session:
+            while True:
+                batch = list(itertools.islice(rows, batch_size))
+                if not batch:
+                    break
+                # The session is a GraphSession, so each batch is counted and timed as a query
+                session.execute_write(_run_batch, query, batch)
+                self.stats.record_rows_written(len(batch))
+                sent += len(batch)
+        return sent
+
+    def close(self):
+        """Close every pooled connection."""
+        self.driver.close()
+
+
+class AsyncGraphSession:
+    """`GraphSession` for the async driver."""
+
+    def __init__(self, session, stats):
+        self._session = session
+        self._stats = stats
+
+    async def run(self, query, parameters=None, **params):
+        start = time.perf_counter()
+        result = await self._session.run(query, parameters, **params)
+        records = Records([record async for record in result])
+        self._stats.record_query(len(records), time.perf_counter() - start)
+        return records
+
+
+class AsyncGraphPool:
+    """
+    `GraphPool` on neo4j.AsyncGraphDatabase, for the ASGI app.
+
+    Create it inside the running event loop.
+    """
+
+    def __init__(self, uri, user, password, database=None, pool_size=DEFAULT_POOL_SIZE,
+                 acquisition_timeout=DEFAULT_ACQUISITION_TIMEOUT):
+        self.driver = AsyncGraphDatabase.driver(
+            uri, auth=(user, password), max_connection_pool_size=pool_size,
+            connection_acquisition_timeout=acquisition_timeout
+        )
+        self.pool_size = pool_size
+        self.acquisition_timeout = acquisition_timeout
+        self.database = database
+        self.stats = GraphStats()
+        self._slots = asyncio.BoundedSemaphore(pool_size)
+
+    @classmethod
+    def from_env(cls):
+        """Build from the NEO4J_* environment variables."""
+        return cls(**_settings_from_env())
+
+    @contextlib.asynccontextmanager
+    async def session(self, access_mode="write", **config):
+        """Async `GraphPool.session`."""
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.acquisition_timeout)
+        except asyncio.TimeoutError:
+            self.stats.record_acquire(time.perf_counter() - start, False)
+            raise TimeoutError(f"No Neo4j connection available after {self.acquisition_timeout}s")
+        self.stats.record_acquire(time.perf_counter() - start, True)
+        try:
+            config.setdefault("default_access_mode", _access_mode(access_mode))
+            async with self.driver.session(database=self.database, **config) as session:
+                yield AsyncGraphSession(session, self.stats)
+        finally:
+            self.stats.record_release()
+            self._slots.release()
+
+    async def read(self, query, **params):
+        """Run one read query and return its records."""
+        async with self.session("read") as session:
+            return await session.run(query, **params)
+
+    async def write(self, query, **params):
+        """Run one write query and return its records."""
+        async with self.session("write") as session:
+            return await session.run(query, **params)
+
+    async def close(self):
+        """Close every pooled connection."""
+        await self.driver.close()
@@ -0,0 +1,139 @@
+"""
+Concept Label Index for the Scientific Article Recommender
+
+Resolves a free-text topic to Concept URIs in-process, replacing Cypher
+`WHERE toLower(c.skos__prefLabel) CONTAINS toLower($topic)` scans over every
+Concept node. Queries then match concepts by URI with `UNWIND $uris`.
+
+Supported lookups:
+- substring: same semantics as the Cypher CONTAINS filter
+- prefix: labels starting with the query (sorted labels + binary search)
+- tokens: labels containing every word of the query (inverted token index)
+
+The index is built from the Concept nodes in Neo4j or from
+`processed_concepts.json`. Concepts only change on import, so it is built
+once and reused.
+"""
+
+import bisect
+import re
+
+import numpy as np
+import pandas as pd
+
+from .metadata import ONTOLOGY_NS
+
+_TOKEN_RE = re.compile(r"\w+")
+_SEPARATOR = "\x00"
+
+
+class ConceptLabelIndex:
+    """
+    In-memory index over concept preferred labels.
+
+    Attributes:
+        uris (list): Concept URIs, position = concept id inside the index
+        labels (list): Original preferred labels
+    """
+
+    def __init__(self, uris, labels):
+        """
+        Build the index.
+
+        Args:
+            uris (list): Concept URIs
+            labels (list): Preferred label of each concept (None/empty allowed)
+        """
+        self.uris = list(uris)
+        self.labels = [str(label) if label is not None else "" for label in labels]
+        self._positions = {uri: i for i, uri in enumerate(self.uris)}
+        lowered = [label.lower() for label in self.labels]
+
+        # All labels in one string so substring search is a handful of str.find calls
+        self._blob = _SEPARATOR + _SEPARATOR.join(lowered) + _SEPARATOR
+        lengths = np.fromiter((len(label) + 1 for label in lowered), dtype=np.int64, count=len(lowered))
+        self._starts = np.concatenate(([1], 1 + np.cumsum(lengths)[:-1])) if len(lowered) else np.zeros(0, dtype=np.int64)
+
+        self._sorted = sorted((label, i) for i, label in enumerate(lowered))
+        self._sorted_labels = [label for label, _ in self._sorted]
+
+        self._tokens = {}
+        for i, label in enumerate(lowered):
+            for token in set(_TOKEN_RE.findall(label)):
+                self._tokens.setdefault(token, []).append(i)
+
+    def __len__(self):
+        return len(self.uris)
+
+    @classmethod
+    def from_neo4j(cls, graph):
+        """Build the index from every Concept node in the graph (`graph` is a GraphPool)."""
+        with graph.session("read") as session:
+            result = session.run("MATCH (c:Concept) RETURN c.uri AS uri, c.skos__prefLabel AS label")
+            rows = [(record["uri"], record["label"]) for record in result]
+        return cls([uri for uri, _ in rows], [label for _, label in rows])
+
+    @classmethod
+    def from_concepts_file(cls, concepts_file):
+        """Build the index from processed_concepts.json (URIs derived as in the import script)."""
+        concepts = pd.read_json(concepts_file)
+        uris = [ONTOLOGY_NS + re.sub(r'\W+', '_', str(c_id)) for c_id in concepts["id"]]
+        return cls(uris, [name if isinstance(name, str) else "" for name in concepts["name"]])
+
+    def substring(self, query):
+        """URIs of concepts whose label contains `query` (case-insensitive), in index order."""
+        return [self.uris[i] for i in self._substring_ids(query)]
+
+    def _substring_ids(self, query):
+        query = query.lower()
+        if not query:
+            return list(range(len(self.uris)))
+        if _SEPARATOR in query:
+            return []
+        ids = set()
+        find = self._blob.find
+        pos = find(query)
+        while pos != -1:
+            i = int(np.searchsorted(self._starts, pos, side="right")) - 1
+            ids.add(i)
+            # Continue after the end of this label, each concept is reported once
+            pos = find(query, self._starts[i + 1] if i + 1 < len(self._starts) else len(self._blob))
+        return sorted(ids)
+
+    def prefix(self, query):
+        """URIs of concepts whose label starts with `query` (case-insensitive), in label order."""
+        query = query.lower()
+        uris = []
+        pos = bisect.bisect_left(self._sorted_labels, query)
+        while pos < len(self._sorted) and self._sorted_labels[pos].startswith(query):
+            uris.append(self.uris[self._sorted[pos][1]])
+            pos += 1
+        return uris
+
+    def tokens(self, query):
+        """URIs of concepts whose label contains every word of `query`, in index order."""
+        words = set(_TOKEN_RE.findall(query.lower()))
+        if not words:
+            return []
+        postings = sorted((self._tokens.get(word, []) for word in words), key=len)
+        ids = set(postings[0])
+        for posting in postings[1:]:
+            ids.intersection_update(posting)
+        return [self.uris[i] for i in sorted(ids)]
+
+    def best_match(self, query):
+        """
+        Single best concept for `query`: an exact label match, else the shortest label containing it.
+
+        Returns:
+            str: Concept URI, or None if nothing matches
+        """
+        ids = self._substring_ids(query)
+        if not ids:
+            return None
+        return self.uris[min(ids, key=lambda i: len(self.labels[i]))]
+
+    def label(self, uri):
+        """Preferred label of a concept URI, or None."""
+        i = self._positions.get(uri)
+        return None if i is None else self.labels[i]
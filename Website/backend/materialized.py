@@ -0,0 +1,222 @@
+"""
+Materialized Per-User Recommendations for the Scientific Article Recommender
+
+Most users' personalized lists only change when their interests (or the
+article embeddings) change, so `existing_scripts/materialize_recommendations.py`
+precomputes every user's top-N offline and saves them in one compact `.npz`:
+flat arrays of article ids, scores and approach labels with per-user offsets,
+plus one table of the distinct URIs, titles and domains. Serving a user is a
+dict lookup and a slice of at most top-N rows.
+
+Every file carries a version stamp (build time, topic, search query, top-N and
+the embeddings file's modification time) and a fingerprint of each user's
+profile vector. A stored list is only served while it still matches:
+
+- same topic and search query as the request, and long enough for its top-N
+- built from the current embeddings file and not older than `max_age`
+- the user's current profile has the fingerprint it was built with, and the
+  user was not invalidated (`discard`) since the file was loaded
+
+Anything else (stale or cold-start users) falls back to live computation.
+Other processes pick up a rewritten file through `refresh()`.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+MATERIALIZED_FILE = "data/materialized_recommendations.npz"
+
+
+def _pack(strings, separator="\x00"):
+    return np.frombuffer(separator.join(strings).encode(), dtype=np.uint8)
+
+
+def _unpack(array, separator="\x00"):
+    return array.tobytes().decode().split(separator) if array.size else []
+
+
+def profile_fingerprint(profile):
+    """
+    Stable 64-bit fingerprint of a profile vector.
+
+    Rounded first, so profiles recomputed in another process (with float sums
+    in another order) still match.
+    """
+    rounded = np.round(np.asarray(profile, dtype=np.float32), 4) + 0.0  # + 0.0 folds -0.0 into 0.0
+    return int.from_bytes(hashlib.blake2b(rounded.tobytes(), digest_size=8).digest(), "little")
+
+
+class MaterializedRecommendations:
+    """
+    Precomputed fused rankings keyed by user id.
+
+    Attributes:
+        path (str): `.npz` file the rankings are persisted to
+        meta (dict): Version stamp: version, created_at, topic, search_query, top_n, embeddings_mtime
+    """
+
+    def __init__(self, path=MATERIALIZED_FILE):
+        self.path = path
+        self.meta = {}
+        self._rows = {}  # user id -> row
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._fingerprints = np.zeros(0, dtype=np.uint64)
+        self._items = np.zeros(0, dtype=np.int32)
+        self._scores = np.zeros(0, dtype=np.float32)
+        self._approaches = np.zeros(0, dtype=np.int16)
+        self._uris, self._titles, self._domains, self._labels = [], [], [], []
+        self._discarded = set()
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, user_id):
+        return user_id in self._rows
+
+    @classmethod
+    def build(cls, path, recommendations, fingerprints, topic, search_query, top_n, embeddings_mtime=None):
+        """
+        Pack rankings into a store (call `save()` to persist it).
+
+        Args:
+            path (str): Output `.npz` path
+            recommendations (dict): user_id -> ranked (uri, title, domain, approaches, score) tuples
+            fingerprints (dict): user_id -> `profile_fingerprint` of the profile the ranking used
+            topic (str): Topic the rankings were computed for
+            search_query (str): Search query the rankings were computed for
+            top_n (int): Results requested per user
+            embeddings_mtime (float, optional): Modification time of the article embeddings file
+
+        Returns:
+            MaterializedRecommendations: The packed store
+        """
+        store = cls(path)
+        uri_ids, label_ids = {}, {}
+        offsets, items, scores, approaches = [0], [], [], []
+        for user_id, recs in recommendations.items():
+            for uri, title, domain, approach, score in recs:
+                if uri not in uri_ids:
+                    uri_ids[uri] = len(store._uris)
+                    store._uris.append(uri)
+                    store._titles.append(str(title or ""))
+                    store._domains.append(str(domain or ""))
+                items.append(uri_ids[uri])
+                scores.append(score)
+                approaches.append(label_ids.setdefault(approach, len(label_ids)))
+            offsets.append(len(items))
+        store._labels = list(label_ids)
+        store._rows = {user_id: row for row, user_id in enumerate(recommendations)}
+        store._offsets = np.array(offsets, dtype=np.int64)
+        store._fingerprints = np.array([fingerprints[user_id] for user_id in recommendations], dtype=np.uint64)
+        store._items = np.array(items, dtype=np.int32)
+        store._scores = np.array(scores, dtype=np.float32)
+        store._approaches = np.array(approaches, dtype=np.int16)
+        created_at = time.time()
+        store.meta = {
+            "version": time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(created_at)),
+            "created_at": created_at,
+            "topic": topic,
+            "search_query": search_query,
+            "top_n": top_n,
+            "embeddings_mtime": embeddings_mtime,
+        }
+        return store
+
+    def load(self):
+        """Read the persisted rankings, replacing the in-memory ones."""
+        with self._lock:
+            mtime = os.path.getmtime(self.path)
+            data = np.load(self.path)
+            self.meta = json.loads(data["meta"].tobytes().decode())
+            self._rows = {user_id: row for row, user_id in enumerate(_unpack(data["user_ids"], "\n"))}
+            self._offsets = data["offsets"]
+            self._fingerprints = data["fingerprints"]
+            self._items = data["items"]
+            self._scores = data["scores"]
+            self._approaches = data["approaches"]
+            self._uris = _unpack(data["uris"])
+            self._titles = _unpack(data["titles"])
+            self._domains = _unpack(data["domains"])
+            self._labels = _unpack(data["labels"])
+            self._discarded = set()
+            self._mtime = mtime
+
+    def refresh(self):
+        """
+        Reload if the file was rewritten (e.g. by the nightly job).
+
+        Returns:
+            bool: True if the store was reloaded
+        """
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self.load()
+        return True
+
+    def save(self):
+        """Persist the rankings atomically (written to a temporary file, then renamed)."""
+        with self._lock:
+            user_ids = sorted(self._rows, key=self._rows.get)
+            tmp_path = self.path + ".tmp.npz"
+            np.savez(tmp_path, meta=_pack([json.dumps(self.meta)]), user_ids=_pack(user_ids, "\n"),
+                     offsets=self._offsets, fingerprints=self._fingerprints, items=self._items,
+                     scores=self._scores, approaches=self._approaches, uris=_pack(self._uris),
+                     titles=_pack(self._titles), domains=_pack(self._domains), labels=_pack(self._labels))
+            os.replace(tmp_path, self.path)
+            self._mtime = os.path.getmtime(self.path)
+
+    def get(self, user_id, topic, search_query, top_n, fingerprint, embeddings_mtime=None, max_age=None):
+        """
+        Return a user's precomputed ranking if it is still valid for this request.
+
+        Args:
+            user_id (str): User identifier
+            topic (str): Requested topic
+            search_query (str): Requested search query
+            top_n (int): Requested number of results, None for all
+            fingerprint (int): `profile_fingerprint` of the user's current profile
+            embeddings_mtime (float, optional): Current modification time of the embeddings file
+            max_age (float, optional): Maximum age of the file in seconds
+
+        Returns:
+            list: (uri, title, domain, approaches, score) tuples, or None if the
+            user is unknown or the stored list is stale or too short
+        """
+        with self._lock:
+            row = self._rows.get(user_id)
+            meta = self.meta
+            if row is None or user_id in self._discarded:
+                return None
+            if meta["topic"] != topic or meta["search_query"] != search_query:
+                return None
+            if max_age is not None and time.time() - meta["created_at"] > max_age:
+                return None
+            if embeddings_mtime is not None and meta["embeddings_mtime"] not in (None, embeddings_mtime):
+                return None
+            if int(self._fingerprints[row]) != fingerprint:
+                return None
+            start, end = int(self._offsets[row]), int(self._offsets[row + 1])
+            # A list shorter than the stored top-N holds every candidate the user has
+            complete = meta["top_n"] is None or end - start < meta["top_n"]
+            if not complete and (top_n is None or top_n > end - start):
+                return None
+            if top_n is not None:
+                end = min(end, start + top_n)
+            return [(self._uris[item], self._titles[item], self._domains[item], self._labels[approach], float(score))
+                    for item, approach, score in zip(self._items[start:end], self._approaches[start:end], self._scores[start:end])]
+
+    def discard(self, user_id):
+        """Stop serving a user's stored list (e.g. after their interests changed) until the next file."""
+        with self._lock:
+            self._discarded.add(user_id)
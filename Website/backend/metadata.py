@@ -0,0 +1,81 @@
+"""
+Article Metadata Resolution for the Scientific Article Recommender
+
+After scoring, the recommendation strategies only hold article URIs. This
+module turns a list of URIs into (title, domain) pairs without issuing one
+Neo4j query per article:
+
+- `fetch_work_metadata` resolves any number of URIs in a single
+  parameterized `UNWIND` round-trip (`fetch_work_metadata_async` does the
+  same on the AsyncGraphPool).
+- `load_article_metadata` reads `processed_articles.json` so the embedding
+  store can keep titles and domains in-process next to the vectors.
+"""
+
+import re
+
+import pandas as pd
+
+ONTOLOGY_NS = "http://www.semanticweb.org/vss/ontology/scientific_recommender#"
+
+WORK_METADATA_QUERY = """
+    UNWIND $uris AS uri
+    MATCH (w:Work {uri: uri})
+    RETURN w.uri AS uri, w.hasTitle AS title, w.domain AS domain
+"""
+
+
+def work_uri(openalex_id):
+    """Build the ontology URI of a Work the same way the import scripts do."""
+    return ONTOLOGY_NS + re.sub(r'\W+', '_', str(openalex_id))
+
+
+def fetch_work_metadata(graph, uris):
+    """
+    Fetch title and domain for many Works in one round-trip.
+
+    Args:
+        graph (GraphPool): Shared Neo4j access layer
+        uris (list): Work URIs to resolve
+
+    Returns:
+        dict: uri -> (title, domain) for every URI found in the graph
+    """
+    if not uris:
+        return {}
+    records = graph.read(WORK_METADATA_QUERY, uris=list(uris))
+    return {record["uri"]: (record["title"], record["domain"]) for record in records}
+
+
+async def fetch_work_metadata_async(graph, uris):
+    """
+    `fetch_work_metadata` on the async driver.
+
+    Args:
+        graph (AsyncGraphPool): Async Neo4j access layer
+        uris (list): Work URIs to resolve
+
+    Returns:
+        dict: uri -> (title, domain) for every URI found in the graph
+    """
+    if not uris:
+        return {}
+    records = await graph.read(WORK_METADATA_QUERY, uris=list(uris))
+    return {record["uri"]: (record["title"], record["domain"]) for record in records}
+
+
+def load_article_metadata(articles_file):
+    """
+    Read titles and domains from the processed articles export.
+
+    Args:
+        articles_file (str): Path to processed_articles.json
+
+    Returns:
+        dict: uri -> (title, domain)
+    """
+    articles = pd.read_json(articles_file)
+    metadata = {}
+    for openalex_id, title, domain in zip(articles["id"], articles["title"], articles["domain"]):
+        metadata[work_uri(openalex_id)] = (str(title or ""), str(domain or ""))
+    return metadata
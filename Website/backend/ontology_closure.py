@@ -0,0 +1,192 @@
+"""
+Ontology Closure Index for the Scientific Article Recommender
+
+Precomputes the transitive closure of the `isSubclassOf` concept hierarchy so
+that query-time expansion (`(c)-[:isSubclassOf*0..2]->(related)`) and the
+super/subclass walk of `/concept_search` become in-process array lookups.
+
+For every concept the index stores its ancestors and descendants with their
+distance, in CSR form (offsets + int32 concept ids + uint8 depths). The
+closure is computed by repeated sparse products of the parent matrix, one
+hierarchy level per step, and cycles in the imported data are harmless.
+
+The hierarchy only changes on import: `import_data_to_neo4j.py` saves the
+index as `.npz` after populating the graph, and it can be rebuilt from Neo4j
+(plus `rdfs:subClassOf` axioms from `scientific_recommender.owl`) at any time.
+"""
+
+import xml.etree.ElementTree as ET
+
+import numpy as np
+from scipy import sparse
+
+from .metadata import ONTOLOGY_NS
+
+# Depths are stored as uint8
+MAX_DEPTH = 255
+
+_RDF = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}"
+_RDFS = "{http://www.w3.org/2000/01/rdf-schema#}"
+
+
+class OntologyClosure:
+    """
+    Ancestors and descendants of every concept, with depth.
+
+    Attributes:
+        uris (list): Concept URIs, position = concept id inside the index
+        ancestors (scipy.sparse.csr_matrix): concept x concept, value = depth of the ancestor
+        descendants (scipy.sparse.csr_matrix): transpose of `ancestors`
+    """
+
+    def __init__(self, uris, ancestors):
+        self.uris = list(uris)
+        self._positions = {uri: i for i, uri in enumerate(self.uris)}
+        self.ancestors = ancestors.tocsr()
+        self.ancestors.sort_indices()
+        self.descendants = self.ancestors.T.tocsr()
+        self.descendants.sort_indices()
+
+    def __len__(self):
+        return len(self.uris)
+
+    @classmethod
+    def build(cls, edges, max_depth=MAX_DEPTH):
+        """
+        Compute the closure of a set of subclass edges.
+
+        Args:
+            edges (iterable): (child_uri, parent_uri) pairs
+            max_depth (int): Longest path followed (at most MAX_DEPTH)
+
+        Returns:
+            OntologyClosure: The index
+        """
+        uris, positions = [], {}
+        children, parents = [], []
+        for child, parent in edges:
+            if child == parent:
+                continue
+            for uri in (child, parent):
+                if uri not in positions:
+                    positions[uri] = len(uris)
+                    uris.append(uri)
+            children.append(positions[child])
+            parents.append(positions[parent])
+
+        n = len(uris)
+        step = sparse.csr_matrix((np.ones(len(children), dtype=np.float32), (children, parents)), shape=(n, n))
+        step.sum_duplicates()
+        step.data[:] = 1
+
+        # Breadth-first over all concepts at once: frontier @ step reaches the next level up
+        reached = sparse.identity(n, dtype=np.float32, format="csr")
+        depths = sparse.csr_matrix((n, n), dtype=np.uint8)
+        frontier = step
+        for depth in range(1, min(max_depth, MAX_DEPTH) + 1):
+            # Drop pairs reached at a shorter distance (and paths back to the concept itself)
+            frontier = frontier - frontier.multiply(reached)
+            frontier.eliminate_zeros()
+            if frontier.nnz == 0:
+                break
+            frontier.data[:] = 1
+            reached = reached + frontier
+            depths = depths + (frontier * depth).astype(np.uint8)
+            frontier = frontier @ step
+        return cls(uris, depths)
+
+    @classmethod
+    def from_neo4j(cls, graph, owl_file=None):
+        """Build from the isSubclassOf edges in the graph, plus subclass axioms of an OWL file if given."""
+        with graph.session("read") as session:
+            result = session.run(
+                "MATCH (c:Concept)-[:isSubclassOf]->(p:Concept) RETURN c.uri AS child, p.uri AS parent"
+            )
+            edges = [(record["child"], record["parent"]) for record in result]
+        if owl_file:
+            edges.extend(read_owl_subclass_edges(owl_file))
+        return cls.build(edges)
+
+    def save(self, path):
+        """Write the index to an `.npz` file."""
+        np.savez(path, uris=np.frombuffer("\n".join(self.uris).encode(), dtype=np.uint8),
+                 offsets=self.ancestors.indptr, ids=self.ancestors.indices,
+                 depths=self.ancestors.data.astype(np.uint8))
+
+    @classmethod
+    def load(cls, path):
+        """Read an index written by `save()`."""
+        data = np.load(path)
+        uris = data["uris"].tobytes().decode().split("\n") if data["uris"].size else []
+        ancestors = sparse.csr_matrix((data["depths"], data["ids"], data["offsets"]), shape=(len(uris), len(uris)))
+        return cls(uris, ancestors)
+
+    def _related(self, matrix, uri, max_depth=None):
+        i = self._positions.get(uri)
+        if i is None:
+            return []
+        start, end = matrix.indptr[i], matrix.indptr[i + 1]
+        ids, depths = matrix.indices[start:end], matrix.data[start:end]
+        if max_depth is not None:
+            keep = depths <= max_depth
+            ids, depths = ids[keep], depths[keep]
+        order = np.lexsort((ids, depths))
+        return [(self.uris[ids[j]], int(depths[j])) for j in order]
+
+    def ancestors_of(self, uri, max_depth=None):
+        """(uri, depth) pairs of the superclasses of `uri`, nearest first."""
+        return self._related(self.ancestors, uri, max_depth)
+
+    def descendants_of(self, uri, max_depth=None):
+        """(uri, depth) pairs of the subclasses of `uri`, nearest first."""
+        return self._related(self.descendants, uri, max_depth)
+
+    def expand(self, uris, max_depth=2, decay=0.5, direction="ancestors"):
+        """
+        Expand concepts along the hierarchy with a per-level weight decay.
+
+        A concept reached at depth d gets weight decay ** d; a concept reached
+        from several sources keeps its best weight. Input concepts weigh 1.0,
+        including those unknown to the hierarchy.
+
+        Args:
+            uris (iterable): Concept URIs
+            max_depth (int): Levels to follow
+            decay (float): Weight multiplier per level
+            direction (str): "ancestors" (superclasses), "descendants" or "both"
+
+        Returns:
+            list: (uri, weight) pairs by descending weight, then URI
+        """
+        weights = {uri: 1.0 for uri in uris}
+        matrices = {"ancestors": [self.ancestors], "descendants": [self.descendants],
+                    "both": [self.ancestors, self.descendants]}[direction]
+        for uri in list(weights):
+            for matrix in matrices:
+                for related, depth in self._related(matrix, uri, max_depth):
+                    weight = decay ** depth
+                    if weight > weights.get(related, 0.0):
+                        weights[related] = weight
+        return sorted(weights.items(), key=lambda item: (-item[1], item[0]))
+
+
+def read_owl_subclass_edges(owl_file):
+    """
+    (child_uri, parent_uri) pairs from `rdfs:subClassOf` and `isSubclassOf` statements of an RDF/XML file.
+
+    Subclasses of owl:Thing are skipped.
+    """
+    edges = []
+    for element in ET.parse(owl_file).getroot():
+        about = element.get(_RDF + "about")
+        if about is None:
+            continue
+        child = ONTOLOGY_NS + about[1:] if about.startswith("#") else about
+        for prop in element:
+            if prop.tag not in (_RDFS + "subClassOf", "{" + ONTOLOGY_NS + "}isSubclassOf"):
+                continue
+            parent = prop.get(_RDF + "resource")
+            if parent is None or parent.endswith("owl#Thing"):
+                continue
+            edges.append((child, ONTOLOGY_NS + parent[1:] if parent.startswith("#") else parent))
+    return edges
@@ -0,0 +1,140 @@
+"""
+Cursor Pagination for the Recommendation Endpoints
+
+`/search` and `/recommend` return a page of results plus an opaque
+`next_cursor`. The cursor encodes the offset into the fused, score-ordered
+result list; the extra row of each request tells whether another page exists.
+
+The first page asks the engine for `limit + 1` results, so each strategy only
+computes the top-N the page needs. Later pages all ask for MAX_DEPTH results:
+they are slices of one fused ranking (a single cache entry), so they neither
+repeat nor skip results among themselves, and cursors past MAX_DEPTH are
+rejected. The tradeoff: a shallow ranking can order its top results
+differently from the deep one, so the second page may repeat or miss an
+article near the first page's boundary.
+
+In streaming mode the page is re-sent as newline-delimited JSON each time the
+ranking is refined, followed by a final line carrying `next_cursor`.
+"""
+
+import base64
+import json
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# Results ranked per request; pages are slices of this one ranking
+MAX_DEPTH = 200
+
+
+def encode_cursor(offset):
+    """Encode a result offset as an opaque URL-safe cursor."""
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): Cursor from a previous response, or None/"" for the first page
+
+    Returns:
+        int: Offset of the first result of the page
+
+    Raises:
+        ValueError: If the cursor is malformed or points past MAX_DEPTH
+    """
+    if not cursor:
+        return 0
+    try:
+        offset = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())["offset"]
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(offset, int) or isinstance(offset, bool) or not 0 <= offset < MAX_DEPTH:
+        raise ValueError("Invalid cursor")
+    return offset
+
+
+def results_needed(offset, limit):
+    """
+    Results to request from the engine for a page, one more than it shows to detect a next page.
+
+    The first page fetches only `limit + 1`; later pages share one MAX_DEPTH ranking.
+    """
+    return limit + 1 if offset == 0 else MAX_DEPTH
+
+
+def parse_page_args(data):
+    """
+    Read `limit` and `cursor` from a request payload.
+
+    Args:
+        data (dict): JSON request body
+
+    Returns:
+        tuple: (limit, offset)
+
+    Raises:
+        ValueError: If limit or cursor is invalid
+    """
+    try:
+        limit = int(data.get('limit', DEFAULT_LIMIT))
+    except (TypeError, ValueError):
+        raise ValueError("Invalid limit")
+    if limit < 1:
+        raise ValueError("Invalid limit")
+    return min(limit, MAX_LIMIT), decode_cursor(data.get('cursor'))
+
+
+def page_response(recommendations, offset, limit):
+    """
+    Slice one page out of a ranked result list.
+
+    Args:
+        recommendations (list): Ranked results, at least `offset + limit + 1` long if more pages exist
+        offset (int): Offset of the page
+        limit (int): Page size
+
+    Returns:
+        dict: {"results": [...], "next_cursor": str or None}
+    """
+    end = offset + limit
+    return {
+        "results": recommendations[offset:end],
+        "next_cursor": encode_cursor(end) if len(recommendations) > end else None
+    }
+
+
+def stream_pages(rankings, offset, limit):
+    """
+    Turn successive rankings into NDJSON lines of the same page.
+
+    Args:
+        rankings (iterable): (stage, ranked results) pairs, e.g. from
+            `RecommendationEngine.stream_recommendations`
+        offset (int): Offset of the page
+        limit (int): Page size
+
+    Yields:
+        str: One JSON object per line; `done` is true on the last one
+    """
+    recommendations = []
+    try:
+        for stage, recommendations in rankings:
+            yield json.dumps({"stage": stage, "results": recommendations[offset:offset + limit], "done": False}) + "\n"
+    except Exception as e:
+        yield json.dumps({"error": str(e), "done": True}) + "\n"
+        return
+    yield json.dumps({**page_response(recommendations, offset, limit), "done": True}) + "\n"
+
+
+async def stream_pages_async(rankings, offset, limit):
+    """`stream_pages` over an async iterable of (stage, ranked results) pairs."""
+    recommendations = []
+    try:
+        async for stage, recommendations in rankings:
+            yield json.dumps({"stage": stage, "results": recommendations[offset:offset + limit], "done": False}) + "\n"
+    except Exception as e:
+        yield json.dumps({"error": str(e), "done": True}) + "\n"
+        return
+    yield json.dumps({**page_response(recommendations, offset, limit), "done": True}) + "\n"
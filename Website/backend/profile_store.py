@@ -0,0 +1,186 @@
+"""
+User Profile Vector Store for the Scientific Article Recommender
+
+A user's content profile is the mean of the SciBERT name embeddings of the
+concepts they have a `hasInterest` edge to, L2-normalized. Instead of fetching
+those embeddings from Neo4j and averaging them on every request, profiles are
+kept pre-normalized in one dense float32 matrix (one row per user) and
+persisted as `.npz` next to the article embeddings.
+
+Profiles are recomputed incrementally: `recompute(graph, user_ids)` refreshes
+only the given users (one UNWIND query), `recompute(graph)` rebuilds all of
+them. Other processes pick up a rewritten file through `refresh()`, like the
+article EmbeddingStore.
+
+Users with no embedded interests are stored as a zero row, so "known to have
+no profile" is distinguishable from "not computed yet" (None).
+"""
+
+import os
+import threading
+
+import numpy as np
+
+from .embedding_store import normalize_vector
+
+USER_PROFILES_FILE = "data/embeddings/user_profiles.npz"
+
+
+class UserProfileStore:
+    """
+    Dense, pre-normalized user profile vectors keyed by user id.
+
+    Attributes:
+        path (str): `.npz` file the profiles are persisted to
+        dim (int): Embedding dimension
+        version (int): Incremented whenever a profile changes or the file is reloaded
+    """
+
+    def __init__(self, path=USER_PROFILES_FILE, dim=768):
+        self.path = path
+        self.dim = dim
+        self.version = 0
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._rows = {}  # user id -> row
+        self._free = []  # rows released by discard()
+        self._mtime = None
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, user_id):
+        return user_id in self._rows
+
+    def load(self):
+        """Read the persisted profiles, replacing the in-memory ones."""
+        with self._lock:
+            mtime = os.path.getmtime(self.path)
+            data = np.load(self.path)
+            user_ids = data["user_ids"].tobytes().decode().split("\n") if data["user_ids"].size else []
+            self._matrix = data["matrix"].astype(np.float32, copy=False)
+            self._rows = {user_id: row for row, user_id in enumerate(user_ids)}
+            self._free = []
+            self._mtime = mtime
+            self.version += 1
+
+    def refresh(self):
+        """
+        Reload if the profile file was rewritten (e.g. by another process).
+
+        Returns:
+            bool: True if the store was reloaded
+        """
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self.load()
+        return True
+
+    def save(self):
+        """Persist the profiles atomically (written to a temporary file, then renamed)."""
+        with self._lock:
+            user_ids = sorted(self._rows, key=self._rows.get)
+            matrix = self._matrix[[self._rows[user_id] for user_id in user_ids]]
+            tmp_path = self.path + ".tmp.npz"
+            np.savez(tmp_path, matrix=matrix,
+                     user_ids=np.frombuffer("\n".join(user_ids).encode(), dtype=np.uint8))
+            os.replace(tmp_path, self.path)
+            self._mtime = os.path.getmtime(self.path)
+
+    def get(self, user_id):
+        """
+        Return the normalized profile of `user_id`.
+
+        The row lookup and the read happen under the lock, so a concurrent
+        reload cannot pair a row number with another matrix.
+
+        Returns:
+            numpy.ndarray: Copy of the profile vector (all zeros if the user has no
+            embedded interests), or None if the profile has not been computed
+        """
+        with self._lock:
+            row = self._rows.get(user_id)
+            # A copy: set() overwrites rows in place and discard() hands them to other users
+            return None if row is None else self._matrix[row].copy()
+
+    def set(self, user_id, vector):
+        """Store a profile vector (normalized on the way in); None stores an empty profile."""
+        vector = np.zeros(self.dim, dtype=np.float32) if vector is None else normalize_vector(vector)
+        with self._lock:
+            row = self._rows.get(user_id)
+            if row is None:
+                row = self._free.pop() if self._free else self._append_row()
+                self._rows[user_id] = row
+            self._matrix[row] = vector
+            self.version += 1
+
+    def discard(self, user_id):
+        """Forget a profile so it is recomputed on next use."""
+        with self._lock:
+            row = self._rows.pop(user_id, None)
+            if row is not None:
+                self._matrix[row] = 0
+                self._free.append(row)
+                self.version += 1
+
+    def _append_row(self):
+        # Grow geometrically so adding users one at a time stays amortized O(1)
+        used = len(self._rows) + len(self._free)
+        if used == len(self._matrix):
+            grown = np.zeros((max(2 * len(self._matrix), 16), self.dim), dtype=np.float32)
+            grown[:used] = self._matrix[:used]
+            self._matrix = grown
+        return used
+
+    def recompute(self, graph, user_ids=None):
+        """
+        Recompute profiles from the hasInterest concept embeddings in Neo4j.
+
+        Args:
+            graph (GraphPool): Shared Neo4j access layer
+            user_ids (list, optional): Users whose interests changed; every user if None
+
+        Returns:
+            int: Number of profiles written
+        """
+        if user_ids is not None:
+            user_ids = [str(user_id) for user_id in user_ids]
+            if not user_ids:
+                return 0
+            query = """
+                UNWIND $user_ids AS user_id
+                MATCH (u:User {has_id: user_id})-[:hasInterest]->(c:Concept)
+                WHERE c.hasNameEmbedding IS NOT NULL
+                RETURN user_id, c.hasNameEmbedding AS embedding
+            """
+        else:
+            query = """
+                MATCH (u:User)-[:hasInterest]->(c:Concept)
+                WHERE c.hasNameEmbedding IS NOT NULL
+                RETURN u.has_id AS user_id, c.hasNameEmbedding AS embedding
+            """
+
+        sums, counts = {}, {}
+        with graph.session("read") as session:
+            for record in session.run(query, user_ids=user_ids):
+                embedding = record["embedding"]
+                if not isinstance(embedding, list) or len(embedding) != self.dim:
+                    continue
+                user_id = record["user_id"]
+                if user_id not in sums:
+                    sums[user_id] = np.zeros(self.dim, dtype=np.float64)
+                    counts[user_id] = 0
+                sums[user_id] += embedding
+                counts[user_id] += 1
+
+        with self._lock:
+            if user_ids is None:
+                self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+                self._rows, self._free = {}, []
+            for user_id in (user_ids if user_ids is not None else sums):
+                self.set(user_id, sums[user_id] / counts[user_id] if user_id in sums else None)
+        return len(user_ids) if user_ids is not None else len(sums)
@@ -0,0 +1,138 @@
+"""
+Quantized Embedding Matrices for the Scientific Article Recommender
+
+Keeps a low-precision copy of the pre-normalized article matrix in memory for
+a first scoring pass, while the full-precision float32 matrix stays on disk
+(memory-mapped) and is only read for the best candidates:
+
+- "float16": half-precision copy, 2 bytes per dimension
+- "int8": per-dimension scalar quantization, 1 byte per dimension; each
+  dimension's [min, max] range is split into 256 levels
+
+Search scores every row on the quantized copy (in row chunks, so the float32
+buffer stays small), keeps the best `k * rerank_factor` rows and re-ranks them
+exactly against the full-precision rows, so the returned scores are exact and
+only candidates lost by the first pass cost recall.
+
+int8 scores about as fast as the float32 matrix product. NumPy converts float16
+to float32 without SIMD on most CPUs, so float16 halves memory but scores
+several times slower; prefer int8 when latency matters.
+
+`existing_scripts/benchmark_quantization.py` reports memory, latency and
+recall for each mode.
+"""
+
+import numpy as np
+
+from .similarity import top_k
+
+QUANTIZATION_MODES = ("float32", "float16", "int8")
+
+# Candidates re-ranked exactly per requested result
+DEFAULT_RERANK_FACTOR = 4
+
+# Rows converted to float32 per block; small enough for the block to stay in CPU cache
+CHUNK_ROWS = 256
+
+
+class QuantizedMatrix:
+    """
+    Low-precision copy of a row-normalized matrix.
+
+    Attributes:
+        codes (numpy.ndarray): (n, d) float16 values or int8 codes
+        scale (numpy.ndarray): (d,) float32 int8 step per dimension, None for float16
+        offset (numpy.ndarray): (d,) float32 value of int8 code -128 per dimension, None for float16
+        rerank_factor (int): Candidates re-ranked exactly per requested result
+    """
+
+    def __init__(self, codes, scale=None, offset=None, rerank_factor=DEFAULT_RERANK_FACTOR):
+        self.codes = codes
+        self.scale = scale
+        self.offset = offset
+        self.rerank_factor = rerank_factor
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def mode(self):
+        return "float16" if self.scale is None else "int8"
+
+    @property
+    def nbytes(self):
+        """Memory held by the codes and the quantization parameters."""
+        return self.codes.nbytes + (0 if self.scale is None else self.scale.nbytes + self.offset.nbytes)
+
+    @classmethod
+    def from_matrix(cls, matrix, mode, rerank_factor=DEFAULT_RERANK_FACTOR, chunk=CHUNK_ROWS):
+        """
+        Quantize a float32 matrix.
+
+        Args:
+            matrix (numpy.ndarray): (n, d) row-normalized float32 matrix
+            mode (str): "float16" or "int8"
+            rerank_factor (int): Candidates re-ranked exactly per requested result
+            chunk (int): Rows quantized per block
+
+        Returns:
+            QuantizedMatrix: The quantized copy
+        """
+        if mode == "float16":
+            return cls(matrix.astype(np.float16), rerank_factor=rerank_factor)
+        if mode != "int8":
+            raise ValueError(f"Unknown quantization mode: {mode}")
+        low = matrix.min(axis=0) if len(matrix) else np.zeros(matrix.shape[1], dtype=np.float32)
+        high = matrix.max(axis=0) if len(matrix) else low
+        scale = ((high - low) / 255).astype(np.float32)
+        scale[scale == 0] = 1.0
+        codes = np.empty(matrix.shape, dtype=np.int8)
+        for start in range(0, len(matrix), chunk):
+            block = np.rint((matrix[start:start + chunk] - low) / scale) - 128
+            codes[start:start + chunk] = np.clip(block, -128, 127)
+        return cls(codes, scale, low.astype(np.float32), rerank_factor)
+
+    def scores(self, query, chunk=CHUNK_ROWS):
+        """
+        Approximate dot products of every row with `query`.
+
+        Args:
+            query (numpy.ndarray): (d,) query vector
+            chunk (int): Rows converted to float32 per block
+
+        Returns:
+            numpy.ndarray: (n,) float32 scores
+        """
+        query = np.asarray(query, dtype=np.float32)
+        if self.scale is None:
+            weights, bias = query, 0.0
+        else:
+            # row . query == codes . (query * scale) + query . (offset + 128 * scale)
+            weights, bias = query * self.scale, float(query @ (self.offset + 128 * self.scale))
+        scores = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), chunk):
+            scores[start:start + chunk] = self.codes[start:start + chunk].astype(np.float32) @ weights
+        return scores + np.float32(bias)
+
+    def search(self, matrix, query, k, threshold=None):
+        """
+        Top-k rows by cosine similarity: quantized first pass, exact re-ranking.
+
+        Args:
+            matrix (numpy.ndarray): Full-precision (n, d) matrix, typically memory-mapped
+            query (array-like): d-dimensional query vector (any norm)
+            k (int): Number of results
+            threshold (float, optional): Minimum exact score, exclusive
+
+        Returns:
+            tuple: (indices, scores) sorted by descending exact score
+        """
+        query = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0 or k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        query = query / norm
+        candidates, _ = top_k(self.scores(query), k=k * self.rerank_factor)
+        candidates = np.sort(candidates)  # sequential reads from the memory-mapped matrix
+        order, scores = top_k(np.asarray(matrix[candidates]) @ query, k=k, threshold=threshold)
+        return candidates[order], scores
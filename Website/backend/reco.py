@@ -17,17 +17,100 @@ Key Features:
 
 Dependencies:
 - pandas, numpy: Data manipulation and numerical operations
-- neo4j: Graph database connectivity
-- scipy: Cosine similarity calculations
-- sklearn: Vector normalization and preprocessing
+- graph: Pooled, instrumented Neo4j access (GraphPool)
+- similarity: Vectorized cosine scoring and top-k selection
+- metadata: Bulk title/domain resolution for scored articles
+- embedding_store: In-memory, pre-normalized article embeddings (optionally float16/int8 quantized)
+- ann_index: Optional IVF approximate nearest-neighbour index
+- cache: LRU/TTL result cache (in-process or SQLite)
+- label_index: In-memory concept label lookup (replaces CONTAINS scans)
+- bm25: BM25 keyword index over titles and abstracts (replaces CONTAINS scans)
+- profile_store: Cached, pre-normalized user profile vectors
+- collaborative: Sparse user-user collaborative filtering
+- ontology_closure: Precomputed isSubclassOf closure for concept expansion
+- fusion: Weighted-sum / reciprocal-rank fusion of the strategy results
+- materialized: Precomputed per-user rankings served before live computation
 """
 
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import pandas as pd
 import numpy as np
-import json
-from neo4j import GraphDatabase
-from scipy.spatial.distance import cosine
-from sklearn.preprocessing import normalize
+
+from .graph import GraphPool
+from .embedding_store import EmbeddingStore, normalize_vector
+from .embedding_file import read_embeddings, read_labels
+from .similarity import top_k_similar, top_k_similar_batch
+from .metadata import fetch_work_metadata
+from .cache import ResultCache
+from .label_index import ConceptLabelIndex
+from .profile_store import UserProfileStore
+from .collaborative import CollaborativeModel
+from .ontology_closure import OntologyClosure
+from .fusion import fuse, FUSION_METHODS
+from .materialized import profile_fingerprint
+
+ARTICLE_EMBEDDINGS_FILE = "data/embeddings/embeddings_articles.csv"
+CONCEPT_EMBEDDINGS_FILE = "data/embeddings/embeddings_concepts.csv"
+
+# Search expands topic concepts this many isSubclassOf levels up, each level weighing DECAY times less
+SEARCH_EXPANSION_DEPTH = 2
+SEARCH_EXPANSION_DECAY = 0.5
+
+
+# Cypher shared by the sync engine and AsyncRecommendationEngine (async_reco.py)
+ONTOLOGY_KEYWORD_QUERY = """
+    UNWIND $work_uris AS work_uri
+    MATCH (w:Work {uri: work_uri})-[:hasTopic|hasConcept]->(c:Concept)
+    WHERE c.uri IN $concept_uris
+    RETURN DISTINCT w.uri, w.hasTitle, w.domain, w.citedByCount
+    ORDER BY w.citedByCount DESC, w.uri
+"""
+ONTOLOGY_QUERY = """
+    UNWIND $concept_uris AS concept_uri
+    MATCH (w:Work)-[:hasTopic|hasConcept]->(c:Concept {uri: concept_uri})
+    WHERE ($search_query = '' OR toLower(w.hasTitle) CONTAINS toLower($search_query) OR toLower(w.hasAbstract) CONTAINS toLower($search_query))
+    RETURN DISTINCT w.uri, w.hasTitle, w.domain, w.citedByCount
+    ORDER BY w.citedByCount DESC, w.uri
+"""
+USER_INTEREST_QUERY = """
+    MATCH (u:User {has_id: $user_id})-[:hasInterest]->(c:Concept)<-[:hasTopic|hasConcept]-(w:Work)
+    RETURN DISTINCT w.uri, w.hasTitle, w.domain, w.citedByCount
+    ORDER BY w.citedByCount DESC, w.uri
+"""
+USER_INTEREST_BATCH_QUERY = """
+    UNWIND $user_ids AS user_id
+    MATCH (u:User {has_id: user_id})-[:hasInterest]->(c:Concept)<-[:hasTopic|hasConcept]-(w:Work)
+    WITH DISTINCT user_id, w
+    ORDER BY w.citedByCount DESC, w.uri
+    WITH user_id, collect(w) AS works
+    RETURN user_id, [w IN works[..coalesce($top_n, size(works))] | [w.uri, w.hasTitle, w.domain]] AS works
+"""
+SEARCH_ONTOLOGY_QUERY = """
+    UNWIND $concepts AS concept
+    MATCH (w:Work)-[:hasTopic|hasConcept]->(:Concept {uri: concept.uri})
+    WITH w, max(concept.weight) AS weight
+    RETURN w.uri, w.hasTitle, w.domain, w.citedByCount, weight
+    ORDER BY weight DESC, w.citedByCount DESC, w.uri
+"""
+CONCEPT_EMBEDDING_QUERY = """
+    UNWIND $concept_uris AS concept_uri
+    MATCH (c:Concept {uri: concept_uri})
+    WHERE c.hasNameEmbedding IS NOT NULL
+    RETURN c.hasNameEmbedding
+    LIMIT 1
+"""
+
+# Seconds each strategy may take before get_recommendations returns without it
+DEFAULT_STRATEGY_TIMEOUTS = {
+    'Ontology': 5.0,
+    'Content': 5.0,
+    'Collaborative': 3.0,
+    'User': 5.0,
+    'Keyword': 2.0,
+}
 
 class RecommendationEngine:
     """
@@ -39,236 +122,742 @@ class RecommendationEngine:
     - User preference analysis from interaction history
     
     Attributes:
-        driver: Neo4j database driver instance
+        graph (GraphPool): Shared Neo4j access layer
         embedding_dim (int): Dimension of SciBERT embeddings (768)
+        embedding_stores (dict): Loaded EmbeddingStore instances keyed by absolute file path
+        embeddings_file (str): Article embeddings used by get_recommendations
+        ann_index (IVFIndex): Optional approximate index used for top-N content queries
+        strategy_timeouts (dict): Per-strategy time budget in seconds
+        executor (ThreadPoolExecutor): Bounded pool running the strategies concurrently
+        cache: Result cache (ResultCache, SQLiteResultCache) or None when disabled
+        label_index (ConceptLabelIndex): Concept label lookup, built from Neo4j on first use
+        keyword_index (BM25Index): Optional keyword index for search queries
+        profile_store (UserProfileStore): User profile vectors used by content recommendations
+        collaborative (CollaborativeModel): Collaborative filtering model, built from Neo4j on first use
+        interaction_logs_file (str): Interaction logs folded into the collaborative model, if set
+        ontology_closure (OntologyClosure): isSubclassOf closure, loaded or built on first use
+        ontology_closure_file (str): Closure saved by import_data_to_neo4j.py, loaded on first use if present
+        owl_file (str): scientific_recommender.owl, whose subclass axioms are added when the closure is
+            built from Neo4j
+        fusion_method (str): "weighted" (score sum) or "rrf" (reciprocal rank fusion)
+        fusion_weights (dict): Strategy approach label -> fusion weight (1.0 if missing)
+        materialized (MaterializedRecommendations): Optional precomputed per-user rankings
+        materialized_max_age (float): Seconds a materialized ranking stays servable (None: no limit)
     """
     
-    def __init__(self, uri, user, password):
+    def __init__(self, uri=None, user=None, password=None, embedding_store=None, ann_index=None,
+                 max_workers=8, strategy_timeouts=None, cache=None, label_index=None, keyword_index=None,
+                 profile_store=None, collaborative=None, interaction_logs_file=None,
+                 ontology_closure=None, fusion_method="weighted", fusion_weights=None, graph=None,
+                 materialized=None, materialized_max_age=None, ontology_closure_file=None, owl_file=None):
         """
         Initialize the recommendation engine with Neo4j connection.
         
         Args:
-            uri (str): Neo4j database URI (e.g., "bolt://localhost:7687")
+            uri (str): Neo4j database URI (e.g., "bolt://localhost:7687"), unused when `graph` is given
             user (str): Neo4j username
             password (str): Neo4j password
+            embedding_store (EmbeddingStore, optional): Shared article embedding store
+            ann_index (IVFIndex, optional): Approximate index over the article store
+            max_workers (int): Size of the strategy thread pool; each worker holds at
+                most one Neo4j connection from the graph pool at a time
+            strategy_timeouts (dict, optional): Overrides for DEFAULT_STRATEGY_TIMEOUTS
+            cache (optional): Result cache; defaults to an in-process ResultCache, False disables caching
+            label_index (ConceptLabelIndex, optional): Prebuilt concept label index
+            keyword_index (BM25Index, optional): Keyword index; without it search queries
+                fall back to a CONTAINS filter in Cypher and no Keyword strategy runs
+            profile_store (UserProfileStore, optional): Shared profile store; defaults to an
+                in-memory store filled from Neo4j on first use of each user
+            collaborative (CollaborativeModel, optional): Prebuilt collaborative filtering model
+            interaction_logs_file (str, optional): fake_user_logs.csv used when building the model
+            ontology_closure (OntologyClosure, optional): Prebuilt concept hierarchy closure
+            fusion_method (str): "weighted" or "rrf"
+            fusion_weights (dict, optional): Per-strategy weights, e.g. {'Content': 0.6, 'Ontology': 0.4}
+            graph (GraphPool, optional): Shared pool; one is created from uri/user/password (and
+                closed with the engine) if not given
+            materialized (MaterializedRecommendations, optional): Rankings precomputed by
+                existing_scripts/materialize_recommendations.py, served while still valid
+            materialized_max_age (float, optional): Maximum age of the materialized file in seconds
+            ontology_closure_file (str, optional): Saved closure to load when none was given
+            owl_file (str, optional): OWL ontology combined with the Neo4j edges when the closure
+                has to be built, as import_data_to_neo4j.py does
         """
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        self._owns_graph = graph is None
+        self.graph = graph if graph is not None else GraphPool(uri, user, password)
         self.embedding_dim = 768  # SciBERT embedding size
+        self.embedding_stores = {}
+        self.embeddings_file = ARTICLE_EMBEDDINGS_FILE
+        if embedding_store is not None:
+            self.embedding_stores[os.path.abspath(embedding_store.embeddings_file)] = embedding_store
+            self.embeddings_file = embedding_store.embeddings_file
+        self.ann_index = ann_index
+        self.strategy_timeouts = {**DEFAULT_STRATEGY_TIMEOUTS, **(strategy_timeouts or {})}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="reco-strategy")
+        self.cache = ResultCache() if cache is None else (cache or None)
+        self.label_index = label_index
+        self._label_index_lock = threading.Lock()
+        self.keyword_index = keyword_index
+        self.profile_store = profile_store if profile_store is not None else UserProfileStore(dim=self.embedding_dim)
+        self.collaborative = collaborative
+        self.interaction_logs_file = interaction_logs_file
+        self._collaborative_lock = threading.Lock()
+        self.ontology_closure = ontology_closure
+        self.ontology_closure_file = ontology_closure_file
+        self.owl_file = owl_file
+        self._closure_lock = threading.Lock()
+        if fusion_method not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method: {fusion_method}")
+        self.fusion_method = fusion_method
+        self.fusion_weights = dict(fusion_weights or {})
+        self.materialized = materialized
+        self.materialized_max_age = materialized_max_age
+
+    def get_label_index(self):
+        """Return the concept label index, building it from the Concept nodes on first use."""
+        if self.label_index is None:
+            with self._label_index_lock:
+                if self.label_index is None:
+                    self.label_index = ConceptLabelIndex.from_neo4j(self.graph)
+        return self.label_index
+
+    def reload_label_index(self):
+        """Rebuild the concept label index, e.g. after a new concept import."""
+        with self._label_index_lock:
+            self.label_index = ConceptLabelIndex.from_neo4j(self.graph)
+
+    def get_collaborative_model(self):
+        """Return the collaborative filtering model, building it from Neo4j (and the logs) on first use."""
+        if self.collaborative is None:
+            with self._collaborative_lock:
+                if self.collaborative is None:
+                    self.collaborative = CollaborativeModel.from_neo4j(self.graph, self.interaction_logs_file)
+        return self.collaborative
+
+    def get_ontology_closure(self):
+        """
+        Return the isSubclassOf closure, loading it on first use.
+
+        The closure file saved by the import is preferred; otherwise it is built
+        from the Neo4j edges plus the OWL axioms, matching the saved one.
+        """
+        if self.ontology_closure is None:
+            with self._closure_lock:
+                if self.ontology_closure is None:
+                    if self.ontology_closure_file and os.path.exists(self.ontology_closure_file):
+                        self.ontology_closure = OntologyClosure.load(self.ontology_closure_file)
+                    else:
+                        owl_file = self.owl_file if self.owl_file and os.path.exists(self.owl_file) else None
+                        self.ontology_closure = OntologyClosure.from_neo4j(self.graph, owl_file)
+        return self.ontology_closure
+
+    def _topic_concepts(self, topic):
+        """
+        Concept URIs whose label contains `topic`, best match (shortest label) first.
+
+        Args:
+            topic (str): Free-text topic
+
+        Returns:
+            list: Concept URIs
+        """
+        index = self.get_label_index()
+        return sorted(index.substring(topic), key=lambda uri: len(index.label(uri)))
+
+    def get_embedding_store(self, embeddings_file):
+        """
+        Return the shared in-memory store for an embeddings file, creating it on first use.
+
+        Args:
+            embeddings_file (str): Path to the article embeddings CSV
+
+        Returns:
+            EmbeddingStore: Store for that file (reloaded if the file changed)
+        """
+        key = os.path.abspath(embeddings_file)
+        store = self.embedding_stores.get(key)
+        if store is None:
+            store = self.embedding_stores.setdefault(key, EmbeddingStore(embeddings_file, dim=self.embedding_dim))
+        return store
+
+    def _score_articles(self, articles, query, top_n=None):
+        """
+        Rank articles by cosine similarity to a query vector.
+
+        Top-N queries go through the approximate index when one is attached and
+        was built on the current embeddings, then through the store's quantized
+        copy (exactly re-ranked) when it has one; everything else is exact search.
+
+        Args:
+            articles (EmbeddingSnapshot): Article embeddings
+            query (numpy.ndarray): Query vector
+            top_n (int, optional): Number of results, all positive matches if None
+
+        Returns:
+            tuple: (indices, scores) sorted by descending similarity
+        """
+        if top_n is not None and self.ann_index is not None and self.ann_index.matches(articles):
+            return self.ann_index.search(articles.matrix, query, k=top_n, threshold=0.0)
+        if top_n is not None and articles.quantized is not None:
+            return articles.quantized.search(articles.matrix, query, k=top_n, threshold=0.0)
+        return top_k_similar(articles.matrix, query, k=top_n, threshold=0.0)
+
+    def _resolve_articles(self, articles, indices, scores, approach):
+        """
+        Attach title and domain to scored article rows.
+
+        Rows covered by the store's in-process metadata table are resolved
+        locally; the rest are fetched from Neo4j in a single round-trip.
+        Articles unknown to both are dropped.
+
+        Args:
+            articles (EmbeddingSnapshot): Snapshot the indices refer to
+            indices (array-like): Scored row indices, in ranking order
+            scores (array-like): Score of each row
+            approach (str): Approach label for the returned tuples
+
+        Returns:
+            list: (uri, title, domain, approach, score) tuples in ranking order
+        """
+        return self._resolve_uris([articles.uris[idx] for idx in indices], scores, approach, articles)
+
+    def _resolve_uris(self, uris, scores, approach, articles=None):
+        """
+        Attach title and domain to scored Work URIs.
+
+        Args:
+            uris (list): Work URIs, in ranking order
+            scores (array-like): Score of each URI
+            approach (str): Approach label for the returned tuples
+            articles (EmbeddingSnapshot, optional): Snapshot holding in-process metadata,
+                defaults to the engine's article store
+
+        Returns:
+            list: (uri, title, domain, approach, score) tuples in ranking order
+        """
+        metadata = self._fetch_metadata(uris, articles)
+        return [(uri, metadata[uri][0], metadata[uri][1], approach, float(score))
+                for uri, score in zip(uris, scores) if uri in metadata]
+
+    def _resolve_batch(self, scored, approach, articles=None):
+        """
+        `_resolve_uris` for several users' results, with one metadata lookup for all of them.
+
+        Args:
+            scored (dict): user_id -> (uris, scores), each in ranking order
+            approach (str): Approach label for the returned tuples
+            articles (EmbeddingSnapshot, optional): Snapshot holding in-process metadata
+
+        Returns:
+            dict: user_id -> (uri, title, domain, approach, score) tuples in ranking order
+        """
+        metadata = self._fetch_metadata(list(dict.fromkeys(uri for uris, _ in scored.values() for uri in uris)), articles)
+        return {user_id: [(uri, metadata[uri][0], metadata[uri][1], approach, float(score))
+                          for uri, score in zip(uris, scores) if uri in metadata]
+                for user_id, (uris, scores) in scored.items()}
+
+    def _fetch_metadata(self, uris, articles=None):
+        """(title, domain) of the URIs keyed by URI: in-process first, one UNWIND query for the rest."""
+        metadata = self._local_metadata(uris, articles)
+        missing = [uri for uri in uris if uri not in metadata]
+        if missing:
+            metadata.update(fetch_work_metadata(self.graph, missing))
+        return metadata
+
+    def _local_metadata(self, uris, articles=None):
+        """(title, domain) of the URIs found in the in-process metadata table, keyed by URI."""
+        if articles is None:
+            articles = self.get_embedding_store(self.embeddings_file).snapshot()
+        metadata = {}
+        if articles.titles is not None:
+            for uri in uris:
+                idx = articles.uri_index.get(uri)
+                if idx is not None and articles.titles[idx] is not None:
+                    metadata[uri] = (articles.titles[idx], articles.domains[idx])
+        return metadata
+
+    @staticmethod
+    def _limit(top_n):
+        """Cypher LIMIT clause for an optional top-N."""
+        return "" if top_n is None else "LIMIT $top_n"
+
+    def _fuse(self, strategy_results, top_n=None):
+        """
+        Merge per-strategy results into one list ordered by fused score.
+
+        Args:
+            strategy_results (list): One ranked list of (uri, title, domain, approach, score) per strategy
+            top_n (int, optional): Keep only the best `top_n` articles
+
+        Returns:
+            list: (uri, title, domain, approaches, score) tuples
+        """
+        return fuse(strategy_results, top_n, method=self.fusion_method, weights=self.fusion_weights)
 
     def close(self):
-        """Close the Neo4j database connection."""
-        self.driver.close()
-
-    def get_ontology_recommendations(self, topic, search_query):
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (w:Work)-[:hasTopic|hasConcept]->(c:Concept)
-                WHERE toLower(c.skos__prefLabel) CONTAINS toLower($topic)
-                AND ($search_query = '' OR toLower(w.hasTitle) CONTAINS toLower($search_query) OR toLower(w.hasAbstract) CONTAINS toLower($search_query))
-                RETURN w.uri, w.hasTitle, w.domain
-                """,
-                topic=topic, search_query=search_query
+        """Stop the strategy pool and close the Neo4j connections (if the engine opened them)."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self._owns_graph:
+            self.graph.close()
+
+    def _iter_strategies(self, strategies):
+        """
+        Run recommendation strategies concurrently and yield each one's results as it completes.
+
+        Every strategy gets its own deadline measured from submission. A strategy
+        that fails or misses its deadline is left out instead of failing the
+        request. Python threads cannot be interrupted, so a timed-out strategy
+        keeps its worker until its query returns; the bounded pool caps how
+        many such stragglers can pile up.
+
+        Args:
+            strategies (dict): name -> (callable, args)
+
+        Yields:
+            tuple: (name, list of results), in completion order
+        """
+        start = time.monotonic()
+        futures = {self.executor.submit(fn, *args): name for name, (fn, args) in strategies.items()}
+        deadlines = {future: start + self.strategy_timeouts.get(name, 5.0) for future, name in futures.items()}
+        pending = set(futures)
+        while pending:
+            timeout = max(min(deadlines[future] for future in pending) - time.monotonic(), 0)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    print(f"{futures[future]} strategy failed: {e}")
+                    continue
+                yield futures[future], results
+            now = time.monotonic()
+            for future in [future for future in pending if deadlines[future] <= now]:
+                pending.discard(future)
+                future.cancel()
+                print(f"{futures[future]} strategy timed out, returning partial results")
+
+    def get_ontology_recommendations(self, topic, search_query, top_n=None):
+        concept_uris = self._topic_concepts(topic)
+        if not concept_uris:
+            return []
+        # Works containing every query term come from the keyword index, Neo4j only checks their concepts;
+        # queries the index cannot answer (stopwords only, unknown or partial words) use the CONTAINS filter
+        work_uris = self.keyword_index.matches(search_query) if search_query and self.keyword_index is not None else None
+        if work_uris is not None:
+            if not work_uris:
+                return []
+            records = self.graph.read(
+                ONTOLOGY_KEYWORD_QUERY + self._limit(top_n),
+                work_uris=work_uris, concept_uris=concept_uris, top_n=top_n
             )
-            return [(record["w.uri"], record["w.hasTitle"], record["w.domain"], 'Ontology') for record in result]
-
-    def get_user_recommendations(self, user_id):
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (u:User {has_id: $user_id})-[:hasInterest]->(c:Concept)<-[:hasTopic|hasConcept]-(w:Work)
-                RETURN w.uri, w.hasTitle, w.domain
-                """,
-                user_id=user_id
+        else:
+            records = self.graph.read(
+                ONTOLOGY_QUERY + self._limit(top_n),
+                concept_uris=concept_uris, search_query=search_query, top_n=top_n
             )
-            return [(record["w.uri"], record["w.hasTitle"], record["w.domain"], 'User') for record in result]
+        return [(record["w.uri"], record["w.hasTitle"], record["w.domain"], 'Ontology', 1.0) for record in records]
 
-    def get_content_recommendations(self, user_id, embeddings_file, concepts_embeddings_file):
-        embeddings_df = pd.read_csv(embeddings_file)
-        valid_embeddings = embeddings_df.dropna(subset=['hasAbstractEmbedding']).copy()
+    def get_keyword_recommendations(self, search_query, top_n=None):
+        """
+        BM25-ranked articles for a keyword query.
 
-        if valid_embeddings.empty:
+        Scores are divided by the best score so they sit in [0, 1], on the
+        same scale as the other strategies before fusion.
+
+        Args:
+            search_query (str): Keyword query
+            top_n (int, optional): Number of results (defaults to 100)
+
+        Returns:
+            list: (uri, title, domain, 'Keyword', score) tuples
+        """
+        if self.keyword_index is None or not search_query:
             return []
+        hits = self.keyword_index.search(search_query, k=top_n or 100)
+        if not hits:
+            return []
+        best = hits[0][1]
+        return self._resolve_uris([uri for uri, _ in hits], [score / best for _, score in hits], 'Keyword')
 
-        valid_embeddings['embedding'] = valid_embeddings['hasAbstractEmbedding'].apply(json.loads)
-        embeddings_matrix = np.array(valid_embeddings['embedding'].tolist())
-        embeddings_matrix = normalize(embeddings_matrix)
-
-        # Get user concept embeddings from Neo4j
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (u:User {has_id: $user_id})-[:hasInterest]->(c:Concept)
-                WHERE c.hasNameEmbedding IS NOT NULL
-                RETURN c.uri, c.hasNameEmbedding
-                """,
-                user_id=user_id
-            )
-            user_embeddings = [(record["c.uri"], record["c.hasNameEmbedding"]) for record in result]
+    def get_user_recommendations(self, user_id, top_n=None):
+        records = self.graph.read(USER_INTEREST_QUERY + self._limit(top_n), user_id=user_id, top_n=top_n)
+        return [(record["w.uri"], record["w.hasTitle"], record["w.domain"], 'User', 1.0) for record in records]
 
-        if not user_embeddings:
+    def get_content_recommendations(self, user_id, embeddings_file, concepts_embeddings_file, top_n=None):
+        articles = self.get_embedding_store(embeddings_file).snapshot()
+        if not articles.uris:
             return []
 
-        user_embedding = np.mean([emb for _, emb in user_embeddings], axis=0)
-        user_embedding = normalize([user_embedding])[0]
+        user_embedding = self.get_user_profile(user_id)
+        if not user_embedding.any():
+            return []
 
-        # Use lower threshold like the working version
-        similarities = 1 - np.array([cosine(user_embedding, emb) for emb in embeddings_matrix])
-        valid_indices = np.where(similarities > 0)[0]  # Keep all non-zero similarities
+        # Top-N articles by cosine similarity to the profile, positive similarities only
+        valid_indices, similarities = self._score_articles(articles, user_embedding, top_n)
 
+        recommendations = self._resolve_articles(articles, valid_indices, similarities, 'Content')
+        return recommendations
+
+    def get_user_profile(self, user_id):
+        """
+        Normalized profile vector of a user (mean of their interest concept embeddings).
+
+        Served from the profile store; a user missing from it is computed from
+        Neo4j once and kept.
+
+        Args:
+            user_id (str): User identifier
+
+        Returns:
+            numpy.ndarray: Profile vector, all zeros if the user has no embedded interests
+        """
+        self.profile_store.refresh()
+        profile = self.profile_store.get(user_id)
+        if profile is None:
+            self.profile_store.recompute(self.graph, [user_id])
+            profile = self.profile_store.get(user_id)
+        return profile
+
+    def get_collaborative_recommendations(self, user_id, top_n=None):
+        scored = self.get_collaborative_model().recommend(user_id, top_n)
+        return self._resolve_uris([uri for uri, _ in scored], [score for _, score in scored], 'Collaborative')
+
+    def get_search_recommendations(self, search_topic, embeddings_file, concepts_embeddings_file, top_n=None):
         recommendations = []
-        for idx in valid_indices:
-            article = valid_embeddings.iloc[idx]
-            with self.driver.session() as session:
-                result = session.run(
-                    """
-                    MATCH (w:Work {uri: $uri})
-                    RETURN w.hasTitle, w.domain
-                    """,
-                    uri=article['uri']
-                )
-                record = result.single()
-                if record:
-                    recommendations.append((article['uri'], record["w.hasTitle"], record["w.domain"], 'Content'))
+        for _, recommendations in self.stream_search_recommendations(search_topic, embeddings_file, concepts_embeddings_file, top_n):
+            pass
         return recommendations
 
-    def get_collaborative_recommendations(self, user_id):
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (u:User {has_id: $user_id})-[:hasInterest]->(c:Concept)<-[:hasInterest]-(other:User)-[:hasInterest]->(c2:Concept)<-[:hasTopic|hasConcept]-(w:Work)
-                WHERE u <> other
-                RETURN DISTINCT w.uri, w.hasTitle, w.domain
-                """,
-                user_id=user_id
-            )
-            recommendations = [(record["w.uri"], record["w.hasTitle"], record["w.domain"], 'Collaborative') for record in result]
-            print(f"Collaborative recommendations found: {len(recommendations)}")
-            return recommendations
+    def stream_search_recommendations(self, search_topic, embeddings_file, concepts_embeddings_file, top_n=None):
+        """
+        Topic search that yields the ranking as it is refined.
 
-    def get_search_recommendations(self, search_topic, embeddings_file, concepts_embeddings_file):
-        # Ontology-based: Include related concepts via isSubclassOf
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (c:Concept)
-                WHERE toLower(c.skos__prefLabel) CONTAINS toLower($topic)
-                OPTIONAL MATCH (c)-[:isSubclassOf*0..2]->(related:Concept)
-                WITH collect(c) + collect(related) AS concepts
-                UNWIND concepts AS concept
-                MATCH (w:Work)-[:hasTopic|hasConcept]->(concept)
-                RETURN w.uri, w.hasTitle, w.domain
-                """,
-                topic=search_topic
-            )
-            ontology_recs = [(record["w.uri"], record["w.hasTitle"], record["w.domain"], 'Ontology') for record in result]
+        The ontology ranking is yielded first, then the ranking fused with
+        content similarity. The last item is the same list
+        `get_search_recommendations` returns; a cache hit yields once.
+
+        Yields:
+            tuple: (stage, ranked (uri, title, domain, approaches, score) tuples)
+        """
+        key = ('search', search_topic, top_n, self._embeddings_signature(embeddings_file))
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            yield 'Cache', cached
+            return
+        recommendations = []
+        for stage, recommendations in self._iter_search_recommendations(search_topic, embeddings_file, concepts_embeddings_file, top_n):
+            yield stage, recommendations
+        if self.cache is not None:
+            self.cache.set(key, recommendations)
+
+    def _iter_search_recommendations(self, search_topic, embeddings_file, concepts_embeddings_file, top_n=None):
+        concept_uris = self._topic_concepts(search_topic)
+
+        # Ontology-based: Include related concepts via isSubclassOf, expanded in-process with decaying weight
+        expanded = self.get_ontology_closure().expand(concept_uris, SEARCH_EXPANSION_DEPTH, SEARCH_EXPANSION_DECAY)
+        records = self.graph.read(
+            SEARCH_ONTOLOGY_QUERY + self._limit(top_n),
+            concepts=[{"uri": uri, "weight": weight} for uri, weight in expanded], top_n=top_n
+        )
+        ontology_recs = [(record["w.uri"], record["w.hasTitle"], record["w.domain"], 'Ontology', record["weight"]) for record in records]
+        yield 'Ontology', self._fuse([ontology_recs], top_n)
 
         # Content-based: Use embeddings for semantic similarity
-        embeddings_df = pd.read_csv(embeddings_file)
-        valid_embeddings = embeddings_df.dropna(subset=['hasAbstractEmbedding']).copy()
+        articles = self.get_embedding_store(embeddings_file).snapshot()
+        if not articles.uris:
+            return
 
-        if valid_embeddings.empty:
-            return ontology_recs
+        # Get concept embedding from Neo4j
+        record = self.graph.read(CONCEPT_EMBEDDING_QUERY, concept_uris=concept_uris).single()
+        if not record:
+            print(f"No concept embedding found for '{search_topic}' - returning only ontology results")
+            return
+        topic_embedding = normalize_vector(record["c.hasNameEmbedding"])
 
-        valid_embeddings['embedding'] = valid_embeddings['hasAbstractEmbedding'].apply(json.loads)
-        embeddings_matrix = np.array(valid_embeddings['embedding'].tolist())
-        embeddings_matrix = normalize(embeddings_matrix)
+        # Top-N articles by cosine similarity to the topic concept, positive similarities only
+        valid_indices, similarities = self._score_articles(articles, topic_embedding, top_n)
 
-        # Get concept embedding from Neo4j
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (c:Concept)
-                WHERE toLower(c.skos__prefLabel) CONTAINS toLower($topic)
-                AND c.hasNameEmbedding IS NOT NULL
-                RETURN c.hasNameEmbedding
-                LIMIT 1
-                """,
-                topic=search_topic
-            )
-            record = result.single()
-            if not record:
-                print(f"No concept embedding found for '{search_topic}' - returning only ontology results")
-                return [(row[0], row[1], row[2], row[3]) for row in ontology_recs]  # Return with URI
-            
-            topic_embedding = record["c.hasNameEmbedding"]
-            topic_embedding = normalize([topic_embedding])[0]
-
-        # Calculate similarities with lower threshold
-        similarities = 1 - np.array([cosine(topic_embedding, emb) for emb in embeddings_matrix])
-        valid_indices = np.where(similarities > 0)[0]  # Keep all non-zero similarities
-
-        content_recs = []
-        for idx in valid_indices:
-            article = valid_embeddings.iloc[idx]
-            with self.driver.session() as session:
-                result = session.run(
-                    """
-                    MATCH (w:Work {uri: $uri})
-                    RETURN w.hasTitle, w.domain
-                    """,
-                    uri=article['uri']
-                )
-                record = result.single()
-                if record:
-                    content_recs.append((article['uri'], record["w.hasTitle"], record["w.domain"], 'Content'))
+        content_recs = self._resolve_articles(articles, valid_indices, similarities, 'Content')
         
         print(f"Found {len(ontology_recs)} ontology + {len(content_recs)} content recommendations")
         
-        # Combine and group results
-        all_recs = ontology_recs + content_recs
-        recs_df = pd.DataFrame(all_recs, columns=["uri", "title", "domain", "approach"])
-        if recs_df.empty:
-            return []
+        # Combine and group results by uri, ordered by fused score
+        yield 'Content', self._fuse([ontology_recs, content_recs], top_n)
 
-        # Group by uri to combine approaches
-        recs_grouped = recs_df.groupby(['uri', 'title', 'domain'])['approach'].apply(lambda x: ', '.join(sorted(set(x)))).reset_index()
-        return [(row['uri'], row['title'], row['domain'], row['approach']) for _, row in recs_grouped.iterrows()]
+    def get_recommendations(self, user_id, topic="Neural Networks", search_query="", top_n=None):
+        recommendations = []
+        for _, recommendations in self.stream_recommendations(user_id, topic, search_query, top_n):
+            pass
+        return recommendations  # Return URI first
 
-    def get_recommendations(self, user_id, topic="Neural Networks", search_query=""):
-        ontology_recs = self.get_ontology_recommendations(topic, search_query)
-        content_recs = self.get_content_recommendations(user_id, "data/embeddings/embeddings_articles.csv", "data/embeddings/embeddings_concepts.csv")
-        collaborative_recs = self.get_collaborative_recommendations(user_id)
-        user_recs = self.get_user_recommendations(user_id)
+    def stream_recommendations(self, user_id, topic="Neural Networks", search_query="", top_n=None):
+        """
+        Personalized recommendations that yield the fused ranking after each strategy completes.
 
-        all_recs = ontology_recs + content_recs + collaborative_recs + user_recs
-        recs_df = pd.DataFrame(all_recs, columns=["uri", "title", "domain", "approach"])
-        if recs_df.empty:
-            return []
+        Fast strategies (e.g. ontology matches) reach the caller first; each
+        item re-ranks everything received so far. The last item is the same
+        list `get_recommendations` returns; a valid materialized ranking or a
+        cache hit yields once.
+
+        Yields:
+            tuple: (strategy, ranked (uri, title, domain, approaches, score) tuples)
+        """
+        materialized = self.get_materialized(user_id, topic, search_query, top_n)
+        if materialized is not None:
+            yield 'Materialized', materialized
+            return
+        key = ('recommend', user_id, topic, search_query, top_n, self._embeddings_signature(self.embeddings_file))
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            yield 'Cache', cached
+            return
+
+        # Strategies run in parallel; a slow one is dropped after its timeout
+        strategies = {
+            'Ontology': (self.get_ontology_recommendations, (topic, search_query, top_n)),
+            'Content': (self.get_content_recommendations, (user_id, self.embeddings_file, CONCEPT_EMBEDDINGS_FILE, top_n)),
+            'Collaborative': (self.get_collaborative_recommendations, (user_id, top_n)),
+            'User': (self.get_user_recommendations, (user_id, top_n)),
+        }
+        if search_query and self.keyword_index is not None:
+            strategies['Keyword'] = (self.get_keyword_recommendations, (search_query, top_n))
+        results = {}
+        recommendations = []
+        for name, recs in self._iter_strategies(strategies):
+            results[name] = recs
+            recommendations = self._fuse([results[n] for n in strategies if n in results], top_n)
+            yield name, recommendations
+
+        # Partial results (a strategy timed out or failed) are not cached
+        if self.cache is not None and len(results) == len(strategies):
+            self.cache.set(key, recommendations, user_id=user_id)
+
+    def get_user_profiles(self, user_ids):
+        """
+        Profile vectors of many users; users missing from the profile store are computed in one query.
+
+        Args:
+            user_ids (list): User identifiers
+
+        Returns:
+            numpy.ndarray: (len(user_ids), dim) profiles, all-zero rows for users without embedded interests
+        """
+        self.profile_store.refresh()
+        missing = [user_id for user_id in user_ids if self.profile_store.get(user_id) is None]
+        if missing:
+            self.profile_store.recompute(self.graph, missing)
+        profiles = np.zeros((len(user_ids), self.embedding_dim), dtype=np.float32)
+        for i, user_id in enumerate(user_ids):
+            profile = self.profile_store.get(user_id)
+            if profile is not None:
+                profiles[i] = profile
+        return profiles
+
+    def get_content_recommendations_batch(self, user_ids, embeddings_file, top_n=None):
+        """
+        Content recommendations for many users from one profiles x articles matrix product.
+
+        Always exact (the approximate index is only used for single queries).
+
+        Returns:
+            dict: user_id -> (uri, title, domain, 'Content', score) tuples
+        """
+        articles = self.get_embedding_store(embeddings_file).snapshot()
+        if not articles.uris:
+            return {user_id: [] for user_id in user_ids}
+        profiles = self.get_user_profiles(user_ids)
+        ranked = top_k_similar_batch(articles.matrix, profiles, k=top_n, threshold=0.0)
+        scored = {user_id: ([articles.uris[idx] for idx in indices], similarities)
+                  for user_id, (indices, similarities) in zip(user_ids, ranked)}
+        return self._resolve_batch(scored, 'Content', articles)
+
+    def get_user_recommendations_batch(self, user_ids, top_n=None):
+        """
+        Works tagged with each user's interests, for many users in one UNWIND query.
+
+        Returns:
+            dict: user_id -> (uri, title, domain, 'User', 1.0) tuples
+        """
+        recommendations = {user_id: [] for user_id in user_ids}
+        for record in self.graph.read(USER_INTEREST_BATCH_QUERY, user_ids=list(user_ids), top_n=top_n):
+            recommendations[record["user_id"]] = [(uri, title, domain, 'User', 1.0) for uri, title, domain in record["works"]]
+        return recommendations
+
+    def get_collaborative_recommendations_batch(self, user_ids, top_n=None):
+        """
+        Collaborative recommendations for many users from one sparse matrix product.
+
+        Returns:
+            dict: user_id -> (uri, title, domain, 'Collaborative', score) tuples
+        """
+        scored = self.get_collaborative_model().recommend_many(user_ids, top_n)
+        return self._resolve_batch({user_id: ([uri for uri, _ in pairs], [score for _, score in pairs])
+                                    for user_id, pairs in scored.items()}, 'Collaborative')
+
+    def get_recommendations_batch(self, user_ids, topic="Neural Networks", search_query="", top_n=None):
+        """
+        `get_recommendations` for many users at once, e.g. for nightly digests.
+
+        Every strategy runs once for the whole batch instead of once per user:
+        content scores come from one matrix-matrix product of the users'
+        profiles with the article matrix, the User strategy is one
+        `UNWIND $user_ids` query, collaborative scores are one sparse product,
+        and Ontology/Keyword results (which only depend on the topic and query)
+        are computed once and shared. The strategies run concurrently on the
+        engine's pool without per-strategy deadlines; a failed strategy is left
+        out. Each user's list is read from and written to the result cache
+        under the same key as `get_recommendations`.
+
+        Args:
+            user_ids (list): User identifiers (duplicates are ignored)
+            topic (str): Topic for the ontology strategy
+            search_query (str): Optional keyword query
+            top_n (int, optional): Number of results per user
+
+        Returns:
+            dict: user_id -> ranked (uri, title, domain, approaches, score) tuples
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        signature = self._embeddings_signature(self.embeddings_file)
+        keys = {user_id: ('recommend', user_id, topic, search_query, top_n, signature) for user_id in user_ids}
+        recommendations = {}
+        if self.cache is not None:
+            for user_id in user_ids:
+                cached = self.cache.get(keys[user_id])
+                if cached is not None:
+                    recommendations[user_id] = cached
+        pending = [user_id for user_id in user_ids if user_id not in recommendations]
+        if not pending:
+            return recommendations
+
+        # Ontology and Keyword results are shared by every user; the others are user_id -> results
+        strategies = {
+            'Ontology': (self.get_ontology_recommendations, (topic, search_query, top_n)),
+            'Content': (self.get_content_recommendations_batch, (pending, self.embeddings_file, top_n)),
+            'Collaborative': (self.get_collaborative_recommendations_batch, (pending, top_n)),
+            'User': (self.get_user_recommendations_batch, (pending, top_n)),
+        }
+        if search_query and self.keyword_index is not None:
+            strategies['Keyword'] = (self.get_keyword_recommendations, (search_query, top_n))
+        futures = {name: self.executor.submit(fn, *args) for name, (fn, args) in strategies.items()}
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"{name} strategy failed: {e}")
+
+        for user_id in pending:
+            user_results = [recs if isinstance(recs, list) else recs[user_id] for recs in results.values()]
+            fused = self._fuse(user_results, top_n)
+            # Partial results (a strategy failed) are not cached
+            if self.cache is not None and len(results) == len(strategies):
+                self.cache.set(keys[user_id], fused, user_id=user_id)
+            recommendations[user_id] = fused
+        print(f"Batch recommendations computed for {len(pending)} users ({len(user_ids) - len(pending)} cached)")
+        return {user_id: recommendations[user_id] for user_id in user_ids}
+
+    def get_materialized(self, user_id, topic, search_query, top_n=None):
+        """
+        A user's precomputed ranking, if one is loaded and still valid.
+
+        Users whose profile has not been computed in this process yet count as
+        cold-start and get None, so the live path computes it.
+
+        Returns:
+            list: Ranked (uri, title, domain, approaches, score) tuples, or None
+        """
+        if self.materialized is None:
+            return None
+        self.materialized.refresh()
+        self.profile_store.refresh()
+        profile = self.profile_store.get(user_id)
+        if profile is None:
+            return None
+        signature = self._embeddings_signature(self.embeddings_file)
+        return self.materialized.get(
+            user_id, topic, search_query, top_n, profile_fingerprint(profile),
+            embeddings_mtime=signature[0] if signature else None, max_age=self.materialized_max_age
+        )
+
+    def invalidate_user(self, user_id):
+        """
+        Drop cached results that depend on a user's profile.
 
-        recs_grouped = recs_df.groupby(['uri', 'title', 'domain'])['approach'].apply(lambda x: ', '.join(sorted(set(x)))).reset_index()
-        return [(row['uri'], row['title'], row['domain'], row['approach']) for _, row in recs_grouped.iterrows()]  # Return URI first
+        Call this whenever the user's hasInterest edges change or new
+        interactions were appended to the logs. The user's profile vector is
+        dropped too and recomputed on next use, their materialized ranking is
+        no longer served, and the collaborative model picks up their interests
+        and any new log rows.
+
+        Args:
+            user_id (str): User whose interests changed
+        """
+        self.invalidate_users([user_id])
+
+    def invalidate_users(self, user_ids):
+        """
+        `invalidate_user` for many users, refreshing the collaborative model once.
+
+        Args:
+            user_ids (list): Users whose interests changed
+        """
+        user_ids = [str(user_id) for user_id in user_ids]
+        for user_id in user_ids:
+            self.profile_store.discard(user_id)
+            if self.materialized is not None:
+                self.materialized.discard(user_id)
+        if self.collaborative is not None and user_ids:
+            self.collaborative.refresh_interests(self.graph, user_ids)
+            if self.interaction_logs_file and os.path.exists(self.interaction_logs_file):
+                added = self.collaborative.refresh_interaction_logs(self.interaction_logs_file)
+                if added:
+                    print(f"Collaborative model: added {added} new interactions")
+        if self.cache is not None:
+            for user_id in user_ids:
+                self.cache.invalidate_user(user_id)
+
+    def _embeddings_signature(self, embeddings_file):
+        """Signature of the article embeddings; part of every cache key so a reload invalidates entries."""
+        store = self.get_embedding_store(embeddings_file)
+        store.refresh()
+        return store.signature
 
     def debug_search(self, search_topic, concepts_embeddings_file):
-        """Debug function to check concept matching"""
-        concepts_df = pd.read_csv(concepts_embeddings_file)
-        valid_concepts = concepts_df.dropna(subset=['hasNameEmbedding']).copy()
-        
+        """Debug function to check concept matching (concept embeddings as CSV or binary .npy, no Neo4j needed)"""
+        uris, _, _ = read_embeddings(concepts_embeddings_file, 'hasNameEmbedding', dim=self.embedding_dim, mmap=True)
+        label_map = read_labels(concepts_embeddings_file)
+        if not label_map:
+            print(f"{concepts_embeddings_file} has no concept labels")
+        labels = [label_map[uri] for uri in uris if uri in label_map]
+
         print(f"Search topic: {search_topic}")
-        print(f"Total concepts: {len(valid_concepts)}")
-        print(f"Sample concept labels: {valid_concepts['skos__prefLabel'].head(10).tolist()}")
-        
-        topic_rows = valid_concepts[valid_concepts['skos__prefLabel'].str.lower().str.contains(search_topic.lower(), na=False)]
-        print(f"Matching concepts found: {len(topic_rows)}")
-        if not topic_rows.empty:
-            print(f"Matching labels: {topic_rows['skos__prefLabel'].tolist()}")
+        print(f"Total concepts: {len(uris)}")
+        print(f"Sample concept labels: {labels[:10]}")
+
+        matching = [label for label in labels if search_topic.lower() in label.lower()]
+        print(f"Matching concepts found: {len(matching)}")
+        if matching:
+            print(f"Matching labels: {matching}")
 
 def main():
-    engine = RecommendationEngine("bolt://localhost:7687", "neo4j", "anass2003")
+    graph = GraphPool.from_env()
+    engine = RecommendationEngine(graph=graph)
     try:
         print(f"Recommendations for User_0 (Neural Networks):")
         user_recommendations = engine.get_recommendations("User_0", topic="Neural Networks")
-        for uri, title, domain, approaches in user_recommendations:
-            print(f"- {title} (URI: {uri}, Domaine: {domain}, Approches: {approaches})")
-        pd.DataFrame(user_recommendations, columns=["uri", "title", "domain", "approaches"]).to_csv("user_recommendations.csv", index=False)
+        for uri, title, domain, approaches, score in user_recommendations:
+            print(f"- {title} (URI: {uri}, Domaine: {domain}, Approches: {approaches}, Score: {score:.3f})")
+        pd.DataFrame(user_recommendations, columns=["uri", "title", "domain", "approaches", "score"]).to_csv("user_recommendations.csv", index=False)
 
         print(f"\nSearch Recommendations for 'machine learning':")
-        search_recommendations = engine.get_search_recommendations("machine learning", "data/embeddings/embeddings_articles.csv", "data/embeddings/embeddings_concepts.csv")
-        for title, domain, approaches in search_recommendations:
-            print(f"- {title} (Domaine: {domain}, Approches: {approaches})")
-        pd.DataFrame(search_recommendations, columns=["title", "domain", "approaches"]).to_csv("search_recommendations.csv", index=False)
+        search_recommendations = engine.get_search_recommendations("machine learning", ARTICLE_EMBEDDINGS_FILE, CONCEPT_EMBEDDINGS_FILE)
+        for uri, title, domain, approaches, score in search_recommendations:
+            print(f"- {title} (Domaine: {domain}, Approches: {approaches}, Score: {score:.3f})")
+        pd.DataFrame(search_recommendations, columns=["uri", "title", "domain", "approaches", "score"]).to_csv("search_recommendations.csv", index=False)
     finally:
         engine.close()
+        graph.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
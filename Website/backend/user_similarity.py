@@ -0,0 +1,205 @@
+"""
+Similar-User Search over Topic Sets
+
+Users are compared by the Jaccard overlap of the topics they interacted with
+(the `topic` column of fake_user_logs.csv). The logs are read once into a
+sparse binary user x topic matrix:
+
+- `UserTopicSets.similar_users` computes exact Jaccard against every user in
+  one sparse product (|A & B| = A . B, |A | B| = |A| + |B| - |A & B|).
+- `MinHashLSH` is for large populations: 64 MinHash values per user, split
+  into 32 bands of 2; users sharing a band are candidates, capped per bucket
+  and per query, and only the candidates are scored with exact Jaccard.
+
+Buckets are stored as sorted arrays (one per band) and looked up with binary
+search, so an index over a million users is a few flat arrays.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .similarity import top_k
+
+# Above this many users `UserTopicSets.similar_users` switches to the LSH index
+EXACT_SEARCH_MAX_USERS = 50_000
+
+_PRIME = (1 << 31) - 1
+
+
+class UserTopicSets:
+    """
+    Topic sets of every user as a binary CSR matrix.
+
+    Attributes:
+        users (list): User ids, row order
+        topics (list): Topic labels, column order
+        matrix (scipy.sparse.csr_matrix): user x topic, 1 where the user touched the topic
+        sizes (numpy.ndarray): Topic count of each user
+    """
+
+    def __init__(self, users, topics, matrix):
+        self.users = list(users)
+        self.topics = list(topics)
+        self.matrix = matrix.tocsr()
+        self.matrix.data[:] = 1
+        self.sizes = np.diff(self.matrix.indptr).astype(np.float32)
+        self._rows = {user_id: row for row, user_id in enumerate(self.users)}
+        self._columns = self.matrix.tocsc()
+        self._lsh = None
+
+    def __len__(self):
+        return len(self.users)
+
+    @classmethod
+    def from_pairs(cls, user_ids, topics):
+        """Build from parallel sequences of (user_id, topic) interactions; users are ordered by id."""
+        user_codes, users = pd.factorize(pd.Series(user_ids), sort=True)
+        topic_codes, topic_labels = pd.factorize(pd.Series(topics), sort=True)
+        matrix = sparse.csr_matrix(
+            (np.ones(len(user_codes), dtype=np.float32), (user_codes, topic_codes)),
+            shape=(len(users), len(topic_labels))
+        )
+        matrix.sum_duplicates()
+        return cls(users.tolist(), topic_labels.tolist(), matrix)
+
+    @classmethod
+    def from_logs(cls, logs_file):
+        """Build from fake_user_logs.csv."""
+        logs = pd.read_csv(logs_file, usecols=["user_id", "topic"]).dropna()
+        return cls.from_pairs(logs["user_id"].astype(str), logs["topic"].astype(str))
+
+    def topic_set(self, user_id):
+        """Topic column ids of a user (empty if unknown)."""
+        row = self._rows.get(user_id)
+        if row is None:
+            return np.zeros(0, dtype=np.int32)
+        return self.matrix.indices[self.matrix.indptr[row]:self.matrix.indptr[row + 1]]
+
+    def jaccard(self, user_id, rows=None):
+        """
+        Exact Jaccard similarity between a user and other users.
+
+        Args:
+            user_id (str): Query user
+            rows (numpy.ndarray, optional): Only score these rows (default: every user)
+
+        Returns:
+            numpy.ndarray: Similarities, aligned with `rows` (or with `users`)
+        """
+        topics = self.topic_set(user_id)
+        if rows is None:
+            intersection = np.asarray(self._columns[:, topics].sum(axis=1)).ravel()
+            sizes = self.sizes
+        else:
+            intersection = np.asarray(self.matrix[rows][:, topics].sum(axis=1)).ravel()
+            sizes = self.sizes[rows]
+        union = sizes + len(topics) - intersection
+        return np.divide(intersection, union, out=np.zeros(len(union), dtype=np.float32), where=union > 0)
+
+    def similar_users(self, user_id, top_n=5, method=None):
+        """
+        Users with the most similar topic sets.
+
+        Args:
+            user_id (str): Query user
+            top_n (int): Number of users to return
+            method (str, optional): "exact" or "lsh"; picked from the population size if None
+
+        Returns:
+            list: (user_id, jaccard) pairs, best first; ties keep user id order
+        """
+        row = self._rows.get(user_id)
+        if row is None or not self.sizes[row]:
+            return []
+        if method is None:
+            method = "exact" if len(self.users) <= EXACT_SEARCH_MAX_USERS else "lsh"
+
+        if method == "lsh":
+            candidates = self.lsh().candidates(row)
+            candidates = candidates[candidates != row]
+            scores = self.jaccard(user_id, candidates)
+            best, values = top_k(scores, k=top_n)
+            return [(self.users[candidates[i]], float(v)) for i, v in zip(best, values)]
+
+        scores = self.jaccard(user_id)
+        scores[row] = -1
+        best, values = top_k(scores, k=top_n, threshold=-1)
+        return [(self.users[i], float(v)) for i, v in zip(best, values)]
+
+    def lsh(self, **kwargs):
+        """Return the MinHash LSH index over these topic sets, building it on first use."""
+        if self._lsh is None or kwargs:
+            self._lsh = MinHashLSH(self.matrix, **kwargs)
+        return self._lsh
+
+
+class MinHashLSH:
+    """
+    Banded MinHash index over the rows of a binary sparse matrix.
+
+    Attributes:
+        bands (int): Number of bands; rows per band = num_perm // bands
+        max_bucket (int): Users taken from any single bucket per query
+        max_candidates (int): Upper bound on candidates returned per query
+        signatures (numpy.ndarray): (num_perm, n_users) int32 MinHash values
+    """
+
+    def __init__(self, matrix, num_perm=64, bands=32, max_bucket=200, max_candidates=2000, seed=0):
+        rng = np.random.default_rng(seed)
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.max_bucket = max_bucket
+        self.max_candidates = max_candidates
+        matrix = matrix.tocsr()
+
+        # h_i(t) = (a_i * t + b_i) mod p, hashed once per topic; a row's MinHash is the minimum over its topics
+        a = rng.integers(1, _PRIME, num_perm, dtype=np.int64)
+        b = rng.integers(0, _PRIME, num_perm, dtype=np.int64)
+        topic_hashes = ((np.arange(matrix.shape[1], dtype=np.int64)[None, :] * a[:, None] + b[:, None]) % _PRIME)
+        topic_hashes = topic_hashes.astype(np.int32)
+        n_rows = matrix.shape[0]
+        lengths = np.diff(matrix.indptr)
+        nonempty = lengths > 0
+        self.signatures = np.full((num_perm, n_rows), _PRIME, dtype=np.int32)
+        if nonempty.any():
+            row_starts = matrix.indptr[:-1][nonempty]
+            for perm in range(num_perm):
+                self.signatures[perm, nonempty] = np.minimum.reduceat(topic_hashes[perm, matrix.indices], row_starts)
+
+        # One 64-bit key per (user, band), sorted per band for binary-search lookups
+        mix = rng.integers(1, 1 << 62, self.rows_per_band, dtype=np.int64) | 1
+        self._keys, self._order = [], []
+        self._band_keys = np.empty((n_rows, bands), dtype=np.int64)
+        for band in range(bands):
+            block = self.signatures[band * self.rows_per_band:(band + 1) * self.rows_per_band]
+            keys = (block.astype(np.int64) * mix[:, None]).sum(axis=0)  # wraps modulo 2**64, fine for hashing
+            keys[~nonempty] = -1  # empty sets never collide
+            self._band_keys[:, band] = keys
+            order = np.argsort(keys, kind="stable")
+            self._keys.append(keys[order])
+            self._order.append(order)
+
+    def candidates(self, row):
+        """
+        Rows sharing at least one band with `row`.
+
+        Returns:
+            numpy.ndarray: Candidate row ids (may include `row`), at most `max_candidates`
+        """
+        found = []
+        total = 0
+        for band in range(self.bands):
+            key = self._band_keys[row, band]
+            if key == -1:
+                continue
+            keys = self._keys[band]
+            lo = np.searchsorted(keys, key, side="left")
+            hi = min(np.searchsorted(keys, key, side="right"), lo + self.max_bucket)
+            found.append(self._order[band][lo:hi])
+            total += hi - lo
+            if total >= self.max_candidates:
+                break
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))[:self.max_candidates]
@@ -5,6 +5,8 @@
 NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USER = "neo4j"
 NEO4J_PASSWORD = "your_password_here"
+NEO4J_POOL_SIZE = 50
+NEO4J_ACQUISITION_TIMEOUT = 30  # seconds to wait for a pooled connection
 
 # Flask Configuration
 FLASK_DEBUG = True
@@ -24,3 +26,14 @@ EMBEDDING_DIMENSION = 768
 DEFAULT_RECOMMENDATIONS = 10
 CONTENT_WEIGHT = 0.6
 ONTOLOGY_WEIGHT = 0.4
+FUSION_METHOD = "weighted"  # "weighted" (score x weight sum) or "rrf" (reciprocal rank fusion)
+
+# Concurrent strategy execution
+STRATEGY_WORKERS = 8
+STRATEGY_TIMEOUT = 5  # seconds per strategy, partial results are returned past it
+
+# Recommendation result cache
+RESULT_CACHE = "memory"  # "memory", "sqlite" (shared across workers) or "none"
+RESULT_CACHE_PATH = "data/result_cache.sqlite"
+RESULT_CACHE_SIZE = 1024
+RESULT_CACHE_TTL = 300  # seconds
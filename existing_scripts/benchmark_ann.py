@@ -0,0 +1,90 @@
+"""
+ANN Recall / Latency Report
+
+Measures recall@k and per-query latency of the IVF index for a range of
+`nprobe` values, against exact brute-force search.
+
+Queries are perturbed copies of random articles. By default the report runs on
+the real article embeddings; pass `--synthetic N` to use clustered random data
+instead (useful before any embeddings have been generated).
+
+Usage:
+    python existing_scripts/benchmark_ann.py --index data/embeddings/ann_index.npz
+    python existing_scripts/benchmark_ann.py --synthetic 200000 --k 10
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import sys
+import os
+script_dir = os.path.dirname(os.path.abspath(__file__))
+website_dir = os.path.abspath(os.path.join(script_dir, "..", "Website"))
+if website_dir not in sys.path:
+    sys.path.insert(0, website_dir)
+from backend.embedding_store import EmbeddingStore, normalize_rows
+from backend.ann_index import IVFIndex
+from backend.similarity import top_k_similar
+
+
+def synthetic_matrix(n, dim, n_topics=500, noise=0.8, seed=0):
+    """Clustered random embeddings, a rough stand-in for topic structure."""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((n_topics, dim), dtype=np.float32)
+    matrix = topics[rng.integers(0, n_topics, n)]
+    matrix += noise * rng.standard_normal((n, dim), dtype=np.float32)
+    return normalize_rows(matrix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embeddings", default="data/embeddings/embeddings_articles.csv")
+    parser.add_argument("--index", default=None, help="Prebuilt index (built on the fly if omitted)")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic articles instead of real ones")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    args = parser.parse_args()
+
+    if args.synthetic:
+        matrix = synthetic_matrix(args.synthetic, args.dim)
+        uris = [str(i) for i in range(len(matrix))]
+    else:
+        store = EmbeddingStore(args.embeddings)
+        store.load()
+        articles = store.snapshot()
+        matrix, uris = articles.matrix, articles.uris
+
+    if args.index and not args.synthetic:
+        index = IVFIndex.load(args.index)
+    else:
+        start = time.perf_counter()
+        index = IVFIndex.build(matrix, uris)
+        print(f"Built index with {index.nlist} cells in {time.perf_counter() - start:.1f}s")
+
+    rng = np.random.default_rng(1)
+    queries = matrix[rng.integers(0, len(matrix), args.queries)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape, dtype=np.float32) / np.sqrt(args.dim)
+
+    start = time.perf_counter()
+    truth = [set(top_k_similar(matrix, q, k=args.k)[0].tolist()) for q in queries]
+    exact_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+    print(f"{len(matrix)} articles, {index.nlist} cells, k={args.k}")
+    print(f"{'nprobe':>7} {'recall@k':>9} {'latency (ms)':>13} {'speedup':>8}")
+    print(f"{'exact':>7} {1.0:>9.3f} {exact_ms:>13.3f} {1.0:>7.1f}x")
+    for nprobe in args.nprobe:
+        if nprobe > index.nlist:
+            break
+        start = time.perf_counter()
+        results = [index.search(matrix, q, args.k, nprobe=nprobe)[0] for q in queries]
+        ann_ms = (time.perf_counter() - start) / len(queries) * 1000
+        recall = np.mean([len(truth[i] & set(r.tolist())) / args.k for i, r in enumerate(results)])
+        print(f"{nprobe:>7} {recall:>9.3f} {ann_ms:>13.3f} {exact_ms / ann_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Quantized Embedding Report
+
+Compares the embedding store modes (see `Website/backend/quantization.py`):
+resident memory of the in-memory matrix, per-query latency and recall@k
+against exact float32 search, for the quantized first pass alone and with
+exact re-ranking of `k * rerank_factor` candidates read from a memory-mapped
+full-precision matrix.
+
+Queries are perturbed copies of random articles. By default the report runs on
+the real article embeddings; pass `--synthetic N` to use clustered random data
+instead.
+
+Usage:
+    python existing_scripts/benchmark_quantization.py
+    python existing_scripts/benchmark_quantization.py --synthetic 200000 --k 10 --rerank-factor 1 2 4 8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import sys
+script_dir = os.path.dirname(os.path.abspath(__file__))
+website_dir = os.path.abspath(os.path.join(script_dir, "..", "Website"))
+if website_dir not in sys.path:
+    sys.path.insert(0, website_dir)
+from backend.embedding_store import EmbeddingStore
+from backend.quantization import QuantizedMatrix
+from backend.similarity import top_k, top_k_similar
+from benchmark_ann import synthetic_matrix
+
+
+def timed(fn, queries):
+    """Run `fn` on every query; returns (results, mean latency in ms)."""
+    start = time.perf_counter()
+    results = [fn(q) for q in queries]
+    return results, (time.perf_counter() - start) / len(queries) * 1000
+
+
+def recall(truth, results, k):
+    return np.mean([len(t & set(r.tolist())) / k for t, r in zip(truth, results)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embeddings", default="data/embeddings/embeddings_articles.csv")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic articles instead of real ones")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--rerank-factor", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    if args.synthetic:
+        matrix = synthetic_matrix(args.synthetic, args.dim)
+    else:
+        store = EmbeddingStore(args.embeddings)
+        store.load()
+        matrix = store.snapshot().matrix
+
+    rng = np.random.default_rng(1)
+    queries = matrix[rng.integers(0, len(matrix), args.queries)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape, dtype=np.float32) / np.sqrt(args.dim)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    exact, exact_ms = timed(lambda q: top_k_similar(matrix, q, k=args.k)[0], queries)
+    truth = [set(r.tolist()) for r in exact]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Re-ranking reads the full-precision rows from disk, as the store does in quantized modes
+        path = os.path.join(tmp, "matrix.f32.npy")
+        np.save(path, matrix)
+        mapped = np.load(path, mmap_mode="r")
+
+        print(f"{len(matrix)} articles x {matrix.shape[1]} dims, k={args.k}, {args.queries} queries")
+        print(f"{'mode':>8} {'rerank':>7} {'MiB':>8} {'B/article':>10} {'recall@k':>9} {'latency (ms)':>13}")
+        print(f"{'float32':>8} {'-':>7} {matrix.nbytes / 2**20:>8.1f} {matrix.nbytes // len(matrix):>10} "
+              f"{1.0:>9.3f} {exact_ms:>13.3f}")
+        for mode in ("float16", "int8"):
+            start = time.perf_counter()
+            quantized = QuantizedMatrix.from_matrix(matrix, mode)
+            build_s = time.perf_counter() - start
+            mib, per_article = quantized.nbytes / 2**20, quantized.nbytes // len(matrix)
+
+            first_pass, first_ms = timed(lambda q: top_k(quantized.scores(q), k=args.k)[0], queries)
+            print(f"{mode:>8} {'none':>7} {mib:>8.1f} {per_article:>10} {recall(truth, first_pass, args.k):>9.3f} "
+                  f"{first_ms:>13.3f}")
+            for factor in args.rerank_factor:
+                quantized.rerank_factor = factor
+                results, ms = timed(lambda q: quantized.search(mapped, q, args.k)[0], queries)
+                print(f"{mode:>8} {f'{factor}x':>7} {mib:>8.1f} {per_article:>10} {recall(truth, results, args.k):>9.3f} "
+                      f"{ms:>13.3f}")
+            print(f"{mode:>8} quantized in {build_s:.2f}s")
+        del mapped
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Server Throughput Benchmark: Flask vs ASGI
+
+Sends concurrent /recommend (or /search) requests to running servers and
+reports requests per second and latency percentiles at each concurrency
+level. Requests cycle through the users from /users and a list of topics so
+that, with RESULT_CACHE=none, every request reaches Neo4j.
+
+Start both servers against the same database first (from Website/), e.g.:
+    RESULT_CACHE=none python app.py                                    # Flask, port 5050
+    RESULT_CACHE=none uvicorn asgi_app:app --port 5051 --workers 1     # ASGI
+
+Usage:
+    python existing_scripts/benchmark_server.py
+    python existing_scripts/benchmark_server.py --url http://localhost:5050 http://localhost:5051 --concurrency 1 16 64
+    python existing_scripts/benchmark_server.py --endpoint /search --requests 1000
+"""
+
+import argparse
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+TOPICS = ["Neural Networks", "Machine Learning", "Deep Learning", "Computer Vision", "Natural Language Processing",
+          "Reinforcement Learning", "Graph", "Optimization", "Robotics", "Bioinformatics"]
+
+
+def get_json(url, payload=None, timeout=60):
+    """GET (or POST `payload` as JSON) and decode the response."""
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def payloads(endpoint, users, n):
+    """`n` request bodies cycling through users and topics."""
+    bodies = []
+    for i in range(n):
+        topic = TOPICS[i % len(TOPICS)]
+        if endpoint == "/search":
+            bodies.append({"topic": topic})
+        else:
+            bodies.append({"user_id": users[i % len(users)], "topic": topic, "search_query": ""})
+    return bodies
+
+
+def run(base_url, endpoint, bodies, concurrency):
+    """Send every body with `concurrency` clients; returns (requests/s, latencies in ms, errors)."""
+    def send(body):
+        start = time.perf_counter()
+        try:
+            get_json(base_url + endpoint, body)
+            return (time.perf_counter() - start) * 1000, False
+        except Exception:
+            return (time.perf_counter() - start) * 1000, True
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send, bodies))
+    elapsed = time.perf_counter() - start
+    latencies = np.array([latency for latency, _ in results])
+    errors = sum(failed for _, failed in results)
+    return len(bodies) / elapsed, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", nargs="+", default=["http://localhost:5050", "http://localhost:5051"],
+                        help="Base URLs of the servers to compare")
+    parser.add_argument("--endpoint", default="/recommend", choices=["/recommend", "/search"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--requests", type=int, default=500, help="Requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=20)
+    args = parser.parse_args()
+
+    users = get_json(args.url[0] + "/users") if args.endpoint == "/recommend" else []
+    if args.endpoint == "/recommend" and not users:
+        raise SystemExit("No users returned by /users")
+    bodies = payloads(args.endpoint, users, args.requests)
+
+    print(f"{'server':<28} {'clients':>7} {'req/s':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'errors':>6}")
+    for base_url in args.url:
+        run(base_url, args.endpoint, bodies[:args.warmup], 4)  # builds lazy indexes, opens pool connections
+        for concurrency in args.concurrency:
+            rps, latencies, errors = run(base_url, args.endpoint, bodies, concurrency)
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            print(f"{base_url:<28} {concurrency:>7} {rps:>8.1f} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f} {errors:>6}")
+
+
+if __name__ == "__main__":
+    main()
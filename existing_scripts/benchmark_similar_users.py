@@ -0,0 +1,99 @@
+"""
+Similar-User Search Benchmark
+
+Compares the original per-user DataFrame loop (small populations only), the
+vectorized exact Jaccard search and the MinHash LSH index on synthetic users
+whose topic sets follow archetypes, like `fake_user_generator.py`.
+
+Reported per population size: index build time, mean query latency, and for
+LSH the recall (summed Jaccard of the returned users over the exact top-n)
+and the mean candidate-set size.
+
+Usage:
+    python existing_scripts/benchmark_similar_users.py
+    python existing_scripts/benchmark_similar_users.py --users 10000 1000000 --queries 200
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import sys
+import os
+script_dir = os.path.dirname(os.path.abspath(__file__))
+website_dir = os.path.abspath(os.path.join(script_dir, "..", "Website"))
+if website_dir not in sys.path:
+    sys.path.insert(0, website_dir)
+from backend.user_similarity import UserTopicSets
+
+
+def synthetic_logs(n_users, n_topics=2000, n_archetypes=200, pool_size=15, seed=0):
+    """(user_id, topic) rows: each user draws 3-12 topics, mostly from their archetype's pool."""
+    rng = np.random.default_rng(seed)
+    pools = rng.integers(0, n_topics, (n_archetypes, pool_size))
+    counts = rng.integers(3, 13, n_users)
+    users = np.repeat(np.arange(n_users), counts)
+    archetypes = rng.integers(0, n_archetypes, n_users)[users]
+    topics = pools[archetypes, rng.integers(0, pool_size, len(users))]
+    noise = rng.random(len(users)) < 0.15
+    topics[noise] = rng.integers(0, n_topics, noise.sum())
+    return pd.DataFrame({"user_id": [f"User_{u}" for u in users], "topic": [f"Topic_{t}" for t in topics]})
+
+
+def loop_similar_users(df, user_id, top_n=5):
+    """The original HybridRecommender.get_similar_users body."""
+    user_topics = df[df["user_id"] == user_id]["topic"].value_counts().index.tolist()
+    other_users = df[df["user_id"] != user_id].groupby("user_id")["topic"].value_counts().reset_index()
+    user_similarities = []
+    for other_user in other_users["user_id"].unique():
+        other_topics = other_users[other_users["user_id"] == other_user]["topic"].tolist()
+        overlap = len(set(user_topics).intersection(other_topics)) / len(set(user_topics).union(other_topics))
+        user_similarities.append((other_user, overlap))
+    return sorted(user_similarities, key=lambda x: x[1], reverse=True)[:top_n]
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    results = [fn(q) for q in queries]
+    return results, (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument("--loop-max-users", type=int, default=2000, help="Skip the original loop above this size")
+    args = parser.parse_args()
+
+    print(f"{'users':>9} {'method':>7} {'build (s)':>10} {'query (ms)':>11} {'recall':>7} {'candidates':>11}")
+    for n_users in args.users:
+        df = synthetic_logs(n_users)
+        start = time.perf_counter()
+        topic_sets = UserTopicSets.from_pairs(df["user_id"], df["topic"])
+        build_s = time.perf_counter() - start
+        rng = np.random.default_rng(1)
+        queries = [topic_sets.users[i] for i in rng.integers(0, len(topic_sets), args.queries)]
+
+        if n_users <= args.loop_max_users:
+            _, loop_ms = timed(lambda u: loop_similar_users(df, u, args.top_n), queries[:10])
+            print(f"{n_users:>9} {'loop':>7} {0:>10.2f} {loop_ms:>11.2f} {1.0:>7.3f} {n_users - 1:>11}")
+
+        exact, exact_ms = timed(lambda u: topic_sets.similar_users(u, args.top_n, method="exact"), queries)
+        print(f"{n_users:>9} {'exact':>7} {build_s:>10.2f} {exact_ms:>11.2f} {1.0:>7.3f} {n_users - 1:>11}")
+
+        start = time.perf_counter()
+        lsh = topic_sets.lsh()
+        lsh_build_s = time.perf_counter() - start
+        approx, lsh_ms = timed(lambda u: topic_sets.similar_users(u, args.top_n, method="lsh"), queries)
+        recall = np.mean([
+            sum(s for _, s in a) / max(sum(s for _, s in e), 1e-9) for a, e in zip(approx, exact)
+        ])
+        candidates = np.mean([len(lsh.candidates(topic_sets._rows[u])) for u in queries])
+        print(f"{n_users:>9} {'lsh':>7} {lsh_build_s:>10.2f} {lsh_ms:>11.2f} {recall:>7.3f} {candidates:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
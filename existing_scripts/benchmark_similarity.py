@@ -0,0 +1,87 @@
+"""
+Similarity Kernel Benchmark
+
+Compares the historical per-row `1 - scipy.spatial.distance.cosine(...)` loop
+with the vectorized matrix-vector product + partial top-k selection from
+`Website/backend/similarity.py` on synthetic 768-dimensional embeddings.
+
+The per-row loop is timed on a sample of rows and extrapolated linearly to the
+full corpus size, since looping over a million rows in Python takes minutes.
+
+Usage:
+    python existing_scripts/benchmark_similarity.py
+    python existing_scripts/benchmark_similarity.py --sizes 10000 100000 --top-k 50
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import sys
+import os
+script_dir = os.path.dirname(os.path.abspath(__file__))
+website_dir = os.path.abspath(os.path.join(script_dir, "..", "Website"))
+if website_dir not in sys.path:
+    sys.path.insert(0, website_dir)
+from backend.embedding_store import normalize_rows
+from backend.similarity import top_k_similar, domain_boost_vector
+
+try:
+    from scipy.spatial.distance import cosine
+except ImportError:  # scipy is only needed for the baseline
+    def cosine(u, v):
+        return 1 - np.dot(u, v) / (np.linalg.norm(u) * np.linalg.norm(v))
+
+
+def random_matrix(n, dim, seed=0, chunk=100_000):
+    """Generate a normalized float32 matrix in chunks to bound peak memory."""
+    rng = np.random.default_rng(seed)
+    matrix = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        matrix[start:stop] = rng.standard_normal((stop - start, dim), dtype=np.float32)
+    return normalize_rows(matrix)
+
+
+def time_call(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--baseline-sample", type=int, default=10_000,
+                        help="Rows timed with the per-row loop before extrapolating")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    query = np.random.default_rng(42).standard_normal(args.dim).astype(np.float32)
+    print(f"{'articles':>10} {'loop (s)':>10} {'kernel (ms)':>12} {'+boost (ms)':>12} {'speedup':>9}")
+    for n in args.sizes:
+        matrix = random_matrix(n, args.dim)
+        boost = domain_boost_vector(["Artificial Intelligence" if i % 3 == 0 else "Physics" for i in range(n)])
+
+        sample = matrix[:min(n, args.baseline_sample)]
+        start = time.perf_counter()
+        similarities = 1 - np.array([cosine(query, emb) for emb in sample])
+        np.argsort(-similarities)[:args.top_k]
+        loop_seconds = (time.perf_counter() - start) * n / len(sample)
+
+        kernel_seconds = time_call(lambda: top_k_similar(matrix, query, k=args.top_k), args.repeats)
+        boosted_seconds = time_call(lambda: top_k_similar(matrix, query, k=args.top_k, threshold=0.0, boost=boost), args.repeats)
+
+        print(f"{n:>10} {loop_seconds:>10.2f} {kernel_seconds * 1000:>12.2f} {boosted_seconds * 1000:>12.2f} "
+              f"{loop_seconds / kernel_seconds:>8.0f}x")
+        del matrix, boost
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Build the Approximate Nearest-Neighbour Index
+
+Run after `generate_embeddings.py`. Loads the article embeddings, trains an
+IVF-flat index (see `Website/backend/ann_index.py`) and saves it next to the
+embeddings, where the Flask app picks it up through `ANN_INDEX_FILE`.
+
+Usage:
+    python existing_scripts/build_ann_index.py
+    python existing_scripts/build_ann_index.py --nlist 1024 --nprobe 16
+"""
+
+import argparse
+import time
+
+import sys
+import os
+script_dir = os.path.dirname(os.path.abspath(__file__))
+website_dir = os.path.abspath(os.path.join(script_dir, "..", "Website"))
+if website_dir not in sys.path:
+    sys.path.insert(0, website_dir)
+from backend.embedding_store import EmbeddingStore
+from backend.ann_index import IVFIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the IVF index over article embeddings")
+    parser.add_argument("--embeddings", default="data/embeddings/embeddings_articles.csv")
+    parser.add_argument("--output", default="data/embeddings/ann_index.npz")
+    parser.add_argument("--nlist", type=int, default=None, help="Number of cells (default ~4*sqrt(n))")
+    parser.add_argument("--nprobe", type=int, default=8, help="Default cells probed per query")
+    parser.add_argument("--iterations", type=int, default=10, help="k-means iterations")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    store = EmbeddingStore(args.embeddings)
+    store.load()
+    articles = store.snapshot()
+    if not articles.uris:
+        print("No embeddings found, nothing to index")
+        return
+
+    start = time.perf_counter()
+    index = IVFIndex.build(articles.matrix, articles.uris, nlist=args.nlist, nprobe=args.nprobe,
+                           n_iter=args.iterations, seed=args.seed)
+    index.save(args.output)
+    print(f"Indexed {len(articles.uris)} articles into {index.nlist} cells in "
+          f"{time.perf_counter() - start:.1f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Build the BM25 Keyword Index
+
+Run after the articles have been processed. Indexes the title and abstract of
+every article in `processed_articles.json` (see `Website/backend/bm25.py`) and
+saves the postings as `.npz`, where the Flask app picks them up through
+`KEYWORD_INDEX_FILE`.
+
+Usage:
+    python existing_scripts/build_keyword_index.py
+    python existing_scripts/build_keyword_index.py --k1 1.5 --b 0.75 --query "graph neural networks"
+"""
+
+import argparse
+import time
+
+import sys
+import os
+script_dir = os.path.dirname(os.path.abspath(__file__))
+website_dir = os.path.abspath(os.path.join(script_dir, "..", "Website"))
+if website_dir not in sys.path:
+    sys.path.insert(0, website_dir)
+from backend.bm25 import BM25Index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the BM25 index over article titles and abstracts")
+    parser.add_argument("--articles", default="data/cleaned data/processed_articles.json")
+    parser.add_argument("--output", default="data/keyword_index.npz")
+    parser.add_argument("--k1", type=float, default=1.2, help="Term frequency saturation")
+    parser.add_argument("--b", type=float, default=0.75, help="Document length normalization")
+    parser.add_argument("--query", default=None, help="Run a sample query against the new index")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = BM25Index.from_articles_file(args.articles, k1=args.k1, b=args.b)
+    index.save(args.output)
+    print(f"Indexed {len(index)} articles, {len(index.terms)} terms, {len(index.postings_docs)} postings in "
+          f"{time.perf_counter() - start:.1f}s -> {args.output}")
+
+    if args.query:
+        start = time.perf_counter()
+        hits = index.search(args.query, k=10)
+        print(f"Top {len(hits)} for '{args.query}' ({(time.perf_counter() - start) * 1000:.2f} ms):")
+        for uri, score in hits:
+            print(f"- {uri} ({score:.3f})")
+
+
+if __name__ == "__main__":
+    main()
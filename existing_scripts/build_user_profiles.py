@@ -0,0 +1,50 @@
+"""
+Build the User Profile Vectors
+
+Run after `populate_user_profiles_neo4j.py` and `load_embeddings_to_neo4j.py`.
+Averages the concept name embeddings behind every user's `hasInterest` edges,
+normalizes them (see `Website/backend/profile_store.py`) and saves the matrix
+next to the article embeddings, where the Flask app picks it up through
+`USER_PROFILES_FILE`.
+
+Usage:
+    python existing_scripts/build_user_profiles.py
+    python existing_scripts/build_user_profiles.py --users User_0 User_7
+"""
+
+import argparse
+import time
+
+import sys
+import os
+script_dir = os.path.dirname(os.path.abspath(__file__))
+website_dir = os.path.abspath(os.path.join(script_dir, "..", "Website"))
+if website_dir not in sys.path:
+    sys.path.insert(0, website_dir)
+from backend.profile_store import UserProfileStore
+from backend.graph import GraphPool
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute and persist user profile vectors")
+    parser.add_argument("--output", default="data/embeddings/user_profiles.npz")
+    parser.add_argument("--users", nargs="+", default=None, help="Only recompute these users (incremental)")
+    args = parser.parse_args()
+
+    store = UserProfileStore(args.output)
+    if args.users and os.path.exists(args.output):
+        store.load()
+
+    # Connection settings come from the NEO4J_* environment variables
+    graph = GraphPool.from_env()
+    try:
+        start = time.perf_counter()
+        count = store.recompute(graph, args.users)
+    finally:
+        graph.close()
+    store.save()
+    print(f"Computed {count} user profiles ({len(store)} stored) in {time.perf_counter() - start:.1f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
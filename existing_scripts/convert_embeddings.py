@@ -0,0 +1,62 @@
+"""
+Convert Embedding CSVs to the Binary Format
+
+Rewrites `embeddings_articles.csv` / `embeddings_concepts.csv` (one JSON list
+per CSV cell) as a float32 `.npy` matrix with a URI sidecar and a JSON header
+(see `Website/backend/embedding_file.py`), next to each CSV, plus a labels
+sidecar when the CSV has a concept label column. Point
+EMBEDDINGS_FILE / CONCEPTS_EMBEDDINGS_FILE (or any script's `--embeddings`)
+at the `.npy` to use it; every reader accepts either format.
+
+Vectors are stored as generated unless `--normalize` is given. Normalized
+files let the web app memory-map the matrix directly for exact re-ranking in
+quantized modes, but `load_embeddings_to_neo4j.py` would then write
+normalized vectors into Neo4j.
+
+Rerun after `generate_embeddings.py`, which still writes the CSVs.
+
+Usage:
+    python existing_scripts/convert_embeddings.py
+    python existing_scripts/convert_embeddings.py data/embeddings/embeddings_articles.csv --normalize
+"""
+
+import argparse
+import os
+import time
+
+import sys
+script_dir = os.path.dirname(os.path.abspath(__file__))
+website_dir = os.path.abspath(os.path.join(script_dir, "..", "Website"))
+if website_dir not in sys.path:
+    sys.path.insert(0, website_dir)
+from backend.embedding_file import read_embeddings, read_labels, save_binary, csv_column
+from backend.embedding_store import normalize_rows
+
+MODEL_NAME = "allenai/scibert_scivocab_uncased"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert embedding CSVs to float32 .npy files with URI/header sidecars")
+    parser.add_argument("inputs", nargs="*", default=["data/embeddings/embeddings_articles.csv",
+                                                      "data/embeddings/embeddings_concepts.csv"])
+    parser.add_argument("--model", default=MODEL_NAME, help="Model name recorded in the header")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--normalize", action="store_true", help="Store L2-normalized rows")
+    args = parser.parse_args()
+
+    for path in args.inputs:
+        start = time.perf_counter()
+        column = csv_column(path)
+        uris, matrix, _ = read_embeddings(path, column, dim=args.dim)
+        labels = read_labels(path)
+        if args.normalize:
+            normalize_rows(matrix)
+        output = os.path.splitext(path)[0] + ".npy"
+        save_binary(output, uris, matrix, model_name=args.model, normalized=args.normalize, column=column,
+                    labels=[labels.get(uri, "") for uri in uris] if labels else None)
+        print(f"Converted {len(uris)} embeddings in {time.perf_counter() - start:.1f}s: "
+              f"{os.path.getsize(path) / 2**20:.1f} MiB CSV -> {os.path.getsize(output) / 2**20:.1f} MiB {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Content-Addressed Embedding Cache
+
+Persists every embedding `generate_embeddings.py` computes, keyed by a hash of
+(model name and inference backend, max_length, input text), so reruns only
+embed texts that are new or changed. Keys do not depend on article or concept ids: the same text under
+several ids (e.g. a concept name reused across OpenAlex concepts) maps to one
+entry.
+
+Entries live in one float32 matrix with a 16-byte key per row, saved as
+`.npz` next to the embedding CSVs.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+
+def text_key(model_name, max_length, text):
+    """16-byte cache key of one input text for a given model (`EmbeddingGenerator.cache_id`) and truncation length."""
+    return hashlib.sha256(f"{model_name}\x00{max_length}\x00{text}".encode()).digest()[:16]
+
+
+class EmbeddingCache:
+    """
+    Embeddings keyed by `text_key`.
+
+    Attributes:
+        path (str): `.npz` file the cache is persisted to
+        dim (int): Embedding dimension
+    """
+
+    def __init__(self, path, dim=768):
+        self.path = path
+        self.dim = dim
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._rows = {}  # key -> row
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def load(self):
+        """Read the persisted cache, replacing the in-memory entries."""
+        data = np.load(self.path)
+        self._matrix = data["matrix"].astype(np.float32, copy=False)
+        self._rows = {key.tobytes(): row for row, key in enumerate(data["keys"])}
+
+    def get(self, key):
+        """Cached vector for `key`, or None."""
+        row = self._rows.get(key)
+        return None if row is None else self._matrix[row]
+
+    def put(self, key, vector):
+        """Store (or overwrite) the vector for `key`."""
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._rows)
+            if row == len(self._matrix):
+                # Grow geometrically so adding entries one at a time stays amortized O(1)
+                grown = np.zeros((max(2 * len(self._matrix), 1024), self.dim), dtype=np.float32)
+                grown[:row] = self._matrix[:row]
+                self._matrix = grown
+            self._rows[key] = row
+        self._matrix[row] = vector
+
+    def save(self):
+        """Persist the cache atomically (written to a temporary file, then renamed)."""
+        keys = sorted(self._rows, key=self._rows.get)
+        tmp_path = self.path + ".tmp.npz"
+        np.savez(tmp_path, matrix=self._matrix[:len(keys)],
+                 keys=np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(len(keys), 16))
+        os.replace(tmp_path, self.path)
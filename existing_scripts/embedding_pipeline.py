@@ -0,0 +1,151 @@
+"""
+Sharded, Resumable Embedding Pipeline
+
+Splits the texts to embed across N worker processes for CPU-only machines.
+Each worker loads its own model and caps its `torch` thread count, so the
+workers do not oversubscribe the cores.
+
+Every worker writes its vectors to disk as it goes, one checkpoint part
+(`.npz` of content-hash keys and vectors, see `embedding_cache.text_key`)
+per `chunk_size` texts, written aside and renamed so a part is either
+complete or absent. When a run is interrupted, the next run with the same
+checkpoint directory loads the finished parts first and only embeds the texts
+still missing. `clear_checkpoints` removes the parts once their vectors have
+been saved elsewhere.
+
+Progress of all workers is aggregated into one progress bar, followed by a
+throughput report per shard. An error in any worker is raised in the parent
+once the other shards have finished (and checkpointed) their work.
+
+Used by `generate_embeddings.py --workers N`.
+"""
+
+import glob
+import multiprocessing
+import os
+import queue
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+import torch
+from tqdm import tqdm
+
+
+def load_checkpoints(checkpoint_dir):
+    """
+    Vectors of every finished checkpoint part.
+
+    Args:
+        checkpoint_dir (str): Directory the workers write their parts to
+
+    Returns:
+        dict: key (bytes) -> vector
+    """
+    vectors = {}
+    for path in sorted(glob.glob(os.path.join(checkpoint_dir, "*.part.npz"))):
+        data = np.load(path)
+        vectors.update(zip((key.tobytes() for key in data["keys"]), data["vectors"]))
+    return vectors
+
+
+def clear_checkpoints(checkpoint_dir):
+    """Delete the checkpoint parts (after their vectors were persisted)."""
+    for path in glob.glob(os.path.join(checkpoint_dir, "*.part.npz")):
+        os.remove(path)
+
+
+def _write_part(path, keys, vectors):
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, keys=np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(len(keys), 16), vectors=vectors)
+    os.replace(tmp_path, path)
+
+
+def _init_worker(threads):
+    torch.set_num_threads(threads)
+
+
+def _embed_shard(shard, items, checkpoint_dir, run_id, generator_options, batch_size, max_length, chunk_size, progress):
+    """Embed one shard of (text, key) pairs chunk by chunk, checkpointing each chunk."""
+    from generate_embeddings import EmbeddingGenerator
+
+    generator = EmbeddingGenerator(batch_size=batch_size, **generator_options)
+    start = time.perf_counter()
+    for part, offset in enumerate(range(0, len(items), chunk_size)):
+        chunk = items[offset:offset + chunk_size]
+        vectors = generator._embed_distinct([text for text, _ in chunk], batch_size, max_length, False, "")
+        _write_part(os.path.join(checkpoint_dir, f"{run_id}-shard{shard:03d}-{part:06d}.part.npz"),
+                    [key for _, key in chunk], vectors)
+        progress.put(len(chunk))
+    return shard, len(items), time.perf_counter() - start
+
+
+def embed_sharded(texts, keys, checkpoint_dir, workers, threads_per_worker=None, generator_options=None,
+                  batch_size=32, max_length=512, chunk_size=1024, desc="Embedding texts"):
+    """
+    Embed distinct non-empty texts across worker processes, resuming from checkpoints.
+
+    Args:
+        texts (list): Distinct non-empty texts
+        keys (list): `text_key` of each text (checkpoints are matched by key)
+        checkpoint_dir (str): Directory for checkpoint parts
+        workers (int): Worker processes
+        threads_per_worker (int, optional): torch threads per worker, defaults to cpu_count // workers
+        generator_options (dict, optional): `EmbeddingGenerator` arguments (model, backend, ...) of every worker
+        batch_size (int): Texts per forward pass
+        max_length (int): Maximum token length for truncation
+        chunk_size (int): Texts per checkpoint part
+        desc (str): Progress bar label
+
+    Returns:
+        numpy.ndarray: One vector per text, in input order
+
+    Raises:
+        Exception: The first error raised by a worker
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    done = load_checkpoints(checkpoint_dir)
+    remaining = [(text, key) for text, key in zip(texts, keys) if key not in done]
+    if len(remaining) < len(texts):
+        print(f"Resuming: {len(texts) - len(remaining)} of {len(texts)} texts found in checkpoints")
+
+    if remaining:
+        threads = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        # Round-robin over texts sorted by length balances the shards and keeps each chunk's lengths close
+        remaining.sort(key=lambda item: len(item[0]))
+        shards = [remaining[i::workers] for i in range(workers)]
+        run_id = uuid.uuid4().hex[:8]
+        start = time.perf_counter()
+        context = multiprocessing.get_context("spawn")  # torch is not fork-safe
+        with context.Manager() as manager, ProcessPoolExecutor(
+                max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(threads,)) as pool:
+            progress = manager.Queue()
+            futures = [pool.submit(_embed_shard, shard, items, checkpoint_dir, run_id, generator_options or {},
+                                   batch_size, max_length, chunk_size, progress)
+                       for shard, items in enumerate(shards) if items]
+            stats, error = [], None
+            with tqdm(total=len(remaining), desc=f"{desc} ({workers} workers x {threads} threads)") as bar:
+                pending = set(futures)
+                while pending:
+                    finished, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                    try:
+                        while True:
+                            bar.update(progress.get_nowait())
+                    except queue.Empty:
+                        pass
+                    for future in finished:
+                        try:
+                            stats.append(future.result())
+                        except Exception as e:
+                            error = error or e
+            if error is not None:
+                raise error
+        elapsed = time.perf_counter() - start
+        for shard, count, seconds in sorted(stats):
+            print(f"  shard {shard}: {count} texts in {seconds:.1f}s ({count / max(seconds, 1e-9):.1f} texts/sec)")
+        print(f"Embedded {len(remaining)} texts with {workers} workers in {elapsed:.1f}s "
+              f"({len(remaining) / elapsed:.1f} texts/sec)")
+        done = load_checkpoints(checkpoint_dir)
+
+    return np.stack([done[key] for key in keys]) if keys else np.zeros((0, 0), dtype=np.float32)
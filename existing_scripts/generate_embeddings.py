@@ -13,7 +13,20 @@ Process:
 1. Load processed articles and concepts from JSON files
 2. Generate embeddings for article abstracts and titles
 3. Generate embeddings for concept names
-4. Save embeddings as CSV files for use in recommendation engine
+   (batched: texts are bucketed by token length, see `EmbeddingGenerator.embed_many`)
+4. Merge embeddings into the CSV files used by the recommendation engine
+
+Every vector is cached by a hash of (model, max_length, text) in
+`embedding_cache.npz`, so reruns only embed new or changed texts.
+
+On CPU-only machines, `--backend torch-int8` runs the model with dynamically
+int8-quantized linear layers and `--quality-check N` reports how closely its
+vectors agree with fp32 on N articles. The model is loaded from the local
+Hugging Face cache only, never from the network; pass `--allow-download`
+once to fetch it. `--workers N` shards the texts across N processes with a
+capped thread count each (see `embedding_pipeline.py`); every shard
+checkpoints its vectors as it goes, so an interrupted run resumes where it
+stopped.
 
 Output:
 - embeddings_articles.csv: Article embeddings with metadata
@@ -27,13 +40,15 @@ Requirements:
 
 import pandas as pd
 import numpy as np
-from transformers import AutoTokenizer, AutoModel
+from transformers import AutoConfig, AutoTokenizer, AutoModel
 import torch
 from tqdm import tqdm
 
+import argparse
 import re
 import os
 import json
+import time
 import sys
 import os
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -41,6 +56,110 @@ project_root = os.path.abspath(os.path.join(script_dir, "..")) # Goes up to VER
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 from backend_api.config import Config
+from embedding_cache import EmbeddingCache, text_key
+from embedding_pipeline import embed_sharded, clear_checkpoints
+
+MODEL_NAME = "allenai/scibert_scivocab_uncased"
+
+
+def _load_torch(model_name, local_files_only):
+    """fp32 PyTorch model, on the GPU if one is available."""
+    model = AutoModel.from_pretrained(model_name, local_files_only=local_files_only)
+    return model, torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+
+def _load_torch_int8(model_name, local_files_only):
+    """PyTorch model with dynamically int8-quantized linear layers (CPU only)."""
+    model, _ = _load_torch(model_name, local_files_only)
+    model.eval()
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8), torch.device("cpu")
+
+
+# Inference backend name -> loader(model_name, local_files_only) returning (model, device)
+INFERENCE_BACKENDS = {
+    "torch": _load_torch,
+    "torch-int8": _load_torch_int8,
+}
+ONTOLOGY_NS = "http://www.semanticweb.org/vss/ontology/scientific_recommender#"
+
+
+def merge_embeddings(path, uris, column, vectors):
+    """
+    Write embeddings into a CSV, keeping the existing rows of URIs not in `uris`.
+
+    Args:
+        path (str): embeddings_articles.csv or embeddings_concepts.csv
+        uris (list): URIs embedded in this run
+        column (str): Embedding column ("hasAbstractEmbedding" or "hasNameEmbedding")
+        vectors (numpy.ndarray): One vector per URI
+
+    Returns:
+        int: Number of rows in the written file
+    """
+    df = pd.DataFrame({"uri": uris, column: [vector.tolist() for vector in vectors]})
+    if os.path.exists(path):
+        existing = pd.read_csv(path, usecols=["uri", column])
+        df = pd.concat([existing[~existing["uri"].isin(set(uris))], df], ignore_index=True)
+    # Written aside and renamed, so the web app never reloads a half-written file
+    tmp_path = path + ".tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return len(df)
+
+
+def article_texts(articles_file):
+    """
+    Article URIs and the text embedded for each (abstract, or title when there is none).
+
+    Args:
+        articles_file (str): processed_articles.json
+
+    Returns:
+        tuple: (uris, texts)
+    """
+    articles = pd.read_json(articles_file)
+    uris, texts = [], []
+    for _, row in articles.iterrows():
+        w_id = re.sub(r'\W+', '_', str(row["id"]))
+        uris.append(f"{ONTOLOGY_NS}{w_id}")
+        texts.append(str(row["abstract"]) if row["abstract"] and isinstance(row["abstract"], str) else str(row["title"]))
+    return uris, texts
+
+
+def check_backend_quality(texts, backend, sample=200, batch_size=32, model_name=MODEL_NAME, local_files_only=True, seed=0):
+    """
+    Compare a backend's embeddings with the fp32 PyTorch ones on a random sample of texts.
+
+    Args:
+        texts (list): Texts to sample from
+        backend (str): Inference backend to check, one of `INFERENCE_BACKENDS`
+        sample (int): Number of texts compared
+        batch_size (int): Texts per forward pass
+        model_name (str): Hugging Face model id or local model directory
+        local_files_only (bool): Load the model from the local cache, never from the network
+        seed (int): Sampling seed
+
+    Returns:
+        dict: Mean, minimum and 1st-percentile cosine similarity, and texts/sec of both backends
+    """
+    rng = np.random.default_rng(seed)
+    texts = [text for text in texts if text and isinstance(text, str)]
+    texts = [texts[i] for i in rng.choice(len(texts), size=min(sample, len(texts)), replace=False)]
+    report = {}
+    vectors = {}
+    for name in ("torch", backend):
+        generator = EmbeddingGenerator(batch_size=batch_size, model_name=model_name, backend=name,
+                                       local_files_only=local_files_only)
+        start = time.perf_counter()
+        vectors[name] = generator.embed_many(texts, show_progress=False)
+        report[f"{name} texts/sec"] = len(texts) / (time.perf_counter() - start)
+    reference, candidate = vectors["torch"], vectors[backend]
+    cosines = np.sum(reference * candidate, axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1))
+    report.update({"texts": len(texts), "mean cosine": float(cosines.mean()), "min cosine": float(cosines.min()),
+                   "p1 cosine": float(np.percentile(cosines, 1))})
+    return report
+
 
 class EmbeddingGenerator:
     """
@@ -54,18 +173,72 @@ class EmbeddingGenerator:
         tokenizer: SciBERT tokenizer for text preprocessing
         model: SciBERT model for embedding generation
         device: Computing device (CUDA GPU if available, else CPU)
+        model_name (str): Hugging Face model id or local model directory
+        backend (str): Inference backend, one of `INFERENCE_BACKENDS`
+        local_files_only (bool): Load the model from the local cache, never from the network
+        cache_id (str): Model identity in embedding cache keys (model name, plus the backend unless fp32)
+        batch_size (int): Texts per forward pass in `embed_many`
+        dim (int): Embedding dimension
+        workers (int): Worker processes `embed_many` shards texts across (1: embed in this process)
+        threads_per_worker (int): torch threads per worker (None: cpu_count // workers)
+        checkpoint_dir (str): Directory of the workers' checkpoint parts
+        chunk_size (int): Texts per checkpoint part
     """
     
-    def __init__(self):
-        """Initialize the SciBERT model and tokenizer."""
-        print("🔧 Initializing SciBERT model...")
-        self.tokenizer = AutoTokenizer.from_pretrained("allenai/scibert_scivocab_uncased")
-        self.model = AutoModel.from_pretrained("allenai/scibert_scivocab_uncased")
-        
-        # Use GPU if available for faster processing
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    def __init__(self, batch_size=32, model_name=MODEL_NAME, workers=1, threads_per_worker=None,
+                 checkpoint_dir="embedding_checkpoints", chunk_size=1024, backend="torch", local_files_only=True):
+        """
+        Initialize the SciBERT model and tokenizer.
+
+        With several workers, every worker process loads its own model and this
+        process only reads the model config.
+
+        Args:
+            batch_size (int): Default number of texts per forward pass in `embed_many`
+            model_name (str): Hugging Face model id
+            workers (int): Worker processes for `embed_many`
+            threads_per_worker (int, optional): torch threads per worker
+            checkpoint_dir (str): Directory of the workers' checkpoint parts
+            chunk_size (int): Texts per checkpoint part
+            backend (str): Inference backend, one of `INFERENCE_BACKENDS`
+            local_files_only (bool): Load the model from the local cache, never from the network;
+                False allows downloading it
+
+        Raises:
+            OSError: If the model is not in the local cache and downloading is not allowed
+        """
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unknown inference backend: {backend}")
+        self.model_name = model_name
+        self.backend = backend
+        self.local_files_only = local_files_only
+        # Quantized backends produce slightly different vectors, so they get their own cache entries
+        self.cache_id = model_name if backend == "torch" else f"{model_name}#{backend}"
+        self.batch_size = batch_size
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.checkpoint_dir = checkpoint_dir
+        self.chunk_size = chunk_size
+        try:
+            if workers > 1:
+                self.tokenizer = self.model = self.device = None
+                self.dim = AutoConfig.from_pretrained(model_name, local_files_only=local_files_only).hidden_size
+                print(f"🔧 Embedding with {workers} worker processes")
+                return
+
+            print(f"🔧 Initializing SciBERT model ({backend} backend)...")
+            start = time.perf_counter()
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name, local_files_only=local_files_only)
+            self.model, self.device = INFERENCE_BACKENDS[backend](model_name, local_files_only)
+        except OSError as e:
+            if not local_files_only:
+                raise
+            raise OSError(f"{model_name} is not in the local Hugging Face cache; "
+                          f"run once with --allow-download (local_files_only=False) to fetch it") from e
+        self.dim = self.model.config.hidden_size
         self.model.to(self.device)
-        print(f"✅ Model loaded on device: {self.device}")
+        self.model.eval()
+        print(f"✅ Model loaded on device: {self.device} in {time.perf_counter() - start:.1f}s")
 
     def get_embedding(self, text, max_length=512):
         """
@@ -78,52 +251,156 @@ class EmbeddingGenerator:
         Returns:
             numpy.ndarray: 768-dimensional embedding vector
         """
-        if not text or not isinstance(text, str) or pd.isna(text):
-            return np.zeros(768)
-        inputs = self.tokenizer(text, return_tensors="pt", max_length=max_length, truncation=True, padding=True)
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-        return outputs.last_hidden_state.mean(dim=1).squeeze().cpu().numpy()
-
-    def generate_and_save_embeddings(self, articles_file, concepts_file, output_dir=r"C:\Users\VSS\Desktop\WebAPP\VER 2\data\embeddings"):
-        try:
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # Articles
-            articles = pd.read_json(articles_file)
-            article_embeddings = []
-            for _, row in tqdm(articles.iterrows(), total=len(articles), desc="Generating Article Embeddings"):
-                w_id = re.sub(r'\W+', '_', str(row["id"]))
-                text = str(row["abstract"]) if row["abstract"] and isinstance(row["abstract"], str) else str(row["title"])
-                abstract_emb = self.get_embedding(text).tolist()
-                article_embeddings.append({
-                    "uri": f"http://www.semanticweb.org/vss/ontology/scientific_recommender#{w_id}",
-                    "hasAbstractEmbedding": abstract_emb
-                })
-            article_df = pd.DataFrame(article_embeddings)
-            article_df.to_csv(f"{output_dir}/embeddings_articles.csv", index=False)
-            print(f"Saved {len(article_embeddings)} article embeddings to {output_dir}/embeddings_articles.csv")
-
-            # Concepts
-            concepts = pd.read_json(concepts_file)
-            concept_embeddings = []
-            for _, row in tqdm(concepts.iterrows(), total=len(concepts), desc="Generating Concept Embeddings"):
-                c_id = re.sub(r'\W+', '_', str(row["id"]))
-                name = str(row["name"]) if row["name"] and isinstance(row["name"], str) else ""
-                concept_emb = self.get_embedding(name).tolist()
-                concept_embeddings.append({
-                    "uri": f"http://www.semanticweb.org/vss/ontology/scientific_recommender#{c_id}",
-                    "hasNameEmbedding": concept_emb
-                })
-            concept_df = pd.DataFrame(concept_embeddings)
-            concept_df.to_csv(f"{output_dir}/embeddings_concepts.csv", index=False)
-            print(f"Saved {len(concept_embeddings)} concept embeddings to {output_dir}/embeddings_concepts.csv")
-        except Exception as e:
-            print(f"Error generating embeddings: {e}")
+        return self.embed_many([text], max_length=max_length, show_progress=False)[0]
+
+    def embed_many(self, texts, batch_size=None, max_length=512, show_progress=True, desc="Embedding texts", cache=None):
+        """
+        Generate SciBERT embeddings for many texts with batched forward passes.
+
+        Identical texts are embedded once, and texts found in `cache` are not
+        embedded at all. With several workers the rest are sharded across
+        processes (`embedding_pipeline.embed_sharded`). Otherwise they are
+        tokenized once, sorted by token length
+        and cut into mini-batches of similar length, each padded only to its
+        longest text. Mean pooling is masked with the attention mask, so
+        padding does not change any vector: each row equals `get_embedding`
+        of that text alone.
+
+        Args:
+            texts (list): Input texts; empty or non-string entries get a zero vector
+            batch_size (int, optional): Texts per forward pass, defaults to `self.batch_size`
+            max_length (int): Maximum token length for truncation
+            show_progress (bool): Show a progress bar and print the throughput
+            desc (str): Progress bar label
+            cache (EmbeddingCache, optional): Cache read before embedding and filled with new vectors
+
+        Returns:
+            numpy.ndarray: (len(texts), 768) float32 embeddings, in input order
+        """
+        batch_size = batch_size or self.batch_size
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        positions = {}  # distinct text -> rows
+        for i, text in enumerate(texts):
+            if text and isinstance(text, str) and not pd.isna(text):
+                positions.setdefault(text, []).append(i)
+        if not positions:
+            return embeddings
+
+        start = time.perf_counter()
+        keys = {text: text_key(self.cache_id, max_length, text) for text in positions}
+        todo = [text for text in positions if cache is None or keys[text] not in cache]
+        if self.workers > 1:
+            options = {"model_name": self.model_name, "backend": self.backend, "local_files_only": self.local_files_only}
+            vectors = embed_sharded(todo, [keys[text] for text in todo], self.checkpoint_dir, self.workers,
+                                    self.threads_per_worker, options, batch_size, max_length, self.chunk_size, desc)
+        else:
+            vectors = self._embed_distinct(todo, batch_size, max_length, show_progress, desc)
+        for text, vector in zip(todo, vectors):
+            embeddings[positions[text]] = vector
+            if cache is not None:
+                cache.put(keys[text], vector)
+        if cache is not None:
+            for text in positions.keys() - set(todo):
+                embeddings[positions[text]] = cache.get(keys[text])
+
+        if show_progress:
+            elapsed = time.perf_counter() - start
+            valid = sum(len(rows) for rows in positions.values())
+            print(f"Embedded {len(todo)} of {valid} texts ({valid - len(todo)} cached or duplicate) in {elapsed:.1f}s "
+                  f"({len(todo) / elapsed:.1f} texts/sec, batch size {batch_size})")
+        return embeddings
+
+    def _embed_distinct(self, texts, batch_size, max_length, show_progress, desc):
+        """Length-bucketed, masked-mean forward passes over non-empty texts; rows in input order."""
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if not texts:
+            return embeddings
+        encoded = self.tokenizer(texts, max_length=max_length, truncation=True)["input_ids"]
+        order = np.argsort([len(ids) for ids in encoded], kind="stable")
+        batches = [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+        for batch in tqdm(batches, desc=desc, disable=not show_progress):
+            inputs = self.tokenizer.pad({"input_ids": [encoded[j] for j in batch]}, return_tensors="pt")
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            with torch.inference_mode():
+                hidden = self.model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1)
+            embeddings[batch] = pooled.float().cpu().numpy()
+        return embeddings
+
+    def generate_and_save_embeddings(self, articles_file, concepts_file, output_dir=r"C:\Users\VSS\Desktop\WebAPP\VER 2\data\embeddings", batch_size=None, cache_file=None):
+        """
+        Embed article abstracts (or titles) and concept names and merge them into the embedding CSVs.
+
+        Only texts missing from the embedding cache are run through the model;
+        rows of URIs that are not in the input files are kept. The cache is
+        saved after each stage and the workers' checkpoint parts are deleted
+        once everything is saved. Errors are raised, not logged and skipped,
+        so a failed run exits non-zero and can be rerun to resume.
+
+        Args:
+            articles_file (str): processed_articles.json
+            concepts_file (str): processed_concepts.json
+            output_dir (str): Directory of embeddings_articles.csv and embeddings_concepts.csv
+            batch_size (int, optional): Texts per forward pass
+            cache_file (str, optional): Embedding cache, defaults to `<output_dir>/embedding_cache.npz`
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        cache = EmbeddingCache(cache_file or os.path.join(output_dir, "embedding_cache.npz"),
+                               dim=self.dim)
+        if os.path.exists(cache.path):
+            cache.load()
+            print(f"Loaded {len(cache)} cached embeddings from {cache.path}")
+
+        # Articles
+        uris, texts = article_texts(articles_file)
+        vectors = self.embed_many(texts, batch_size=batch_size, desc="Generating Article Embeddings", cache=cache)
+        count = merge_embeddings(f"{output_dir}/embeddings_articles.csv", uris, "hasAbstractEmbedding", vectors)
+        print(f"Saved {len(uris)} article embeddings ({count} in total) to {output_dir}/embeddings_articles.csv")
+        cache.save()
+
+        # Concepts
+        concepts = pd.read_json(concepts_file)
+        uris, names = [], []
+        for _, row in concepts.iterrows():
+            c_id = re.sub(r'\W+', '_', str(row["id"]))
+            uris.append(f"{ONTOLOGY_NS}{c_id}")
+            names.append(str(row["name"]) if row["name"] and isinstance(row["name"], str) else "")
+        vectors = self.embed_many(names, batch_size=batch_size, desc="Generating Concept Embeddings", cache=cache)
+        count = merge_embeddings(f"{output_dir}/embeddings_concepts.csv", uris, "hasNameEmbedding", vectors)
+        print(f"Saved {len(uris)} concept embeddings ({count} in total) to {output_dir}/embeddings_concepts.csv")
+
+        cache.save()
+        print(f"Saved {len(cache)} cached embeddings to {cache.path}")
+        if self.workers > 1:
+            clear_checkpoints(self.checkpoint_dir)
 
 if __name__ == "__main__":
-    articles_file = r"C:\Users\VSS\Desktop\WebAPP\VER 2\data\processed_articles.json"
-    concepts_file = r"C:\Users\VSS\Desktop\WebAPP\VER 2\data\processed_concepts.json"
-    generator = EmbeddingGenerator()
-    generator.generate_and_save_embeddings(articles_file, concepts_file)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate SciBERT embeddings for articles and concepts")
+    parser.add_argument("--articles", default=r"C:\Users\VSS\Desktop\WebAPP\VER 2\data\processed_articles.json")
+    parser.add_argument("--concepts", default=r"C:\Users\VSS\Desktop\WebAPP\VER 2\data\processed_concepts.json")
+    parser.add_argument("--output-dir", default=r"C:\Users\VSS\Desktop\WebAPP\VER 2\data\embeddings")
+    parser.add_argument("--batch-size", type=int, default=32, help="Texts per forward pass")
+    parser.add_argument("--cache", default=None, help="Embedding cache (default: <output-dir>/embedding_cache.npz)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (CPU-only machines)")
+    parser.add_argument("--threads-per-worker", type=int, default=None, help="torch threads per worker (default: cores / workers)")
+    parser.add_argument("--checkpoint-dir", default=None, help="Worker checkpoints (default: <output-dir>/embedding_checkpoints)")
+    parser.add_argument("--chunk-size", type=int, default=1024, help="Texts per worker checkpoint")
+    parser.add_argument("--backend", choices=sorted(INFERENCE_BACKENDS), default="torch", help="Inference backend")
+    parser.add_argument("--allow-download", action="store_true",
+                        help="Fetch the model from the Hugging Face Hub if it is not cached (default: local cache only)")
+    parser.add_argument("--quality-check", type=int, default=0, metavar="N",
+                        help="Compare --backend with fp32 on N sampled articles and exit")
+    args = parser.parse_args()
+    if args.quality_check:
+        report = check_backend_quality(article_texts(args.articles)[1], args.backend, args.quality_check,
+                                       args.batch_size, local_files_only=not args.allow_download)
+        for name, value in report.items():
+            print(f"{name}: {value:.4f}" if isinstance(value, float) else f"{name}: {value}")
+        sys.exit(0)
+    generator = EmbeddingGenerator(
+        batch_size=args.batch_size, workers=args.workers, threads_per_worker=args.threads_per_worker,
+        checkpoint_dir=args.checkpoint_dir or os.path.join(args.output_dir, "embedding_checkpoints"),
+        chunk_size=args.chunk_size, backend=args.backend, local_files_only=not args.allow_download
+    )
+    generator.generate_and_save_embeddings(args.articles, args.concepts, args.output_dir, cache_file=args.cache)
\ No newline at end of file
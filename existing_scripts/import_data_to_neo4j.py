@@ -25,9 +25,9 @@ Input Data:
 
 Output:
 - Populated Neo4j database ready for recommendations
+- ontology_closure.npz: Transitive closure of the isSubclassOf hierarchy
 """
 
-from neo4j import GraphDatabase
 import pandas as pd
 from tqdm import tqdm
 import re
@@ -39,13 +39,25 @@ project_root = os.path.abspath(os.path.join(script_dir, "..")) # Goes up to VER
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 from backend_api.config import Config
+website_dir = os.path.join(project_root, "Website")
+if website_dir not in sys.path:
+    sys.path.insert(0, website_dir)
+from backend.ontology_closure import OntologyClosure
+from backend.graph import GraphPool
 
 class Neo4jImporter:
-    def __init__(self, uri="bolt://localhost:7687", user="neo4j", password="anass2003"):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+    def __init__(self, graph=None):
+        # Connection settings come from the NEO4J_* environment variables
+        self.graph = graph or GraphPool.from_env()
 
     def close(self):
-        self.driver.close()
+        self.graph.close()
+
+    def create_indexes(self, session):
+        # Lookups by uri (UNWIND $uris ... MATCH {uri: ...}) need these to avoid label scans
+        session.run("CREATE INDEX concept_uri IF NOT EXISTS FOR (c:Concept) ON (c.uri)")
+        session.run("CREATE INDEX work_uri IF NOT EXISTS FOR (w:Work) ON (w.uri)")
+        session.run("CREATE INDEX user_id IF NOT EXISTS FOR (u:User) ON (u.has_id)")
 
     def create_concepts(self, tx, concepts):
         for _, row in tqdm(concepts.iterrows(), total=len(concepts), desc="Creating Concepts"):
@@ -155,7 +167,8 @@ class Neo4jImporter:
             print(f"Error loading files: {e}")
             return
 
-        with self.driver.session() as session:
+        with self.graph.session() as session:
+            self.create_indexes(session)
             session.execute_write(self.create_concepts, concepts)
             print("Concepts created!")
             for start_idx in range(0, len(articles), batch_size):
@@ -165,9 +178,17 @@ class Neo4jImporter:
                 print(f"Processed articles {start_idx} to {end_idx}")
 
         print("Neo4j graph populated!")
+        self.save_ontology_closure()
+
+    def save_ontology_closure(self, output_file=None, owl_file=os.path.join(project_root, "scientific_recommender.owl")):
+        # The hierarchy only changes here, so the web app loads its closure instead of walking isSubclassOf per query
+        output_file = output_file or os.getenv("ONTOLOGY_CLOSURE_FILE", os.path.join(website_dir, "data", "ontology_closure.npz"))
+        closure = OntologyClosure.from_neo4j(self.graph, owl_file if os.path.exists(owl_file) else None)
+        closure.save(output_file)
+        print(f"Ontology closure of {len(closure)} concepts saved to {output_file}")
 
 if __name__ == "__main__":
-    importer = Neo4jImporter(password="anass2003")
+    importer = Neo4jImporter()
     try:
         importer.populate_graph()
     except Exception as e:
@@ -1,7 +1,4 @@
-from neo4j import GraphDatabase
-import pandas as pd
 from tqdm import tqdm
-import json
 
 import sys
 import os
@@ -10,63 +7,57 @@ project_root = os.path.abspath(os.path.join(script_dir, "..")) # Goes up to VER
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 from backend_api.config import Config
+website_dir = os.path.join(project_root, "Website")
+if website_dir not in sys.path:
+    sys.path.insert(0, website_dir)
+from backend.graph import GraphPool
+from backend.embedding_file import read_embeddings
 
 class Neo4jEmbeddingLoader:
-    def __init__(self, uri="bolt://localhost:7687", user="neo4j", password="anass2003"):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+    def __init__(self, graph=None):
+        # Connection settings come from the NEO4J_* environment variables
+        self.graph = graph or GraphPool.from_env()
 
     def close(self):
-        self.driver.close()
+        self.graph.close()
 
     def load_embeddings(self, articles_emb_file=r"C:\Users\VSS\Desktop\WebAPP\VER 2\data\embeddings\embeddings_articles.csv", concepts_emb_file=r"C:\Users\VSS\Desktop\WebAPP\VER 2\data\embeddings\embeddings_concepts.csv"):
+        # Either file may be an embeddings CSV or a binary .npy (see backend/embedding_file.py)
         try:
-            articles_emb = pd.read_csv(articles_emb_file)
-            concepts_emb = pd.read_csv(concepts_emb_file)
+            articles_emb = read_embeddings(articles_emb_file, "hasAbstractEmbedding", dim=768, mmap=True)
+            concepts_emb = read_embeddings(concepts_emb_file, "hasNameEmbedding", dim=768, mmap=True)
         except Exception as e:
-            print(f"Error loading CSV files: {e}")
+            print(f"Error loading embedding files: {e}")
             return
 
-        def load_article_embeddings(tx):
-            for _, row in tqdm(articles_emb.iterrows(), total=len(articles_emb), desc="Loading Article Embeddings"):
-                try:
-                    embedding = json.loads(row["hasAbstractEmbedding"]) if isinstance(row["hasAbstractEmbedding"], str) else row["hasAbstractEmbedding"]
-                    if not isinstance(embedding, list) or len(embedding) != 768:
-                        print(f"Invalid embedding for article {row['uri']}")
-                        continue
-                    tx.run(
-                        """
-                        MATCH (w:Work {uri: $uri})
-                        SET w.hasAbstractEmbedding = $embedding
-                        """,
-                        uri=row["uri"], embedding=embedding
-                    )
-                except Exception as e:
-                    print(f"Error loading article embedding for {row['uri']}: {e}")
+        def embedding_rows(embeddings, kind):
+            # Yielded lazily: write_batches converts one batch of (memory-mapped) rows to lists at a time
+            uris, matrix, _ = embeddings
+            for i, uri in enumerate(tqdm(uris, desc=f"Writing {kind} Embeddings")):
+                yield {"uri": uri, "embedding": matrix[i].tolist()}
 
-        def load_concept_embeddings(tx):
-            for _, row in tqdm(concepts_emb.iterrows(), total=len(concepts_emb), desc="Loading Concept Embeddings"):
-                try:
-                    embedding = json.loads(row["hasNameEmbedding"]) if isinstance(row["hasNameEmbedding"], str) else row["hasNameEmbedding"]
-                    if not isinstance(embedding, list) or len(embedding) != 768:
-                        print(f"Invalid embedding for concept {row['uri']}")
-                        continue
-                    tx.run(
-                        """
-                        MATCH (c:Concept {uri: $uri})
-                        SET c.hasNameEmbedding = $embedding
-                        """,
-                        uri=row["uri"], embedding=embedding
-                    )
-                except Exception as e:
-                    print(f"Error loading concept embedding for {row['uri']}: {e}")
-
-        with self.driver.session() as session:
-            session.execute_write(load_article_embeddings)
-            session.execute_write(load_concept_embeddings)
+        # One UNWIND write per batch of rows instead of one query per node
+        self.graph.write_batches(
+            """
+            UNWIND $rows AS row
+            MATCH (w:Work {uri: row.uri})
+            SET w.hasAbstractEmbedding = row.embedding
+            """,
+            embedding_rows(articles_emb, "Article"), batch_size=500
+        )
+        self.graph.write_batches(
+            """
+            UNWIND $rows AS row
+            MATCH (c:Concept {uri: row.uri})
+            SET c.hasNameEmbedding = row.embedding
+            """,
+            embedding_rows(concepts_emb, "Concept"), batch_size=500
+        )
         print("Embeddings loaded into Neo4j!")
+        print(f"Neo4j: {self.graph.stats.snapshot()}")
 
 if __name__ == "__main__":
-    loader = Neo4jEmbeddingLoader(password="anass2003")
+    loader = Neo4jEmbeddingLoader()
     try:
         loader.load_embeddings()
     except Exception as e:
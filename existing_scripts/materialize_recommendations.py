@@ -0,0 +1,98 @@
+"""
+Materialize Per-User Recommendations
+
+Precomputes every user's top-N personalized recommendations with
+`RecommendationEngine.get_recommendations_batch` and saves them, with a version
+stamp and a fingerprint of each user's profile, as one compact `.npz` (see
+`Website/backend/materialized.py`). The web apps serve `/recommend` from it
+through `MATERIALIZED_FILE` and compute live for stale or cold-start users.
+
+Run nightly, and after `build_user_profiles.py` or a new embeddings file. Use
+the same FUSION_METHOD / CONTENT_WEIGHT / ONTOLOGY_WEIGHT settings as the
+server so both rank the same way. Store MAX_DEPTH results per user (the
+default): the live path fuses pages after the first at that depth, so
+materialized pages match them, and every page can be served.
+
+Usage:
+    python existing_scripts/materialize_recommendations.py
+    python existing_scripts/materialize_recommendations.py --top-n 50 --topic "Machine Learning"
+    python existing_scripts/materialize_recommendations.py --users User_0 User_7
+"""
+
+import argparse
+import time
+
+import sys
+import os
+script_dir = os.path.dirname(os.path.abspath(__file__))
+website_dir = os.path.abspath(os.path.join(script_dir, "..", "Website"))
+if website_dir not in sys.path:
+    sys.path.insert(0, website_dir)
+from backend.reco import RecommendationEngine
+from backend.graph import GraphPool
+from backend.embedding_store import EmbeddingStore
+from backend.bm25 import BM25Index
+from backend.profile_store import UserProfileStore
+from backend.materialized import MaterializedRecommendations, profile_fingerprint
+from backend.pagination import MAX_DEPTH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute and persist every user's top-N recommendations")
+    parser.add_argument("--output", default="data/materialized_recommendations.npz")
+    parser.add_argument("--embeddings", default="data/embeddings/embeddings_articles.csv")
+    parser.add_argument("--articles", default="data/cleaned data/processed_articles.json")
+    parser.add_argument("--profiles", default="data/embeddings/user_profiles.npz")
+    parser.add_argument("--logs", default="data/fake_user_logs.csv")
+    parser.add_argument("--keyword-index", default="data/keyword_index.npz")
+    parser.add_argument("--topic", default="Neural Networks", help="Topic /recommend is called with")
+    parser.add_argument("--search-query", default="", help="Search query /recommend is called with")
+    parser.add_argument("--top-n", type=int, default=MAX_DEPTH, help="Results stored per user")
+    parser.add_argument("--batch-size", type=int, default=500, help="Users scored per batch")
+    parser.add_argument("--users", nargs="+", default=None, help="Only these users (default: every User node)")
+    args = parser.parse_args()
+
+    article_store = EmbeddingStore(args.embeddings, metadata_file=args.articles if os.path.exists(args.articles) else None)
+    article_store.load()
+    profile_store = UserProfileStore(args.profiles)
+    if os.path.exists(args.profiles):
+        profile_store.load()
+    keyword_index = BM25Index.load(args.keyword_index) if os.path.exists(args.keyword_index) else None
+
+    # Connection settings come from the NEO4J_* environment variables
+    graph = GraphPool.from_env()
+    engine = RecommendationEngine(
+        graph=graph, embedding_store=article_store, keyword_index=keyword_index, profile_store=profile_store,
+        interaction_logs_file=args.logs if os.path.exists(args.logs) else None, cache=False,
+        fusion_method=os.getenv("FUSION_METHOD", "weighted"),
+        fusion_weights={'Content': float(os.getenv("CONTENT_WEIGHT", 0.6)),
+                        'Ontology': float(os.getenv("ONTOLOGY_WEIGHT", 0.4))}
+    )
+    try:
+        user_ids = args.users or [record["user_id"] for record in graph.read("MATCH (u:User) RETURN u.has_id AS user_id")]
+        start = time.perf_counter()
+        recommendations = {}
+        for offset in range(0, len(user_ids), args.batch_size):
+            batch = user_ids[offset:offset + args.batch_size]
+            recommendations.update(engine.get_recommendations_batch(batch, args.topic, args.search_query, top_n=args.top_n))
+            print(f"{min(offset + args.batch_size, len(user_ids))}/{len(user_ids)} users "
+                  f"({time.perf_counter() - start:.1f}s)")
+        # The batch computed (or loaded) every profile; users whose profile is missing are left to live computation
+        profiles = {user_id: profile_store.get(user_id) for user_id in recommendations}
+        fingerprints = {user_id: profile_fingerprint(profile) for user_id, profile in profiles.items() if profile is not None}
+        recommendations = {user_id: recs for user_id, recs in recommendations.items() if user_id in fingerprints}
+    finally:
+        engine.close()
+        graph.close()
+
+    store = MaterializedRecommendations.build(
+        args.output, recommendations, fingerprints, args.topic, args.search_query, args.top_n,
+        embeddings_mtime=article_store.signature[0]
+    )
+    store.save()
+    print(f"Materialized {len(store)} users x top {args.top_n} (version {store.meta['version']}) in "
+          f"{time.perf_counter() - start:.1f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
-from neo4j import GraphDatabase
 import pandas as pd
 from tqdm import tqdm
 import re
+import json
+import urllib.request
 
 import sys
 import os
@@ -10,13 +11,48 @@ project_root = os.path.abspath(os.path.join(script_dir, "..")) # Goes up to VER
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 from backend_api.config import Config
+website_dir = os.path.join(project_root, "Website")
+if website_dir not in sys.path:
+    sys.path.insert(0, website_dir)
+from backend.cache import SQLiteResultCache
+from backend.graph import GraphPool
+from backend.label_index import ConceptLabelIndex
+from backend.profile_store import UserProfileStore
+
+def notify_web_apps(user_ids, urls=None, timeout=10):
+    """
+    POST the changed users to each running web app's `/cache/invalidate`.
+
+    That drops their in-memory cached results, materialized rankings and
+    profile vectors, which the shared SQLite cache invalidation cannot reach,
+    and folds new rows of the interaction log into the collaborative model.
+
+    Args:
+        user_ids (list): Users whose interests changed
+        urls (list, optional): Base URLs of the web apps, defaults to RECOMMENDER_URLS
+            (comma-separated, default http://localhost:5050)
+        timeout (float): Seconds per request
+    """
+    urls = urls or [url.strip() for url in os.getenv("RECOMMENDER_URLS", "http://localhost:5050").split(",") if url.strip()]
+    body = json.dumps({"user_ids": [str(user_id) for user_id in user_ids]}).encode()
+    for url in urls:
+        request = urllib.request.Request(f"{url.rstrip('/')}/cache/invalidate", data=body,
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=timeout):
+                print(f"Invalidated {len(user_ids)} users in the web app at {url}")
+        except OSError as e:
+            # Not running: it starts with fresh caches; otherwise its in-memory results expire with the TTL
+            print(f"Could not notify the web app at {url} ({e}); its cached results expire with RESULT_CACHE_TTL")
+
 
 class UserProfileImporter:
-    def __init__(self, uri="bolt://localhost:7687", user="neo4j", password="anass2003"):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+    def __init__(self, graph=None):
+        # Connection settings come from the NEO4J_* environment variables
+        self.graph = graph or GraphPool.from_env()
 
     def close(self):
-        self.driver.close()
+        self.graph.close()
 
     def populate_users(self, logs_file=r"C:\Users\VSS\Desktop\WebAPP\VER 2\data\fake_user_logs.csv"):
         try:
@@ -26,49 +62,55 @@ class UserProfileImporter:
             print(f"Error loading user logs: {e}")
             return
 
-        def create_user_profiles(tx):
-            # Ensure User_0 likes Neural Networks
-            tx.run(
-                """
-                MERGE (u:User {uri: $uri, has_id: $id})
-                SET u.foaf__name = $name
-                WITH u
-                MATCH (c:Concept)
-                WHERE toLower(c.skos__prefLabel) CONTAINS 'neural networks'
-                MERGE (u)-[:hasInterest]->(c)
-                """,
-                uri="http://www.semanticweb.org/vss/ontology/scientific_recommender#User_0",
-                id="User_0", name="User_0"
-            )
+        # Topic -> concept URIs resolved in-process instead of a CONTAINS scan per user/topic pair
+        label_index = ConceptLabelIndex.from_neo4j(self.graph)
 
-            for user_id in tqdm(user_topics["user_id"].unique(), desc="Creating Users"):
-                if user_id != "User_0":
-                    tx.run(
-                        """
-                        MERGE (u:User {uri: $uri, has_id: $id})
-                        SET u.foaf__name = $name
-                        """,
-                        uri=f"http://www.semanticweb.org/vss/ontology/scientific_recommender#{user_id}",
-                        id=user_id, name=user_id
-                    )
-                    user_top_topics = user_topics[user_topics["user_id"] == user_id]["topic"]
-                    for topic in user_top_topics:
-                        tx.run(
-                            """
-                            MATCH (u:User {uri: $u_uri}), (c:Concept)
-                            WHERE toLower(c.skos__prefLabel) CONTAINS toLower($topic)
-                            MERGE (u)-[:hasInterest]->(c)
-                            """,
-                            u_uri=f"http://www.semanticweb.org/vss/ontology/scientific_recommender#{user_id}",
-                            topic=str(topic)
-                        )
+        # Ensure User_0 likes Neural Networks
+        user_ns = "http://www.semanticweb.org/vss/ontology/scientific_recommender#"
+        rows = [{"uri": user_ns + "User_0", "id": "User_0", "concept_uris": label_index.substring("neural networks")}]
+        for user_id, user_top_topics in tqdm(user_topics.groupby("user_id")["topic"], desc="Creating Users"):
+            if user_id != "User_0":
+                concept_uris = sorted({uri for topic in user_top_topics for uri in label_index.substring(str(topic))})
+                rows.append({"uri": f"{user_ns}{user_id}", "id": user_id, "concept_uris": concept_uris})
 
-        with self.driver.session() as session:
-            session.execute_write(create_user_profiles)
+        # Users and their interests are written in UNWIND batches over one session
+        self.graph.write_batches(
+            """
+            UNWIND $rows AS row
+            MERGE (u:User {uri: row.uri, has_id: row.id})
+            SET u.foaf__name = row.id
+            WITH u, row
+            UNWIND row.concept_uris AS concept_uri
+            MATCH (c:Concept {uri: concept_uri})
+            MERGE (u)-[:hasInterest]->(c)
+            """,
+            rows
+        )
         print("User profiles and interests stored in Neo4j!")
 
+        # hasInterest edges changed: drop cached recommendations shared with the web workers
+        cache_path = os.getenv("RESULT_CACHE_PATH", os.path.join(website_dir, "data", "result_cache.sqlite"))
+        if os.path.exists(cache_path):
+            cache = SQLiteResultCache(cache_path)
+            for user_id in user_topics["user_id"].unique():
+                cache.invalidate_user(str(user_id))
+            print(f"Invalidated cached recommendations in {cache_path}")
+
+        # Recompute only the profile vectors of the users written above
+        profiles_path = os.getenv("USER_PROFILES_FILE", os.path.join(website_dir, "data", "embeddings", "user_profiles.npz"))
+        profiles = UserProfileStore(profiles_path)
+        if os.path.exists(profiles_path):
+            profiles.load()
+        if os.path.isdir(os.path.dirname(profiles_path)):
+            profiles.recompute(self.graph, [str(user_id) for user_id in user_topics["user_id"].unique()])
+            profiles.save()
+            print(f"Updated {len(profiles)} user profile vectors in {profiles_path}")
+
+        # In-process caches of running web apps (memory cache, materialized rankings, profiles)
+        notify_web_apps(user_topics["user_id"].unique())
+
 if __name__ == "__main__":
-    importer = UserProfileImporter(password="anass2003")
+    importer = UserProfileImporter()
     try:
         importer.populate_users()
     except Exception as e:
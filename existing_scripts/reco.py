@@ -1,20 +1,29 @@
 import pandas as pd
 import numpy as np
-from neo4j import GraphDatabase
 from scipy.spatial.distance import cosine
-import json
 from sklearn.preprocessing import normalize
 
+import sys
+import os
+script_dir = os.path.dirname(os.path.abspath(__file__))
+website_dir = os.path.abspath(os.path.join(script_dir, "..", "Website"))
+if website_dir not in sys.path:
+    sys.path.insert(0, website_dir)
+from backend.graph import GraphPool
+from backend.metadata import fetch_work_metadata
+from backend.embedding_file import read_embeddings
+
 class RecommendationEngine:
-    def __init__(self, uri, user, password):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+    def __init__(self, graph=None):
+        # Connection settings come from the NEO4J_* environment variables
+        self.graph = graph or GraphPool.from_env()
         self.embedding_dim = 768  # SciBERT embedding size
 
     def close(self):
-        self.driver.close()
+        self.graph.close()
 
     def get_ontology_recommendations(self, topic, search_query):
-        with self.driver.session() as session:
+        with self.graph.session("read") as session:
             result = session.run(
                 """
                 MATCH (w:Work)-[:hasTopic|hasConcept]->(c:Concept)
@@ -27,7 +36,7 @@ class RecommendationEngine:
             return [(record["w.uri"], record["w.hasTitle"], record["w.domain"], 'Ontology') for record in result]
 
     def get_user_recommendations(self, user_id):
-        with self.driver.session() as session:
+        with self.graph.session("read") as session:
             result = session.run(
                 """
                 MATCH (u:User {has_id: $user_id})-[:hasInterest]->(c:Concept)<-[:hasTopic|hasConcept]-(w:Work)
@@ -38,17 +47,15 @@ class RecommendationEngine:
             return [(record["w.uri"], record["w.hasTitle"], record["w.domain"], 'User') for record in result]
 
     def get_content_recommendations(self, user_id, embeddings_file):
-        embeddings_df = pd.read_csv(embeddings_file)
-        valid_embeddings = embeddings_df.dropna(subset=['hasAbstractEmbedding']).copy()
+        # CSV export or binary .npy (see backend/embedding_file.py)
+        uris, embeddings_matrix, _ = read_embeddings(embeddings_file, 'hasAbstractEmbedding', dim=self.embedding_dim)
 
-        if valid_embeddings.empty:
+        if not uris:
             return []
 
-        valid_embeddings['embedding'] = valid_embeddings['hasAbstractEmbedding'].apply(json.loads)
-        embeddings_matrix = np.array(valid_embeddings['embedding'].tolist())
         embeddings_matrix = normalize(embeddings_matrix)
 
-        with self.driver.session() as session:
+        with self.graph.session("read") as session:
             result = session.run(
                 """
                 MATCH (u:User {has_id: $user_id})-[:hasInterest]->(c:Concept)
@@ -68,24 +75,13 @@ class RecommendationEngine:
         similarities = 1 - np.array([cosine(user_embedding, emb) for emb in embeddings_matrix])
         valid_indices = np.where(similarities > 0)[0]  # Keep all non-zero similarities
 
-        recommendations = []
-        for idx in valid_indices:
-            article = valid_embeddings.iloc[idx]
-            with self.driver.session() as session:
-                result = session.run(
-                    """
-                    MATCH (w:Work {uri: $uri})
-                    RETURN w.hasTitle, w.domain
-                    """,
-                    uri=article['uri']
-                )
-                record = result.single()
-                if record:
-                    recommendations.append((article['uri'], record["w.hasTitle"], record["w.domain"], 'Content'))
-        return recommendations
+        # Titles and domains of every match in one round-trip
+        uris = [uris[idx] for idx in valid_indices]
+        metadata = fetch_work_metadata(self.graph, uris)
+        return [(uri, metadata[uri][0], metadata[uri][1], 'Content') for uri in uris if uri in metadata]
 
     def get_collaborative_recommendations(self, user_id):
-        with self.driver.session() as session:
+        with self.graph.session("read") as session:
             result = session.run(
                 """
                 MATCH (u:User {has_id: $user_id})-[:hasInterest]->(c:Concept)<-[:hasInterest]-(other:User)-[:hasInterest]->(c2:Concept)<-[:hasTopic|hasConcept]-(w:Work)
@@ -98,7 +94,7 @@ class RecommendationEngine:
 
     def get_search_recommendations(self, search_topic, embeddings_file):
         # Ontology-based: Include related concepts via isSubclassOf
-        with self.driver.session() as session:
+        with self.graph.session("read") as session:
             result = session.run(
                 """
                 MATCH (c:Concept)
@@ -114,17 +110,14 @@ class RecommendationEngine:
             ontology_recs = [(record["w.uri"], record["w.hasTitle"], record["w.domain"], 'Ontology') for record in result]
 
         # Content-based: Use embeddings for semantic similarity
-        embeddings_df = pd.read_csv(embeddings_file)
-        valid_embeddings = embeddings_df.dropna(subset=['hasAbstractEmbedding']).copy()
+        uris, embeddings_matrix, _ = read_embeddings(embeddings_file, 'hasAbstractEmbedding', dim=self.embedding_dim)
 
-        if valid_embeddings.empty:
+        if not uris:
             return ontology_recs
 
-        valid_embeddings['embedding'] = valid_embeddings['hasAbstractEmbedding'].apply(json.loads)
-        embeddings_matrix = np.array(valid_embeddings['embedding'].tolist())
         embeddings_matrix = normalize(embeddings_matrix)
 
-        with self.driver.session() as session:
+        with self.graph.session("read") as session:
             result = session.run(
                 """
                 MATCH (c:Concept)
@@ -144,20 +137,9 @@ class RecommendationEngine:
         similarities = 1 - np.array([cosine(topic_embedding, emb) for emb in embeddings_matrix])
         valid_indices = np.where(similarities > 0)[0]  # Keep all non-zero similarities
 
-        content_recs = []
-        for idx in valid_indices:
-            article = valid_embeddings.iloc[idx]
-            with self.driver.session() as session:
-                result = session.run(
-                    """
-                    MATCH (w:Work {uri: $uri})
-                    RETURN w.hasTitle, w.domain
-                    """,
-                    uri=article['uri']
-                )
-                record = result.single()
-                if record:
-                    content_recs.append((article['uri'], record["w.hasTitle"], record["w.domain"], 'Content'))
+        uris = [uris[idx] for idx in valid_indices]
+        metadata = fetch_work_metadata(self.graph, uris)
+        content_recs = [(uri, metadata[uri][0], metadata[uri][1], 'Content') for uri in uris if uri in metadata]
         all_recs = ontology_recs + content_recs
         recs_df = pd.DataFrame(all_recs, columns=["uri", "title", "domain", "approach"])
         if recs_df.empty:
@@ -183,7 +165,7 @@ class RecommendationEngine:
         return [(row['title'], row['domain'], row['approach']) for _, row in recs_grouped.iterrows()]
 
 def main():
-    engine = RecommendationEngine("bolt://localhost:7687", "neo4j", "anass2003")
+    engine = RecommendationEngine()
     try:
         # User-based recommendations for User_0
         print(f"Recommendations for User_0 (Neural Networks):")
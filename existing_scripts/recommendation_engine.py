@@ -1,48 +1,50 @@
-from neo4j import GraphDatabase
 import pandas as pd
 import numpy as np
-from scipy.spatial.distance import cosine
 from tqdm import tqdm
 
+import sys
+import os
+script_dir = os.path.dirname(os.path.abspath(__file__))
+website_dir = os.path.abspath(os.path.join(script_dir, "..", "Website"))
+if website_dir not in sys.path:
+    sys.path.insert(0, website_dir)
+from backend.embedding_store import normalize_rows
+from backend.similarity import top_k_similar, domain_boost_vector
+from backend.bm25 import BM25Index
+from backend.profile_store import UserProfileStore
+from backend.user_similarity import UserTopicSets
+from backend.graph import GraphPool
+
 class HybridRecommender:
-    def __init__(self, uri="bolt://localhost:7687", user="neo4j", password="anass2003"):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+    def __init__(self, graph=None, keyword_index_file="data/keyword_index.npz", profiles_file="data/embeddings/user_profiles.npz"):
+        # Connection settings come from the NEO4J_* environment variables
+        self.graph = graph or GraphPool.from_env()
+        # BM25 index from build_keyword_index.py; search queries fall back to CONTAINS without it
+        self.keyword_index = BM25Index.load(keyword_index_file) if keyword_index_file and os.path.exists(keyword_index_file) else None
+        # Precomputed profile vectors (build_user_profiles.py); users missing from the file are computed once
+        self.profiles = UserProfileStore(profiles_file)
+        if os.path.exists(profiles_file):
+            self.profiles.load()
+        self._topic_sets = {}  # logs file -> UserTopicSets
 
     def close(self):
-        self.driver.close()
+        self.graph.close()
 
     def get_user_embeddings(self, user_id):
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (u:User {has_id: $user_id})-[:hasInterest]->(c:Concept)
-                RETURN c.uri, c.hasNameEmbedding
-                """,
-                user_id=user_id
-            )
-            embeddings = []
-            for record in result:
-                emb = record["c.hasNameEmbedding"]
-                if emb and isinstance(emb, list) and len(emb) == 768:
-                    embeddings.append(np.array(emb))
-            return np.mean(embeddings, axis=0) if embeddings else np.zeros(768)
+        if self.profiles.get(user_id) is None:
+            self.profiles.recompute(self.graph, [user_id])
+        return self.profiles.get(user_id)
 
     def get_similar_users(self, user_id, logs_file=r"C:\Users\VSS\Desktop\WebAPP\VER 2\data\fake_user_logs.csv", top_n=5):
         try:
-            df = pd.read_csv(logs_file)
-            user_topics = df[df["user_id"] == user_id]["topic"].value_counts().index.tolist()
-            if not user_topics:
+            # Logs are read once per file; exact Jaccard for small populations, MinHash LSH for large ones
+            topic_sets = self._topic_sets.get(logs_file)
+            if topic_sets is None:
+                topic_sets = self._topic_sets[logs_file] = UserTopicSets.from_logs(logs_file)
+            if not len(topic_sets.topic_set(user_id)):
                 print(f"Warning: No topics for user {user_id}")
                 return []
-            
-            other_users = df[df["user_id"] != user_id].groupby("user_id")["topic"].value_counts().reset_index()
-            user_similarities = []
-            for other_user in other_users["user_id"].unique():
-                other_topics = other_users[other_users["user_id"] == other_user]["topic"].tolist()
-                overlap = len(set(user_topics).intersection(other_topics)) / len(set(user_topics).union(other_topics))
-                user_similarities.append((other_user, overlap))
-            
-            return [u for u, _ in sorted(user_similarities, key=lambda x: x[1], reverse=True)[:top_n]]
+            return [u for u, _ in topic_sets.similar_users(user_id, top_n)]
         except Exception as e:
             print(f"Error in get_similar_users: {e}")
             return []
@@ -53,7 +55,7 @@ class HybridRecommender:
             print(f"Warning: No valid embedding for user {user_id}")
 
         content_recs = []
-        with self.driver.session() as session:
+        with self.graph.session("read") as session:
             result = session.run(
                 """
                 MATCH (w:Work)
@@ -62,28 +64,35 @@ class HybridRecommender:
                 """
             )
             article_count = 0
-            valid_emb_count = 0
+            articles = []
+            embeddings = []
             for record in result:
                 article_count += 1
                 emb = record["w.hasAbstractEmbedding"]
                 if not emb or not isinstance(emb, list) or len(emb) != 768:
                     print(f"Warning: Invalid embedding for article {record['w.hasTitle'] or 'Unknown'}")
                     continue
-                emb = np.array(emb)
-                if not np.any(emb):
+                if not any(emb):
                     print(f"Warning: Empty embedding for article {record['w.hasTitle'] or 'Unknown'}")
                     continue
-                valid_emb_count += 1
-                sim = 1 - cosine(user_embedding, emb) if np.any(user_embedding) else 0
-                domain = record["w.domain"] if record["w.domain"] else "Unknown"
-                score_boost = 1.1 if domain == "Artificial Intelligence" else 1.0
+                articles.append(record)
+                embeddings.append(emb)
+            valid_emb_count = len(articles)
+
+        if articles:
+            matrix = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+            boost = domain_boost_vector([record["w.domain"] or "Unknown" for record in articles])
+            # Same candidates as scoring every article and keeping the top_n boosted scores > 0 (the filter below)
+            indices, scores = top_k_similar(matrix, user_embedding, k=top_n, threshold=0.0, boost=boost)
+            for idx, score in zip(indices, scores):
+                record = articles[idx]
                 content_recs.append({
                     "article_id": record["w.uri"],
                     "title": record["w.hasTitle"] or "Unknown Title",
                     "cited_by_count": record["w.citedByCount"] or 0,
-                    "score": sim * score_boost
+                    "score": float(score)
                 })
-            print(f"Processed {article_count} articles, {valid_emb_count} valid embeddings, {len(content_recs)} content recs")
+        print(f"Processed {article_count} articles, {valid_emb_count} valid embeddings, {len(content_recs)} content recs")
 
         content_recs = pd.DataFrame(content_recs)
         if not content_recs.empty and "score" in content_recs.columns:
@@ -93,7 +102,8 @@ class HybridRecommender:
             content_recs = pd.DataFrame(columns=["article_id", "title", "cited_by_count", "score"])
 
         ontology_recs = []
-        with self.driver.session() as session:
+        keyword_uris = self.keyword_index.matches(search_query_text) if search_query_text and self.keyword_index else None
+        with self.graph.session("read") as session:
             result = session.run(
                 """
                 MATCH (u:User {has_id: $user_id})-[:hasInterest]->(c:Concept)
@@ -115,7 +125,17 @@ class HybridRecommender:
                 LIMIT $top_n
                 """
                 params = {"topic": topic, "top_n": top_n}
-                if search_query_text:
+                if keyword_uris is not None:
+                    query = """
+                    UNWIND $work_uris AS work_uri
+                    MATCH (w:Work {uri: work_uri})-[:hasTopic|:hasConcept]->(c:Concept)
+                    WHERE toLower(c.skos__prefLabel) CONTAINS toLower($topic)
+                    RETURN DISTINCT w.uri, w.hasTitle, w.citedByCount, w.domain, 1.0 AS score
+                    ORDER BY w.citedByCount DESC
+                    LIMIT $top_n
+                    """
+                    params["work_uris"] = keyword_uris
+                elif search_query_text:
                     query = """
                     MATCH (w:Work)-[:hasTopic|:hasConcept]->(c:Concept)
                     WHERE toLower(c.skos__prefLabel) CONTAINS toLower($topic)
@@ -145,29 +165,31 @@ class HybridRecommender:
         collab_recs = []
         similar_users = self.get_similar_users(user_id)
         if similar_users:
-            with self.driver.session() as session:
-                for sim_user in similar_users:
-                    try:
-                        result = session.run(
-                            """
-                            MATCH (u:User {has_id: $user_id})-[:hasInterest]->(c:Concept)<-[:hasTopic|:hasConcept]-(w:Work)
-                            RETURN w.uri, w.hasTitle, w.citedByCount, w.domain, 0.8 AS score
-                            LIMIT $top_n
-                            """,
-                            user_id=sim_user,
-                            top_n=top_n
-                        )
-                        for record in result:
-                            domain = record["w.domain"] if record["w.domain"] else "Unknown"
-                            score_boost = 1.1 if domain == "Artificial Intelligence" else 1.0
-                            collab_recs.append({
-                                "article_id": record["w.uri"],
-                                "title": record["w.hasTitle"] or "Unknown Title",
-                                "cited_by_count": record["w.citedByCount"] or 0,
-                                "score": record["score"] * score_boost
-                            })
-                    except Exception as e:
-                        print(f"Error in collaborative query for user {sim_user}: {e}")
+            # One query for every similar user (top_n works each, in similarity order)
+            try:
+                records = self.graph.read(
+                    """
+                    UNWIND range(0, size($user_ids) - 1) AS i
+                    MATCH (u:User {has_id: $user_ids[i]})-[:hasInterest]->(c:Concept)<-[:hasTopic|:hasConcept]-(w:Work)
+                    WITH i, collect(w)[..$top_n] AS works
+                    ORDER BY i
+                    UNWIND works AS w
+                    RETURN w.uri, w.hasTitle, w.citedByCount, w.domain, 0.8 AS score
+                    """,
+                    user_ids=similar_users,
+                    top_n=top_n
+                )
+                for record in records:
+                    domain = record["w.domain"] if record["w.domain"] else "Unknown"
+                    score_boost = 1.1 if domain == "Artificial Intelligence" else 1.0
+                    collab_recs.append({
+                        "article_id": record["w.uri"],
+                        "title": record["w.hasTitle"] or "Unknown Title",
+                        "cited_by_count": record["w.citedByCount"] or 0,
+                        "score": record["score"] * score_boost
+                    })
+            except Exception as e:
+                print(f"Error in collaborative query for users {similar_users}: {e}")
 
         collab_recs = pd.DataFrame(collab_recs).drop_duplicates(subset=["article_id"]).head(top_n)
 
@@ -189,7 +211,7 @@ class HybridRecommender:
         return all_recs.to_dict(orient="records")
 
 if __name__ == "__main__":
-    recommender = HybridRecommender(password="anass2003")
+    recommender = HybridRecommender()
     try:
         recs = recommender.get_recommendations(user_id="User_0", search_query_text="neural networks")
         print("Recommendations for User_0:")